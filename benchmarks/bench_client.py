@@ -0,0 +1,156 @@
+"""
+Benchmark transaction construction, serialization, signing and submission.
+
+Uses the golden reference transactions from ``tests/reference.py`` and a
+local mock node, and writes the results as JSON so that runs of two
+releases can be compared:
+
+    $ python -m benchmarks.bench_client --output bench-0.2.0.json
+    $ python -m benchmarks.bench_client --compare bench-0.2.0.json
+"""
+
+import sys
+import json
+import time
+import itertools
+import argparse
+import platform
+import tracemalloc
+
+from uplink.protocol import TxAsset, TxContract, Transfer, CreateAsset, Call
+from uplink.cryptography import ecdsa_sign, pack_signature, derive_account_address
+from uplink.signing import BACKENDS, get_backend
+from uplink.mock_node import MockNode
+from uplink.version import __version__
+
+from tests import reference
+
+
+def _cases():
+    transfer = reference.testTransfer
+    create_asset = reference.testCreateAsset
+    call = reference.testCall(reference.test_args)
+    transfer_tx = reference.testTx(TxAsset, Transfer, transfer)
+    create_asset_tx = reference.testTx(TxAsset, CreateAsset, create_asset)
+    call_tx = reference.testTx(TxContract, Call, call)
+    message = transfer.to_binary()
+    r, s = reference.testSig
+
+    cases = [
+        ('header/transfer', reference._testTransfer),
+        ('header/create_asset', reference._testCreateAsset),
+        ('header/call', lambda: reference.testCall(reference.test_args)),
+        ('to_binary/transfer', transfer.to_binary),
+        ('to_binary/create_asset', create_asset.to_binary),
+        ('to_binary/call', call.to_binary),
+        ('to_dict/transfer', transfer_tx.to_dict),
+        ('to_dict/create_asset', create_asset_tx.to_dict),
+        ('to_dict/call', call_tx.to_dict),
+        ('to_json/transfer', transfer_tx.to_json),
+        ('to_json/call', call_tx.to_json),
+        ('ecdsa_sign', lambda: ecdsa_sign(reference.skey, message)),
+        ('pack_signature', lambda: pack_signature(r, s)),
+        ('derive_account_address', lambda: derive_account_address(reference.vkey)),
+    ]
+    for name in sorted(BACKENDS):
+        backend = get_backend(name)
+        cases.append(('ecdsa_sign/' + name,
+                      lambda backend=backend: ecdsa_sign(reference.skey, message, backend=backend)))
+    return cases
+
+
+def measure(fn, seconds, alloc_samples):
+    """Operations per second over ``seconds``, and peak bytes allocated per operation"""
+    fn()
+    n = 0
+    batch = 1
+    start = time.time()
+    elapsed = 0.0
+    while elapsed < seconds:
+        for _ in range(batch):
+            fn()
+        n += batch
+        batch *= 2
+        elapsed = time.time() - start
+
+    peak = 0
+    for _ in range(alloc_samples):
+        tracemalloc.start()
+        fn()
+        peak += tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        'iterations': n,
+        'ops_per_sec': n / elapsed,
+        'mean_us': 1e6 * elapsed / n,
+        'peak_bytes': peak // alloc_samples,
+    }
+
+
+def run(seconds, alloc_samples, latency):
+    results = {}
+    for name, fn in _cases():
+        results[name] = measure(fn, seconds, alloc_samples)
+        print_result(name, results[name])
+
+    with MockNode(latency=latency) as node:
+        rpc = node.client()
+
+        amounts = itertools.count(1)
+
+        def submit():
+            # identical transfers would be rejected as duplicates
+            rpc.uplink_transfer_asset(reference.skey, reference.testAddr, reference.toAddr,
+                                      next(amounts), reference.assetAddr)
+
+        results['submit/transfer'] = measure(submit, seconds, alloc_samples)
+        print_result('submit/transfer', results['submit/transfer'])
+        rpc.close()
+    return results
+
+
+def print_result(name, result, baseline=None):
+    line = "{:<26} {:>12.1f} ops/s {:>12.2f} us/op {:>10} B/op".format(
+        name, result['ops_per_sec'], result['mean_us'], result['peak_bytes'])
+    if baseline is not None:
+        line += " {:>+8.1f}%".format(100.0 * (result['ops_per_sec'] / baseline['ops_per_sec'] - 1))
+    print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=0.5,
+                        help="minimum time spent timing each case")
+    parser.add_argument('--alloc-samples', type=int, default=5,
+                        help="operations traced for allocations per case")
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="seconds of latency added by the mock node")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    results = run(args.seconds, args.alloc_samples, args.latency)
+    report = {
+        'version': __version__,
+        'python': platform.python_version(),
+        'timestamp': int(time.time()),
+        'results': results,
+    }
+
+    if args.compare:
+        with open(args.compare) as fd:
+            baseline = json.load(fd)
+        print("\nops/s against {} ({}):".format(baseline['version'], args.compare))
+        for name in sorted(results):
+            if name in baseline['results']:
+                print_result(name, results[name], baseline['results'][name])
+
+    if args.output:
+        with open(args.output, 'w') as fd:
+            json.dump(report, fd, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Compare the installed JSON codecs on realistic uplink payloads.
+
+Payloads are shaped like ``/blocks``, ``/accounts`` and ``/contracts``
+responses and a Transaction request body:
+
+    $ python -m benchmarks.bench_codec --blocks 500 --repeat 20
+"""
+
+import sys
+import time
+import random
+import argparse
+
+from uplink.codec import CODECS, get_codec
+
+
+def _addr(rng):
+    alphabet = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+    return ''.join(rng.choice(alphabet) for _ in range(44))
+
+
+def _transaction(rng):
+    return {
+        "header": {
+            "tag": "TxAsset",
+            "contents": {
+                "tag": "Transfer",
+                "contents": {"assetAddr": _addr(rng), "toAddr": _addr(rng),
+                             "balance": rng.randint(1, 10 ** 9)},
+            },
+        },
+        "signature": "%064x%064x" % (rng.getrandbits(256), rng.getrandbits(256)),
+        "origin": _addr(rng),
+    }
+
+
+def blocks_payload(n_blocks, txs_per_block, rng):
+    blocks = [{
+        "index": i,
+        "header": {"origin": _addr(rng), "merkleRoot": "%064x" % rng.getrandbits(256),
+                   "timestamp": 1500000000000000 + i * 1000000, "prevHash": "%064x" % rng.getrandbits(256)},
+        "signatures": [{"signature": "%0128x" % rng.getrandbits(512), "signerAddr": _addr(rng)}],
+        "transactions": [_transaction(rng) for _ in range(txs_per_block)],
+    } for i in range(n_blocks)]
+    return {"tag": "RPCResp", "contents": blocks}
+
+
+def accounts_payload(n_accounts, rng):
+    accounts = [{
+        "publicKey": "%0128x" % rng.getrandbits(512),
+        "address": _addr(rng),
+        "timezone": "GMT",
+        "metadata": {"name": "account %i" % i, "region": "eu"},
+    } for i in range(n_accounts)]
+    return {"tag": "RPCResp", "contents": accounts}
+
+
+def contracts_payload(n_contracts, rng):
+    contracts = [{
+        "timestamp": 1500000000000000 + i,
+        "script": "global int x = 0;\ntransition initial -> terminal;\n" * 20,
+        "storage": {"x": {"tag": "VInt", "contents": i}, "rate": {"tag": "VFloat", "contents": 0.25}},
+        "methods": ["setX", "end"],
+        "state": "initial",
+        "owner": _addr(rng),
+        "address": _addr(rng),
+    } for i in range(n_contracts)]
+    return {"tag": "RPCResp", "contents": contracts}
+
+
+def timed(fn, arg, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        fn(arg)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--blocks', type=int, default=500)
+    parser.add_argument('--txs-per-block', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    reference = get_codec('json')
+    payloads = [
+        ('blocks', blocks_payload(args.blocks, args.txs_per_block, rng)),
+        ('accounts', accounts_payload(args.blocks * 4, rng)),
+        ('contracts', contracts_payload(args.blocks, rng)),
+        ('tx request', {"method": "Transaction", "params": _transaction(rng)}),
+    ]
+
+    print("{:<12} {:<8} {:>10} {:>12} {:>12}".format('payload', 'codec', 'bytes', 'loads ms', 'dumps ms'))
+    for name, payload in payloads:
+        data = reference.dumps(payload).encode('utf-8')
+        for codec_name in sorted(CODECS):
+            codec = get_codec(codec_name)
+            assert codec.loads(data) == payload
+            loads = timed(codec.loads, data, args.repeat)
+            dumps = timed(codec.dumps, payload, args.repeat)
+            print("{:<12} {:<8} {:>10} {:>12.3f} {:>12.3f}".format(
+                name, codec_name, len(data), 1000 * loads, 1000 * dumps))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
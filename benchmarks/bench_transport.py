@@ -0,0 +1,74 @@
+"""
+Compare per-call latency of a fresh connection per RPC (the module level
+``requests.post`` behaviour) against the pooled keep-alive transport.
+
+Runs against a local mock node so no uplink node is required:
+
+    $ python -m benchmarks.bench_transport --calls 2000 --threads 4
+"""
+
+import sys
+import time
+import argparse
+import threading
+
+import requests
+
+from uplink.transport import HTTPTransport
+from uplink.mock_node import MockNode
+
+
+class _UnpooledTransport(object):
+    """Baseline: one connection per request, as with ``requests.post``"""
+
+    def request(self, method, url, data=None, **kwargs):
+        return getattr(requests, method)(url, data=data, **kwargs)
+
+    def close(self):
+        pass
+
+
+def run(rpc, calls, threads):
+    per_thread = calls // threads
+
+    def worker():
+        for _ in range(per_thread):
+            rpc.uplink_version()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.time()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.time() - start
+    return per_thread * threads, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="seconds of latency added by the mock node")
+    args = parser.parse_args(argv)
+
+    node = MockNode(latency=args.latency).start()
+
+    cases = [
+        ('unpooled', _UnpooledTransport()),
+        ('pooled', HTTPTransport(pool_maxsize=args.threads)),
+    ]
+    for name, transport in cases:
+        rpc = node.client(transport=transport)
+        n, elapsed = run(rpc, args.calls, args.threads)
+        print("{:<10} {:>8} calls {:>8.3f}s {:>10.1f} calls/s {:>8.3f} ms/call".format(
+            name, n, elapsed, n / elapsed, 1000.0 * elapsed * args.threads / n))
+        rpc.close()
+
+    node.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
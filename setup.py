@@ -10,6 +10,7 @@ setup(name='Uplink SDK py',
       author_email='info@adjoint.io',
       license='All Rights Reserved',
       packages=["uplink"],
+      scripts=["bin/uplink-loadgen"],
       install_requires=[
           "requests == 2.20.0",
           "cryptography >= 1.7.1",
@@ -17,6 +18,7 @@ setup(name='Uplink SDK py',
           "pytest == 3.2.2",
           "pysha3 >= 1.0.2",
           "base58 == 0.2.5",
-          'typing'
+          'typing',
+          'futures; python_version < "3"'
       ]
       )
@@ -0,0 +1,67 @@
+import io
+import json
+import sys
+
+import requests
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+# Modules with coroutines are syntax errors on Python 2, and use asyncio.run
+collect_ignore = []
+if sys.version_info < (3, 7):
+    collect_ignore.extend(['test_aio.py', 'test_confirm_aio.py'])
+
+
+def make_response(body, status_code=200, stream=False):
+    """
+    A ``requests`` response with ``body``, JSON encoded unless it is bytes
+
+    :param stream: leave the body unread, to be streamed from ``response.raw``
+    """
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode()
+    response = requests.models.Response()
+    response.status_code = status_code
+    if stream:
+        response.raw = io.BytesIO(body)
+    else:
+        response._content = body
+        response._content_consumed = True
+    return response
+
+
+def refused():
+    """The error ``requests`` raises when nothing listens on the port"""
+    reason = NewConnectionError(None, "connection refused")
+    return RequestsConnectionError(MaxRetryError(None, "/", reason))
+
+
+class FakeTransport(object):
+    """
+    Transport answering every request with ``respond(url, data)``
+
+    ``respond`` is passed in or overridden by subclasses, and returns a
+    response or a body for :func:`make_response`, or raises. The requested
+    urls are kept in ``urls`` and the last request's keyword arguments in
+    ``kwargs``.
+    """
+
+    def __init__(self, respond=None):
+        if respond is not None:
+            self.respond = respond
+        self.urls = []
+        self.kwargs = None
+
+    def respond(self, url, data):
+        raise NotImplementedError
+
+    def request(self, method, url, data=None, **kwargs):
+        self.urls.append(url)
+        self.kwargs = kwargs
+        result = self.respond(url, data)
+        if isinstance(result, requests.models.Response):
+            return result
+        return make_response(result)
+
+    def close(self):
+        pass
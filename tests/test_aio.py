@@ -0,0 +1,92 @@
+import asyncio
+import inspect
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+
+from uplink.client import UplinkJsonRpc
+from uplink.aio import AsyncUplinkJsonRpc
+from uplink.exceptions import BadStatusCodeError
+
+
+def uplink_methods(cls):
+    return set(name for name in dir(cls) if name.startswith('uplink_'))
+
+
+def test_method_parity():
+    assert uplink_methods(AsyncUplinkJsonRpc) == uplink_methods(UplinkJsonRpc)
+    for name in uplink_methods(AsyncUplinkJsonRpc):
+        method = getattr(AsyncUplinkJsonRpc, name)
+        assert inspect.iscoroutinefunction(method) or inspect.isasyncgenfunction(method), name
+
+
+async def _serve_and_query(concurrency):
+    async def version(request):
+        await asyncio.sleep(0.01)
+        return web.json_response({"version": "0.0.0"})
+
+    async def missing(request):
+        return web.Response(status=404)
+
+    app = web.Application()
+    app.router.add_post('/version', version)
+    app.router.add_post('/blocks/99', missing)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    try:
+        async with AsyncUplinkJsonRpc('127.0.0.1', port, pool_maxsize=4) as rpc:
+            results = await asyncio.gather(*[rpc.uplink_version() for _ in range(concurrency)])
+            with pytest.raises(BadStatusCodeError):
+                await rpc.uplink_block(99)
+        return results
+    finally:
+        await runner.cleanup()
+
+
+def test_concurrent_requests_over_bounded_pool():
+    results = asyncio.run(_serve_and_query(200))
+    assert results == [{"version": "0.0.0"}] * 200
+
+
+BODY = b'{"tag": "RPCResp", "contents": []}'
+
+
+async def _serve_and_stream():
+    async def accounts(request):
+        return web.Response(body=BODY, content_type='application/json')
+
+    async def failing(request):
+        return web.Response(status=500, body=b'oops')
+
+    app = web.Application()
+    app.router.add_post('/accounts', accounts)
+    app.router.add_post('/assets', failing)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    try:
+        async with AsyncUplinkJsonRpc('127.0.0.1', port) as rpc:
+            assert [a async for a in rpc.uplink_iter_accounts()] == []
+            with pytest.raises(BadStatusCodeError):
+                [a async for a in rpc.uplink_iter_assets()]
+            return rpc.metrics.snapshot()
+    finally:
+        await runner.cleanup()
+
+
+def test_streamed_requests_are_recorded():
+    snapshot = asyncio.run(_serve_and_stream())
+    assert snapshot['accounts']['requests'] == 1
+    assert snapshot['accounts']['errors'] == 0
+    assert snapshot['accounts']['bytes_in'] == len(BODY)
+    assert snapshot['assets']['requests'] == 1
+    assert snapshot['assets']['errors'] == 1
@@ -0,0 +1,59 @@
+import time
+import random
+
+import pytest
+
+from uplink.protocol import Block
+from uplink.backfill import Backfill, chain_height
+from uplink.tailer import FileCheckpoint
+from uplink.exceptions import UplinkJsonRpcError, RpcConnectionFail
+
+
+class FakeRpc(object):
+    def __init__(self, n_blocks, fail_at=None):
+        self.n_blocks = n_blocks
+        self.fail_at = fail_at
+        self.calls = 0
+
+    def uplink_block(self, block_id):
+        self.calls += 1
+        if block_id == self.fail_at:
+            raise RpcConnectionFail('connection error:', None)
+        if block_id >= self.n_blocks:
+            raise UplinkJsonRpcError('RPCRespError', {'errorMsg': 'no block'})
+        time.sleep(random.uniform(0, 0.002))
+        header = {"origin": "a", "merkleRoot": "m", "timestamp": block_id, "prevHash": "p"}
+        return Block(header, [], block_id, [])
+
+
+@pytest.mark.parametrize('n_blocks', [0, 1, 2, 3, 17, 64, 1000])
+def test_chain_height(n_blocks):
+    rpc = FakeRpc(n_blocks)
+    assert chain_height(rpc) == n_blocks
+    assert rpc.calls <= 25
+    if n_blocks > 10:
+        assert chain_height(rpc, hint=10) == n_blocks
+
+
+def test_backfill_in_order():
+    progress = []
+    backfill = Backfill(FakeRpc(100), start=3, max_workers=4, range_size=7,
+                        progress=lambda stats: progress.append(stats.blocks))
+    assert [b.index for b in backfill] == list(range(3, 100))
+    assert progress[-1] == 97 and len(progress) == 14
+    assert backfill.stats.blocks_per_second > 0
+
+
+def test_backfill_resume(tmp_path):
+    path = str(tmp_path / 'backfill.json')
+    backfill = Backfill(FakeRpc(50, fail_at=23), end=50, range_size=5,
+                        checkpoint=FileCheckpoint(path))
+    seen = []
+    with pytest.raises(RpcConnectionFail):
+        backfill.run(lambda block: seen.append(block.index))
+    assert seen == list(range(20))
+    assert FileCheckpoint(path).load() == 20
+
+    backfill = Backfill(FakeRpc(50), range_size=5, checkpoint=FileCheckpoint(path))
+    assert [b.index for b in backfill] == list(range(20, 50))
+    assert FileCheckpoint(path).load() == 50
@@ -0,0 +1,41 @@
+import time
+import random
+
+from uplink.bulk import fetch_many
+from uplink.exceptions import UplinkJsonRpcError
+
+
+def lookup(key):
+    time.sleep(random.random() / 100)
+    if key % 7 == 0:
+        raise UplinkJsonRpcError("RPCRespError", {"errorMsg": "not found"})
+    return key * 2
+
+
+def test_ordered_results_with_errors():
+    results = list(fetch_many(lookup, range(50), max_workers=4))
+    assert [r.key for r in results] == list(range(50))
+    for r in results:
+        if r.key % 7 == 0:
+            assert r.value is None and isinstance(r.error, UplinkJsonRpcError)
+        else:
+            assert r.value == r.key * 2 and r.error is None
+
+
+def test_unordered_results():
+    results = list(fetch_many(lookup, iter(range(50)), max_workers=4, ordered=False))
+    assert sorted(r.key for r in results) == list(range(50))
+
+
+def test_bounded_window():
+    submitted = []
+
+    def keys():
+        for i in range(1000):
+            submitted.append(i)
+            yield i
+
+    results = fetch_many(lambda k: k, keys(), max_workers=2)
+    next(results)
+    assert len(submitted) <= 5
+    results.close()
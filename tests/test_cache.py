@@ -0,0 +1,170 @@
+import time
+
+from uplink.protocol import *
+from uplink.client import UplinkJsonRpc
+from uplink.cache import LRUCache, TTLCache, MISSING
+from uplink.transactions import touched_addresses
+from uplink.cryptography import ecdsa_new
+from uplink.fixtures import wait_until_tx_accepted
+from uplink.mock_node import MockNode
+
+from . import reference
+from .conftest import FakeTransport
+
+BLOCK = {
+    "index": 1,
+    "header": {"origin": "a", "merkleRoot": "m", "timestamp": 1, "prevHash": "p"},
+    "signatures": [],
+    "transactions": [],
+}
+
+
+class BlockTransport(FakeTransport):
+    def respond(self, url, data):
+        if url.endswith('/blocks/1'):
+            return {"tag": "RPCResp", "contents": BLOCK}
+        return {"tag": "RPCRespError", "contents": {}}
+
+
+def test_lru_entry_budget():
+    cache = LRUCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is MISSING
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats.snapshot() == dict(hits=3, misses=1, evictions=1, hit_rate=0.75)
+
+
+def test_lru_byte_budget():
+    cache = LRUCache(max_entries=None, max_bytes=100)
+    cache.put('a', 'x', size=60)
+    cache.put('b', 'y', size=30)
+    cache.put('c', 'z', size=30)
+    assert cache.get('a') is MISSING
+    assert cache.size == 60
+    cache.put('huge', 'w', size=101)
+    assert cache.get('huge') is MISSING and len(cache) == 2
+
+
+def test_client_block_cache():
+    transport = BlockTransport()
+    cache = LRUCache()
+    rpc = UplinkJsonRpc(transport=transport, block_cache=cache)
+    assert rpc.uplink_block(1).index == 1
+    assert rpc.uplink_block(1).index == 1
+    assert len(transport.urls) == 1
+    assert cache.stats.hits == 1
+
+    # errors (e.g. a block that does not exist yet) are never cached
+    for _ in range(2):
+        try:
+            rpc.uplink_block(2)
+        except Exception:
+            pass
+    assert len(transport.urls) == 3
+
+
+def test_ttl_expiry_and_invalidation():
+    cache = TTLCache(ttl={'asset': 0.05, 'account': 10})
+    cache.put(('asset', 'gold'), 1)
+    cache.put(('account', 'alice'), 2)
+    cache.put(('contract', 'c'), 3)
+    assert cache.get(('asset', 'gold')) == 1
+    assert cache.get(('contract', 'c')) is MISSING
+
+    time.sleep(0.06)
+    assert cache.get(('asset', 'gold')) is MISSING
+    assert cache.get(('account', 'alice')) == 2
+    cache.invalidate_address('alice')
+    assert cache.get(('account', 'alice')) is MISSING
+
+
+def test_touched_addresses():
+    tx = reference.testTx(TxAsset, Transfer, reference.testTransfer)
+    assert touched_addresses(tx) == [('asset', reference.assetAddr)]
+
+    call = reference.testTx(TxContract, Call, reference.testCall([VAsset(reference.toAddr), VBool(True)]))
+    assert touched_addresses(call) == [('contract', reference.testAddr), ('callable', reference.testAddr),
+                                       ('asset', reference.toAddr)]
+
+    create = reference.testTx(TxContract, CreateContract, reference.testCreateContract)
+    assert touched_addresses(create) == []
+
+
+class AssetTransport(FakeTransport):
+    def respond(self, url, data):
+        if data:
+            return {"tag": "RPCTransactionOK", "txHash": "abc"}
+        return {"tag": "RPCResp", "contents": {"errorMsg": "unknown"}}
+
+
+def test_client_state_cache_invalidated_by_transfer():
+    transport = AssetTransport()
+    cache = TTLCache(ttl=60)
+    cache.put(('asset', reference.assetAddr), {"tag": "RPCResp", "contents": {}})
+    rpc = UplinkJsonRpc(transport=transport, state_cache=cache)
+
+    rpc.uplink_transfer_asset(reference.skey, reference.testAddr, reference.toAddr, 1, reference.assetAddr)
+    assert cache.get(('asset', reference.assetAddr)) is MISSING
+
+    # lookups of unknown assets are not cached
+    assert rpc.uplink_get_asset(reference.assetAddr) is False
+    assert rpc.uplink_get_asset(reference.assetAddr) is False
+    assert len(transport.urls) == 3
+
+
+def test_ttl_hold_and_release():
+    cache = TTLCache(ttl=60)
+    key = ('asset', 'a')
+    cache.put(key, 1)
+    before = time.time()
+    cache.hold([key])
+    assert cache.get(key) is MISSING
+
+    cache.put(key, 2, started=time.time())
+    assert cache.get(key) is MISSING
+
+    cache.release([key])
+    # read while the transaction was pending
+    cache.put(key, 3, started=before)
+    assert cache.get(key) is MISSING
+    cache.put(key, 4, started=time.time())
+    assert cache.get(key) == 4
+
+
+def test_ttl_nested_holds():
+    cache = TTLCache(ttl=60)
+    key = ('account', 'a')
+    cache.hold([key])
+    cache.hold([key])
+    cache.release([key])
+    cache.put(key, 1, started=time.time())
+    assert cache.get(key) is MISSING
+    cache.release([key])
+    cache.put(key, 1, started=time.time())
+    assert cache.get(key) == 1
+
+
+def test_client_state_cache_not_filled_while_pending():
+    with MockNode(block_interval=0.3) as node:
+        rpc = node.client()
+        pk, sk = ecdsa_new()
+        tx_hash, alice = rpc.uplink_create_account(sk, pk, metadata={}, timezone="GMT")
+        wait_until_tx_accepted(rpc, tx_hash)
+        tx_hash, asset = rpc.uplink_create_asset(sk, alice, "gold", 1000, "Discrete", "Token", alice)
+        wait_until_tx_accepted(rpc, tx_hash)
+
+        cache = TTLCache(ttl=60)
+        rpc.state_cache = cache
+        key = ('asset', asset)
+        future = rpc.uplink_circulate_asset(sk, alice, 500, asset, future=True)
+        # read before the block with the circulation is committed
+        assert rpc.uplink_get_asset(asset).supply['decimalIntegerValue'] == 1000
+        assert cache.get(key) is MISSING
+
+        future.result(5)
+        assert rpc.uplink_get_asset(asset).supply['decimalIntegerValue'] == 500
+        assert cache.get(key) is not MISSING
+        rpc.close()
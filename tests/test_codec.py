@@ -0,0 +1,74 @@
+import os
+import json
+
+import pytest
+
+from uplink.codec import CODECS, JsonCodec, get_codec, canonical_dumps
+from uplink.client import UplinkJsonRpc
+from uplink.protocol import TxAsset, Transfer
+
+from . import reference
+
+GOLDEN = os.path.join(os.path.dirname(__file__), 'golden')
+
+PAYLOADS = [
+    {"tag": "RPCResp", "contents": [{"index": 1, "timestamp": 1.5e15, "name": u"café ☃"}]},
+    [0, -1, 2 ** 63 - 1, -2 ** 63, 0.1, 1e-7, True, False, None, "", "\"\\/"],
+    {"nested": {"list": [[], {}], "escape": "\n\t\u0000"}},
+]
+
+
+@pytest.fixture(params=sorted(CODECS))
+def codec(request):
+    return get_codec(request.param)
+
+
+@pytest.mark.parametrize('payload', PAYLOADS)
+def test_round_trip(codec, payload):
+    text = codec.dumps(payload)
+    assert json.loads(text) == payload
+    assert codec.loads(text) == payload
+    assert codec.loads(text.encode('utf-8')) == payload
+
+
+def test_golden_files_decode_identically(codec):
+    for fname in sorted(os.listdir(GOLDEN)):
+        if fname.endswith('.json'):
+            with open(os.path.join(GOLDEN, fname), 'rb') as fd:
+                data = fd.read()
+            assert codec.loads(data) == json.loads(data.decode('utf-8'))
+
+
+def test_big_integers(codec):
+    big = [123456789012345678901234567890]
+    assert json.loads(codec.dumps(big)) == big
+    assert get_codec('json').loads(b'[123456789012345678901234567890]') == big
+
+
+def test_default_codec_is_exact():
+    big = 123456789012345678901234567890
+    assert get_codec().name == 'json'
+    assert UplinkJsonRpc().codec.loads(b'{"balance": %d}' % big) == {"balance": big}
+
+
+def test_malformed_input(codec):
+    with pytest.raises(ValueError):
+        codec.loads(b'{"tag": ')
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        get_codec('nope')
+
+
+def test_canonical_serialization_is_stdlib():
+    tx = reference.testTx(TxAsset, Transfer, reference.testTransfer)
+    assert tx.to_json() == json.dumps(tx.to_dict(), sort_keys=True)
+    assert canonical_dumps({"b": 1, "a": [1.5]}, indent=4) == json.dumps({"b": 1, "a": [1.5]}, sort_keys=True, indent=4)
+
+
+def test_client_codec():
+    assert UplinkJsonRpc().codec.name == get_codec().name
+    rpc = UplinkJsonRpc(codec=JsonCodec())
+    data = rpc._make_cmd_data('Transaction', {"a": 1})
+    assert data == json.dumps({'method': 'Transaction', 'params': {"a": 1}})
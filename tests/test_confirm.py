@@ -0,0 +1,180 @@
+import time
+import threading
+
+import pytest
+
+from uplink.client import UplinkJsonRpc
+from uplink.confirm import ConfirmationTracker
+from uplink.exceptions import TransactionNonExistent, RpcConnectionFail, UplinkJsonRpcError
+from uplink.fixtures import wait_until_tx_processed, wait_until_tx_accepted
+from uplink.exceptions import TransactionRejected
+from uplink.cryptography import ecdsa_new, derive_contract_address
+
+from .conftest import FakeTransport
+
+
+class FakeRpc(object):
+    """Transaction i is Pending for i polls, then reaches its final status"""
+
+    def __init__(self, final):
+        self.final = final
+        self.polls = {}
+        self.lock = threading.Lock()
+
+    def uplink_get_transaction_status(self, tx_hash):
+        with self.lock:
+            n = self.polls[tx_hash] = self.polls.get(tx_hash, 0) + 1
+        kind, pending_polls = self.final[tx_hash]
+        if n <= pending_polls:
+            return "Pending"
+        if kind == "NonExistent":
+            raise TransactionNonExistent(tx_hash)
+        if kind == "Error":
+            raise RpcConnectionFail('connection error:', None)
+        if kind == "BadRequest":
+            raise UplinkJsonRpcError('RPCRespError', None)
+        return kind
+
+
+class FlakyRpc(FakeRpc):
+    """Status queries fail with a connection error for the first polls"""
+
+    def uplink_get_transaction_status(self, tx_hash):
+        with self.lock:
+            n = self.polls[tx_hash] = self.polls.get(tx_hash, 0) + 1
+        kind, failing_polls = self.final[tx_hash]
+        if n <= failing_polls:
+            raise RpcConnectionFail('connection error:', None)
+        return kind
+
+
+class BlockRpc(object):
+    """Every transaction is Pending until the next block, at confirm_at"""
+
+    def __init__(self, confirm_at):
+        self.confirm_at = confirm_at
+        self.queries = 0
+        self.lock = threading.Lock()
+
+    def uplink_get_transaction_status(self, tx_hash):
+        with self.lock:
+            self.queries += 1
+        return "Accepted" if time.time() >= self.confirm_at else "Pending"
+
+
+def test_as_completed_resolves_every_hash():
+    final = dict(('tx%i' % i, ("Accepted", i % 4)) for i in range(200))
+    final['rejected'] = ({"tag": "Rejected", "contents": "bad"}, 1)
+    final['missing'] = ("NonExistent", 0)
+    rpc = FakeRpc(final)
+    tracker = ConfirmationTracker(rpc, initial_interval=0.001, max_interval=0.01, max_workers=4)
+
+    statuses = list(tracker.as_completed(final, timeout=10))
+    assert sorted(s.tx_hash for s in statuses) == sorted(final)
+    by_hash = dict((s.tx_hash, s) for s in statuses)
+    assert by_hash['rejected'].status == 'Rejected'
+    assert by_hash['rejected'].detail == {"tag": "Rejected", "contents": "bad"}
+    assert by_hash['missing'].status == 'NonExistent'
+    assert by_hash['tx3'].polls == 4
+    assert len(tracker) == 0
+    assert tracker.confirm_time is not None
+    tracker.close()
+
+
+def test_polling_backs_off():
+    rpc = FakeRpc({'slow': ("Accepted", 1000)})
+    tracker = ConfirmationTracker(rpc, initial_interval=0.01, max_interval=0.05, backoff=2)
+    future = tracker.track('slow')
+    assert tracker.track('slow') is future
+    time.sleep(0.3)
+    # 10ms, 20ms, 40ms, then every 50ms
+    assert 4 <= rpc.polls['slow'] <= 9
+    tracker.close()
+    assert future.cancelled()
+    with pytest.raises(RuntimeError):
+        tracker.track('other')
+
+
+def test_transient_errors_are_retried():
+    rpc = FlakyRpc({'tx': ("Accepted", 3)})
+    tracker = ConfirmationTracker(rpc, initial_interval=0.001, max_interval=0.01)
+    status = tracker.wait('tx', timeout=5)
+    assert status.status == 'Accepted' and status.polls == 4
+    tracker.close()
+
+
+def test_errors_resolve_future():
+    tracker = ConfirmationTracker(FakeRpc({'tx': ("Error", 0), 'bad': ("BadRequest", 0)}),
+                                  initial_interval=0.001, max_interval=0.01, timeout=0.1)
+    # not before the transient errors have lasted the tracker's timeout
+    started = time.time()
+    with pytest.raises(RpcConnectionFail):
+        tracker.wait('tx', timeout=5)
+    assert time.time() - started >= 0.1
+    with pytest.raises(UplinkJsonRpcError):
+        tracker.wait('bad', timeout=5)
+    assert tracker.rpc.polls['bad'] == 1
+    tracker.close()
+
+
+def test_batches_stop_at_pending_transactions():
+    rpc = BlockRpc(time.time() + 0.3)
+    tracker = ConfirmationTracker(rpc, initial_interval=0.01, max_interval=0.05, max_workers=2)
+    hashes = ['tx%i' % i for i in range(100)]
+    statuses = list(tracker.as_completed(hashes, timeout=5))
+    assert len(statuses) == 100
+    # polled one by one, every hash would be queried about 9 times
+    assert rpc.queries < 300
+    tracker.close()
+
+
+def test_as_completed_duplicates():
+    tracker = ConfirmationTracker(FakeRpc({'a': ("Accepted", 0), 'b': ("Accepted", 1)}),
+                                  initial_interval=0.001)
+    statuses = list(tracker.as_completed(['a', 'b', 'a'], timeout=5))
+    assert sorted(s.tx_hash for s in statuses) == ['a', 'b']
+    tracker.close()
+
+
+def test_fixtures_use_client_tracker():
+    rpc = UplinkJsonRpc()
+    rpc.uplink_get_transaction_status = FakeRpc({'ok': ("Accepted", 2), 'no': ("Rejected", 0)}) \
+        .uplink_get_transaction_status
+    assert wait_until_tx_processed(rpc, 'ok') == 'Accepted'
+    with pytest.raises(TransactionRejected):
+        wait_until_tx_accepted(rpc, 'no')
+    assert rpc.confirmations is rpc.confirmations
+    rpc.close()
+
+
+def test_confirm_futures():
+    rpc = FakeRpc({'ok': ("Accepted", 1), 'rej': ("Rejected", 0), 'gone': ("NonExistent", 0)})
+    tracker = ConfirmationTracker(rpc, initial_interval=0.001)
+    ok, rej, gone = [tracker.confirm(h, result=h.upper()) for h in ('ok', 'rej', 'gone')]
+    assert ok.tx_hash == 'ok'
+    assert ok.result(5) == 'OK'
+    with pytest.raises(TransactionRejected):
+        rej.result(5)
+    with pytest.raises(TransactionNonExistent):
+        gone.result(5)
+    tracker.close()
+
+
+class TxTransport(FakeTransport):
+    def respond(self, url, data):
+        return {"tag": "RPCTransactionOK", "txHash": "h1"}
+
+
+def test_client_future_option():
+    rpc = UplinkJsonRpc(transport=TxTransport())
+    rpc.uplink_get_transaction_status = FakeRpc({'h1': ("Accepted", 1)}).uplink_get_transaction_status
+    pk, sk = ecdsa_new()
+
+    assert rpc.uplink_transfer_asset(sk, 'from', 'to', 10, 'asset') == 'h1'
+    future = rpc.uplink_transfer_asset(sk, 'from', 'to', 10, 'asset', future=True)
+    assert future.tx_hash == 'h1'
+    assert future.result(5) == 'h1'
+
+    future = rpc.uplink_create_contract(sk, 'from', 'script', future=True)
+    assert future.result(5) == ('h1', derive_contract_address('h1'))
+    rpc.close()
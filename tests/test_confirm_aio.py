@@ -0,0 +1,18 @@
+import asyncio
+
+from uplink.client import UplinkJsonRpc
+from uplink.cryptography import ecdsa_new
+
+from .test_confirm import FakeRpc, TxTransport
+
+
+def test_await_client_future():
+    rpc = UplinkJsonRpc(transport=TxTransport())
+    rpc.uplink_get_transaction_status = FakeRpc({'h1': ("Accepted", 1)}).uplink_get_transaction_status
+    pk, sk = ecdsa_new()
+    future = rpc.uplink_transfer_asset(sk, 'from', 'to', 10, 'asset', future=True)
+
+    async def main():
+        return await asyncio.wrap_future(future)
+    assert asyncio.run(main()) == 'h1'
+    rpc.close()
@@ -0,0 +1,67 @@
+import time
+import threading
+
+import pytest
+
+from uplink.client import UplinkJsonRpc
+from uplink.bulk import fetch_many
+from uplink.deadline import deadline, current_deadline
+from uplink.exceptions import DeadlineExceeded
+
+
+class RecordingTransport(object):
+    def __init__(self):
+        self.timeouts = []
+
+    def request(self, method, url, data=None, timeout=None):
+        self.timeouts.append(timeout)
+        raise AssertionError("not expected to reach the node")
+
+
+def test_nested_deadlines_only_shorten():
+    with deadline(10) as outer:
+        with deadline(60) as inner:
+            assert inner is outer
+        with deadline(1) as inner:
+            assert current_deadline() is inner
+        assert current_deadline() is outer
+    assert current_deadline() is None
+
+
+def test_timeouts():
+    rpc = UplinkJsonRpc(connect_timeout=1, read_timeout=5)
+    assert rpc._timeout() == (1, 5)
+    with rpc.timeouts(read=0.5):
+        assert rpc._timeout() == (1, 0.5)
+    assert rpc._timeout() == (1, 5)
+    with deadline(2):
+        connect, read = rpc._timeout()
+        assert connect == 1 and 1.5 < read <= 2
+
+
+def test_expired_deadline_stops_calls():
+    transport = RecordingTransport()
+    rpc = UplinkJsonRpc(transport=transport)
+    with deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            rpc.uplink_accounts()
+    assert transport.timeouts == []
+
+
+def test_deadline_propagates_to_bulk_workers():
+    seen = []
+    lock = threading.Lock()
+
+    def lookup(key):
+        with lock:
+            seen.append(current_deadline())
+        time.sleep(0.01)
+        return key
+
+    with deadline(0.05) as d:
+        with pytest.raises(DeadlineExceeded):
+            for _ in fetch_many(lookup, range(1000), max_workers=2):
+                pass
+    assert seen and all(s is d for s in seen)
+    assert len(seen) < 1000
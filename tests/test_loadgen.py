@@ -0,0 +1,74 @@
+import pytest
+
+from uplink.loadgen import AccountPool, LoadGenerator, parse_mix, main
+from uplink.mock_node import MockNode
+
+
+@pytest.fixture(scope='module')
+def node():
+    with MockNode(block_interval=0.01) as node:
+        yield node
+
+
+@pytest.fixture(scope='module')
+def pool(node):
+    rpc = node.client()
+    pool = AccountPool.provision(rpc, 3, holdings=100)
+    rpc.close()
+    return pool
+
+
+def test_parse_mix():
+    assert parse_mix("transfer=8,read=2") == {'transfer': 8.0, 'read': 2.0}
+    assert parse_mix("call") == {'call': 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("mint=1")
+
+
+def test_provision(node, pool):
+    assert len(pool) == 3
+    holdings = node.ledger.assets[pool.asset_address]['holdings']
+    assert sorted(h['decimalIntegerValue'] for h in holdings.values()) == [100, 100, 100]
+    assert pool.contract_address in node.ledger.contracts
+
+
+def test_pool_save_and_load(pool, tmpdir):
+    path = str(tmpdir.join('pool.json'))
+    pool.save(path)
+    loaded = AccountPool.load(path)
+    assert [a for _, a in loaded.accounts] == [a for _, a in pool.accounts]
+    assert loaded.accounts[0][0].to_string() == pool.accounts[0][0].to_string()
+    assert (loaded.asset_address, loaded.contract_address) == (pool.asset_address, pool.contract_address)
+
+
+def test_closed_loop_run(node, pool):
+    rpc = node.client()
+    reports = []
+    generator = LoadGenerator(rpc, pool, concurrency=2, interval=0.25, report=reports.append)
+    summary = generator.run(1.0)
+    assert len(reports) >= 3
+    assert summary['submitted'] > 0
+    assert summary['accepted'] + summary['rejected'] == summary['submitted']
+    assert summary['errors'] == 0
+    assert summary['submit_latency']['p50'] > 0
+    assert summary['confirm_latency']['p99'] >= summary['confirm_latency']['p50']
+    rpc.close()
+
+
+def test_rate_limited_run(node, pool):
+    rpc = node.client()
+    generator = LoadGenerator(rpc, pool, rate=10, concurrency=4, mix={'read': 1})
+    summary = generator.run(1.0)
+    assert 5 <= summary['reads'] <= 12
+    assert summary['submitted'] == 0
+    rpc.close()
+
+
+def test_cli(node, pool, tmpdir, capsys):
+    path = str(tmpdir.join('pool.json'))
+    pool.save(path)
+    out = str(tmpdir.join('summary.json'))
+    assert main(['--host', node.host, '--port', str(node.port), '--pool', path, '--duration', '0.5',
+                 '--concurrency', '1', '--mix', 'read', '--json', out]) == 0
+    assert 'total' in capsys.readouterr().out
+    assert tmpdir.join('summary.json').check()
@@ -0,0 +1,160 @@
+import random
+
+import pytest
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from uplink.client import UplinkJsonRpc
+from uplink.exceptions import RpcConnectionFail, BadStatusCodeError, BadJsonError
+from uplink.metrics import Histogram, MetricsRegistry, normalize_endpoint, payload_size
+
+from .conftest import FakeTransport, make_response
+
+ADDRESS = "43WRxMNcnYgZFcE36iohqrXKQdajUdAxeSn9mzE1ZedB"
+
+
+class StubTransport(FakeTransport):
+
+    def __init__(self, status_code=200, fail=False, content=None):
+        super(StubTransport, self).__init__()
+        self.status_code = status_code
+        self.fail = fail
+        self.content = content
+
+    def respond(self, url, data):
+        if self.fail:
+            raise RequestsConnectionError("connection refused")
+        if self.content is not None:
+            body = self.content
+        elif data and 'Transaction' in data:
+            body = {"tag": "RPCTransactionOK", "txHash": "abc"}
+        else:
+            body = {"tag": "RPCResp", "contents": {"version": "1.0"}}
+        return make_response(body, self.status_code)
+
+
+@pytest.mark.parametrize('endpoint, data, label', [
+    ('blocks', '', 'blocks'),
+    ('blocks/42', '', 'blocks/{index}'),
+    ('accounts/' + ADDRESS, '', 'accounts/{address}'),
+    ('contracts/{}/callable'.format(ADDRESS), '', 'contracts/{address}/callable'),
+    ('', '{"method": "Transaction", "params": {}}', 'Transaction'),
+    ('', '', '/'),
+])
+def test_normalize_endpoint(endpoint, data, label):
+    assert normalize_endpoint(endpoint, data) == label
+
+
+def test_histogram_percentiles_within_precision():
+    rng = random.Random(0)
+    values = sorted(rng.expovariate(1 / 0.02) for _ in range(10000))
+    hist = Histogram()
+    for value in values:
+        hist.record(value)
+    assert hist.count == len(values)
+    for p in (50, 90, 99):
+        exact = values[int(len(values) * p / 100.0) - 1]
+        assert hist.percentile(p) == pytest.approx(exact, rel=0.02)
+    assert hist.percentile(100) == max(values)
+
+
+def test_histogram_merge():
+    a, b = Histogram(), Histogram()
+    for i in range(100):
+        a.record(0.001)
+        b.record(0.1)
+    a.merge(b)
+    assert a.count == 200
+    assert a.percentile(25) == pytest.approx(0.001, rel=0.02)
+    assert a.percentile(75) == pytest.approx(0.1, rel=0.02)
+    assert a.min == 0.001 and a.max == 0.1
+
+
+def test_empty_snapshot():
+    assert Histogram().percentiles(50, 99) == [0.0, 0.0]
+    assert MetricsRegistry().snapshot() == {}
+
+
+def test_client_records_requests():
+    rpc = UplinkJsonRpc(transport=StubTransport())
+    for _ in range(3):
+        rpc.uplink_version()
+    rpc._call(endpoint='accounts/' + ADDRESS)
+    rpc._call(rpc._make_cmd_data("Transaction", {}), idempotent=False)
+
+    snapshot = rpc.metrics.snapshot()
+    assert sorted(snapshot) == ['Transaction', 'accounts/{address}', 'version']
+    version = snapshot['version']
+    assert version['requests'] == 3
+    assert version['errors'] == 0
+    assert version['bytes_in'] > 0
+    assert snapshot['Transaction']['bytes_out'] > 0
+    assert 0 <= version['p50'] <= version['p90'] <= version['p99'] <= version['max']
+
+
+def test_client_records_errors_and_calls_hooks():
+    calls = []
+    metrics = MetricsRegistry()
+    metrics.add_hook(lambda *args: calls.append(args))
+
+    rpc = UplinkJsonRpc(transport=StubTransport(status_code=500), metrics=metrics)
+    with pytest.raises(BadStatusCodeError):
+        rpc.uplink_version()
+    rpc.transport = StubTransport(fail=True)
+    with pytest.raises(RpcConnectionFail):
+        rpc.uplink_version()
+
+    assert metrics.snapshot()['version']['errors'] == 2
+    assert [(c[0], type(c[4])) for c in calls] == [
+        ('version', BadStatusCodeError), ('version', RequestsConnectionError)]
+
+
+def test_failing_hook_does_not_fail_request():
+    def hook(*args):
+        raise ValueError('boom')
+
+    calls = []
+    rpc = UplinkJsonRpc(transport=StubTransport())
+    rpc.metrics.add_hook(hook)
+    rpc.metrics.add_hook(lambda *args: calls.append(args))
+    rpc.uplink_version()
+
+    assert rpc.metrics.snapshot()['version']['requests'] == 1
+    assert len(calls) == 1
+
+
+def test_payload_size():
+    assert payload_size(None) == payload_size('') == 0
+    assert payload_size(b'\xe2\x98\x83') == 3
+    assert payload_size(u'caf\xe9 \u2603') == 9
+
+
+def test_bytes_out_counts_encoded_bytes():
+    rpc = UplinkJsonRpc(transport=StubTransport())
+    data = u'{"method": "Transaction", "params": {"name": "caf\xe9 \u2603"}}'
+    rpc._call(data, idempotent=False)
+    assert rpc.metrics.snapshot()['Transaction']['bytes_out'] == len(data.encode('utf-8'))
+
+
+def test_bad_json_counts_as_error():
+    calls = []
+    rpc = UplinkJsonRpc(transport=StubTransport(content=b'{"tag": '))
+    rpc.metrics.add_hook(lambda *args: calls.append(args))
+    with pytest.raises(BadJsonError):
+        rpc.uplink_version()
+    with pytest.raises(BadJsonError):
+        list(rpc._iter_call('accounts', dict))
+
+    snapshot = rpc.metrics.snapshot()
+    assert snapshot['version']['requests'] == 1
+    assert snapshot['version']['errors'] == 1
+    assert snapshot['accounts']['errors'] == 1
+    assert len(calls) == 2
+
+
+def test_shared_registry():
+    metrics = MetricsRegistry()
+    for _ in range(2):
+        UplinkJsonRpc(transport=StubTransport(), metrics=metrics).uplink_version()
+    assert metrics.snapshot()['version']['requests'] == 2
+    metrics.reset()
+    assert metrics.snapshot() == {}
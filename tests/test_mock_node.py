@@ -0,0 +1,136 @@
+import time
+
+import pytest
+
+from uplink.cryptography import ecdsa_new
+from uplink.exceptions import UplinkJsonRpcError, TransactionRejected
+from uplink.fixtures import wait_until_tx_accepted, wait_until_tx_processed
+from uplink.mock_node import MockNode
+from uplink.protocol import VAsset
+
+
+@pytest.fixture
+def node():
+    with MockNode(block_interval=0.01) as node:
+        yield node
+
+
+@pytest.fixture
+def rpc(node):
+    rpc = node.client()
+    yield rpc
+    rpc.close()
+
+
+def new_account(rpc):
+    pk, sk = ecdsa_new()
+    tx_hash, address = rpc.uplink_create_account(sk, pk, metadata={"name": "test"}, timezone="GMT")
+    wait_until_tx_accepted(rpc, tx_hash)
+    return sk, address
+
+
+def test_version_and_peers(rpc):
+    assert rpc.uplink_version()['commit'] == 'mock'
+    assert len(rpc.uplink_peers()) == 1
+    assert len(rpc.uplink_validators()) == 1
+
+
+def test_accounts(rpc):
+    sk, address = new_account(rpc)
+    account = rpc.uplink_get_account(address)
+    assert account.address == address
+    assert account.metadata == {"name": "test"}
+    assert [a.address for a in rpc.uplink_accounts()] == [address]
+    with pytest.raises(UplinkJsonRpcError):
+        rpc.uplink_get_account("missing")
+
+
+def test_asset_circulate_and_transfer(rpc):
+    alice_sk, alice = new_account(rpc)
+    bob_sk, bob = new_account(rpc)
+
+    tx_hash, asset_address = rpc.uplink_create_asset(alice_sk, alice, "gold", 1000, "Discrete",
+                                                     "Token", alice)
+    wait_until_tx_accepted(rpc, tx_hash)
+    wait_until_tx_accepted(rpc, rpc.uplink_circulate_asset(alice_sk, alice, 500, asset_address))
+    wait_until_tx_accepted(rpc, rpc.uplink_transfer_asset(alice_sk, alice, bob, 200, asset_address))
+
+    asset = rpc.uplink_get_asset(asset_address)
+    assert asset.name == "gold"
+    assert asset.supply['decimalIntegerValue'] == 500
+    assert asset.holdings[alice]['decimalIntegerValue'] == 300
+    assert asset.holdings[bob]['decimalIntegerValue'] == 200
+
+    # bob cannot move more than he holds
+    tx_hash = rpc.uplink_transfer_asset(bob_sk, bob, alice, 201, asset_address)
+    with pytest.raises(TransactionRejected):
+        wait_until_tx_accepted(rpc, tx_hash)
+    assert rpc.uplink_get_invalid_transaction(tx_hash)['reason'] == "insufficient holdings"
+    assert len(rpc.uplink_get_invalid_transactions()) == 1
+
+
+def test_unknown_origin_rejected(rpc):
+    pk, sk = ecdsa_new()
+    tx_hash = rpc.uplink_create_contract(sk, "nobody", "transition initial -> terminal;")[0]
+    assert wait_until_tx_processed(rpc, tx_hash) == 'Rejected'
+
+
+def test_contracts_and_call(rpc):
+    sk, address = new_account(rpc)
+    tx_hash, contract_address = rpc.uplink_create_contract(sk, address, "script")
+    wait_until_tx_accepted(rpc, tx_hash)
+    contract = rpc.uplink_get_contract(contract_address)
+    assert contract.owner == address and contract.state == 'initial'
+    assert [c.address for c in rpc.uplink_iter_contracts()] == [contract_address]
+    wait_until_tx_accepted(rpc, rpc.uplink_call_contract(sk, address, contract_address, "f", [VAsset("a")]))
+
+
+def test_blocks_and_mempool():
+    with MockNode(block_interval=3600) as node:
+        rpc = node.client()
+        pk, sk = ecdsa_new()
+        tx_hash, address = rpc.uplink_create_account(sk, pk)
+        assert rpc.uplink_get_transaction_status(tx_hash) == 'Pending'
+        mempool = rpc.uplink_get_mempool()
+        assert mempool.size == 1 and len(mempool.transactions) == 1
+        assert rpc.uplink_get_mempool_size() == {'size': 1}
+
+        block = node.ledger.commit()
+        assert block['index'] == 1
+        assert rpc.uplink_get_transaction_status(tx_hash) == 'Accepted'
+        assert [b.index for b in rpc.uplink_blocks()] == [0, 1]
+        assert len(rpc.uplink_transactions(1)) == 1
+        assert rpc.uplink_block(1).header.prevHash
+        assert rpc.uplink_get_mempool().size == 0
+        rpc.close()
+
+
+def test_immediate_commit_and_reset():
+    with MockNode(block_interval=0) as node:
+        rpc = node.client()
+        pk, sk = ecdsa_new()
+        tx_hash, address = rpc.uplink_create_account(sk, pk)
+        assert rpc.uplink_get_transaction_status(tx_hash) == 'Accepted'
+        rpc.uplink_reset_db(sk, pk)
+        assert rpc.uplink_accounts() == []
+        rpc.close()
+
+
+def test_simulation(rpc):
+    sk, address = new_account(rpc)
+    sim_key = rpc.uplink_sim_create(address, "script")["simKey"]
+    assert rpc.uplink_sim_update_set_time(sim_key, "2018-02-02T00:00:00+00:00")['tag'] == 'RPCRespOK'
+    contract = rpc.uplink_sim_query_contract(sim_key)
+    assert contract.timestamp == "2018-02-02T00:00:00+00:00"
+    assert contract.owner == address
+    with pytest.raises(ValueError):
+        rpc.uplink_sim_query_asset(sim_key, "missing")
+
+
+def test_latency():
+    with MockNode(latency=0.05, block_interval=0) as node:
+        rpc = node.client()
+        start = time.time()
+        rpc.uplink_version()
+        assert time.time() - start >= 0.05
+        rpc.close()
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from uplink.client import UplinkJsonRpc
+from uplink.cryptography import ecdsa_new
+from uplink.phases import PhaseTimer, phase, current_record
+
+from .conftest import FakeTransport
+
+
+class TxTransport(FakeTransport):
+    def __init__(self, delay=0.0, status="Accepted"):
+        super(TxTransport, self).__init__()
+        self.delay = delay
+        self.status = status
+
+    def respond(self, url, data):
+        time.sleep(self.delay)
+        if url.endswith('transactions/status/h1'):
+            return {"tag": "RPCResp", "contents": self.status}
+        return {"tag": "RPCTransactionOK", "txHash": "h1"}
+
+
+def test_phase_without_transaction_is_noop():
+    assert current_record() is None
+    with phase('sign'):
+        pass
+
+
+def test_nested_phases_are_exclusive():
+    timer = PhaseTimer()
+    with timer.transaction() as record:
+        with phase('http'):
+            time.sleep(0.02)
+            with phase('encode'):
+                time.sleep(0.02)
+        record.tx_type = 'Transfer'
+    durations = record.durations
+    assert 0.015 < durations['http'] < 0.035
+    assert 0.015 < durations['encode'] < 0.035
+    assert timer.report()['Transfer']['http']['count'] == 1
+
+
+def test_client_phases_per_tx_type():
+    timer = PhaseTimer()
+    rpc = UplinkJsonRpc(transport=TxTransport(delay=0.01), phase_timer=timer)
+    pk, sk = ecdsa_new()
+    for _ in range(3):
+        rpc.uplink_transfer_asset(sk, 'from', 'to', 10, 'asset')
+    rpc.uplink_create_contract(sk, 'from', 'script')
+
+    report = timer.report()
+    assert sorted(report) == ['CreateContract', 'Transfer']
+    transfer = report['Transfer']
+    assert sorted(transfer) == ['build', 'encode', 'http', 'pack', 'sign', 'to_dict']
+    assert all(row['count'] == 3 for row in transfer.values())
+    assert transfer['http']['mean'] >= 0.01
+    assert sum(row['share'] for row in transfer.values()) == pytest.approx(1.0)
+    assert 'Transfer' in timer.format_report()
+
+
+def test_confirm_phase_recorded_when_future_resolves():
+    timer = PhaseTimer()
+    rpc = UplinkJsonRpc(transport=TxTransport(), phase_timer=timer)
+    pk, sk = ecdsa_new()
+    future = rpc.uplink_circulate_asset(sk, 'from', 10, 'asset', future=True)
+    assert future.result(5) == 'h1'
+    deadline = time.time() + 5
+    while 'Circulate' not in timer.report() and time.time() < deadline:
+        time.sleep(0.01)
+    assert timer.report()['Circulate']['confirm']['count'] == 1
+    rpc.close()
+
+
+def test_no_timer_by_default():
+    rpc = UplinkJsonRpc(transport=TxTransport())
+    pk, sk = ecdsa_new()
+    assert rpc.phase_timer is None
+    assert rpc.uplink_transfer_asset(sk, 'from', 'to', 10, 'asset') == 'h1'
@@ -0,0 +1,178 @@
+import time
+import threading
+from collections import Counter
+
+import pytest
+
+from uplink.pool import MultiNodeUplinkJsonRpc, LatencyWindow, peer_host
+from uplink.exceptions import RpcConnectionFail
+
+from .conftest import FakeTransport, refused
+
+PEERS = [
+    {"tag": "Peer", "contents": {"peerPid": "pid://10.0.0.1:8001:0:10", "peerAccAddr": "a"}},
+    {"tag": "Peer", "contents": {"peerPid": "pid://10.0.0.9:8001:0:10", "peerAccAddr": "b"}},
+]
+
+
+class HostTransport(FakeTransport):
+    """Answers for every host except those in ``down``"""
+
+    def __init__(self):
+        super(HostTransport, self).__init__()
+        self.down = set()
+        self.hits = Counter()
+        self.lock = threading.Lock()
+
+    def respond(self, url, data):
+        host = url.split('/')[2]
+        with self.lock:
+            self.hits[host] += 1
+        if host in self.down:
+            raise refused()
+        if url.endswith('/peers'):
+            return {"tag": "RPCResp", "contents": PEERS}
+        elif data and 'Transaction' in data:
+            return {"tag": "RPCTransactionOK", "txHash": host}
+        elif '/transactions/status/' in url:
+            # only the node a transaction was sent to knows about it yet
+            status = "Accepted" if url.endswith('/' + host) else "NonExistent"
+            return {"tag": "RPCResp", "contents": status}
+        return {"tag": "RPCResp", "contents": {"version": host}}
+
+
+def make_rpc(transport, **kwargs):
+    kwargs.setdefault('health_interval', None)
+    nodes = ['10.0.0.1:8545', '10.0.0.2:8545', ('10.0.0.3', 8545)]
+    return MultiNodeUplinkJsonRpc(nodes, transport=transport, **kwargs)
+
+
+def test_peer_host():
+    assert peer_host("pid://10.0.0.2:8001:0:10") == "10.0.0.2"
+    assert peer_host("nid://node-1:8001:0") == "node-1"
+    assert peer_host("garbage") is None
+
+
+@pytest.mark.parametrize('balancer', ['p2c', 'least_outstanding'])
+def test_reads_spread_over_nodes(balancer):
+    transport = HostTransport()
+    rpc = make_rpc(transport, balancer=balancer)
+    for _ in range(300):
+        rpc.uplink_version()
+    assert len(transport.hits) == 3
+    assert min(transport.hits.values()) > 50
+
+
+def test_failover_and_ejection():
+    transport = HostTransport()
+    transport.down.add('10.0.0.2:8545')
+    rpc = make_rpc(transport, eject_after=2)
+    for _ in range(50):
+        assert rpc.uplink_version()['contents']['version'] != '10.0.0.2:8545'
+    down = rpc.nodes[1]
+    assert not down.healthy
+    assert transport.hits['10.0.0.2:8545'] == 2
+
+    transport.down.clear()
+    assert rpc.check_node(down) and down.healthy
+
+
+def test_writes_go_to_preferred_node():
+    transport = HostTransport()
+    rpc = make_rpc(transport, preferred=['10.0.0.3:8545'])
+    data = rpc._make_cmd_data('Transaction', {})
+    assert rpc._call(data, idempotent=False)['txHash'] == '10.0.0.3:8545'
+
+    # connection refused: the node never saw the transaction, try the next one
+    transport.down.add('10.0.0.3:8545')
+    assert rpc._call(data, idempotent=False)['txHash'] == '10.0.0.1:8545'
+
+
+@pytest.mark.parametrize('hedge', [False, True])
+def test_status_polls_go_to_write_node(hedge):
+    transport = HostTransport()
+    rpc = make_rpc(transport, preferred=['10.0.0.2:8545'], hedge=hedge)
+    tx_hash = rpc._call(rpc._make_cmd_data('Transaction', {}), idempotent=False)['txHash']
+    for _ in range(20):
+        assert rpc.uplink_get_transaction_status(tx_hash) == "Accepted"
+    assert rpc.confirmations.wait(tx_hash, timeout=5).status == "Accepted"
+    # other reads are still balanced
+    for _ in range(30):
+        rpc.uplink_version()
+    assert len(transport.hits) == 3
+    rpc.close()
+
+
+def test_all_nodes_down():
+    transport = HostTransport()
+    transport.down.update(['10.0.0.1:8545', '10.0.0.2:8545', '10.0.0.3:8545'])
+    rpc = make_rpc(transport, eject_after=1)
+    with pytest.raises(RpcConnectionFail):
+        rpc.uplink_version()
+    assert rpc.healthy_nodes() == []
+    # every node ejected: keep trying all of them
+    with pytest.raises(RpcConnectionFail):
+        rpc.uplink_version()
+    assert sum(transport.hits.values()) == 6
+
+
+def test_discovery_and_health_thread():
+    transport = HostTransport()
+    rpc = make_rpc(transport, discover=True, health_interval=0.01)
+    assert [node.host for node in rpc.nodes] == ['10.0.0.1', '10.0.0.2', '10.0.0.3', '10.0.0.9']
+    transport.down.add('10.0.0.9:8545')
+    node = rpc.nodes[3]
+    for _ in range(500):
+        if not node.healthy:
+            break
+        threading.Event().wait(0.01)
+    assert not node.healthy
+    rpc.close()
+
+
+class SlowTransport(HostTransport):
+    def __init__(self, slow_host, delay):
+        super(SlowTransport, self).__init__()
+        self.slow_host = slow_host
+        self.delay = delay
+
+    def request(self, method, url, data=None, **kwargs):
+        if self.slow_host in (None, url.split('/')[2]):
+            time.sleep(self.delay)
+        return super(SlowTransport, self).request(method, url, data, **kwargs)
+
+
+def test_latency_window():
+    window = LatencyWindow(size=100, refresh=10)
+    assert window.percentile(50) is None
+    for i in range(200):
+        window.add(i)
+    assert window.percentile(0) == 100
+    assert window.percentile(50) == 150
+    assert window.percentile(100) == 199
+
+
+def test_hedged_reads():
+    transport = SlowTransport('10.0.0.2:8545', 0.2)
+    rpc = make_rpc(transport, hedge=True, hedge_budget=0.5, hedge_delay=0.01)
+    started = time.time()
+    for _ in range(30):
+        assert rpc.uplink_version()['contents']['version'] != '10.0.0.2:8545'
+    # each slow read was hedged after ~10ms instead of waiting 200ms
+    assert time.time() - started < 2.0
+    stats = rpc.hedge_stats.snapshot()
+    assert stats['requests'] == 30
+    assert 0 < stats['won'] <= stats['fired'] <= 15
+    rpc.close()
+
+
+def test_hedge_budget():
+    transport = SlowTransport(None, 0.03)
+    rpc = make_rpc(transport, hedge=True, hedge_budget=0.0, hedge_delay=0.01)
+    for _ in range(5):
+        rpc.uplink_version()
+    stats = rpc.hedge_stats.snapshot()
+    # only the first hedge is free, later slow reads wait for their node
+    assert stats['fired'] == 1
+    assert stats['over_budget'] == 4
+    rpc.close()
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from uplink.client import UplinkJsonRpc
+from uplink.cryptography import ecdsa_new
+from uplink.exceptions import RpcConnectionFail
+from uplink.mock_node import MockNode
+from uplink.recording import RecordingTransport, ReplayTransport, read_recording
+
+
+class DownTransport(object):
+    pool_maxsize = 10
+
+    def request(self, method, url, data=None, **kwargs):
+        raise RequestsConnectionError("connection refused")
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(params=['rpc.jsonl', 'rpc.jsonl.gz'])
+def recording(request, tmpdir):
+    path = str(tmpdir.join(request.param))
+    with MockNode(latency=0.02, block_interval=0) as node:
+        rpc = node.client()
+        rpc.start_recording(path)
+        pk, sk = ecdsa_new()
+        tx_hash, address = rpc.uplink_create_account(sk, pk)
+        rpc.uplink_get_account(address)
+        rpc.uplink_blocks()
+        list(rpc.uplink_iter_accounts())
+        rpc.stop_recording()
+        rpc.uplink_version()
+        rpc.close()
+    return path, pk, sk, address
+
+
+def test_recording_contents(recording):
+    path, pk, sk, address = recording
+    entries = list(read_recording(path))
+    assert [e['path'] for e in entries] == ['', 'accounts/' + address, 'blocks', 'accounts']
+    assert all(e['status'] == 200 and e['latency'] >= 0.02 for e in entries)
+    assert '"Transaction"' in entries[0]['request']
+    assert entries[0]['t'] <= entries[1]['t']
+
+
+def test_replay(recording):
+    path, pk, sk, address = recording
+    transport = ReplayTransport(path)
+    assert len(transport) == 4
+    rpc = UplinkJsonRpc(transport=transport)
+
+    # signed again with a new nonce, answered from the Transaction entry
+    tx_hash, replayed_address = rpc.uplink_create_account(sk, pk)
+    assert replayed_address == address
+    assert rpc.uplink_get_account(address).address == address
+    assert [b.index for b in rpc.uplink_blocks()] == [0, 1]
+    assert [a.address for a in rpc.uplink_iter_accounts()] == [address]
+    assert transport.requests == 4
+
+    with pytest.raises(LookupError):
+        rpc.uplink_peers()
+
+
+def test_replay_realtime(recording):
+    path = recording[0]
+    rpc = UplinkJsonRpc(transport=ReplayTransport(path, realtime=True))
+    start = time.time()
+    rpc.uplink_blocks()
+    assert time.time() - start >= 0.02
+
+
+def test_connection_errors_are_recorded(tmpdir):
+    path = str(tmpdir.join('rpc.jsonl'))
+    transport = RecordingTransport(DownTransport(), path)
+    rpc = UplinkJsonRpc(transport=transport)
+    with pytest.raises(RpcConnectionFail):
+        rpc.uplink_version()
+    transport.close()
+    assert [e['error'] for e in read_recording(path)] == ['connection']
+
+    rpc = UplinkJsonRpc(transport=ReplayTransport(path))
+    with pytest.raises(RpcConnectionFail):
+        rpc.uplink_version()
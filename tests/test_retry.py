@@ -0,0 +1,69 @@
+import pytest
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from uplink.client import UplinkJsonRpc
+from uplink.retry import RetryPolicy
+from uplink.exceptions import BadStatusCodeError, RpcConnectionFail
+
+from .conftest import FakeTransport, make_response, refused
+
+EMPTY = {"tag": "RPCResp", "contents": []}
+
+
+class ScriptedTransport(FakeTransport):
+    """Replays a list of status codes or exceptions, one per request"""
+
+    def __init__(self, script):
+        super(ScriptedTransport, self).__init__()
+        self.script = list(script)
+
+    def respond(self, url, data):
+        outcome = self.script.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return make_response(EMPTY, outcome)
+
+
+def policy(**kwargs):
+    return RetryPolicy(backoff=0.001, **kwargs)
+
+
+def test_reads_retry_on_gateway_errors():
+    transport = ScriptedTransport([503, RequestsConnectionError("reset"), 200])
+    rpc = UplinkJsonRpc(transport=transport, retry_policy=policy(max_attempts=3))
+    assert rpc.uplink_accounts() == []
+    assert len(transport.urls) == 3
+    assert rpc.retry_policy.counters.snapshot() == dict(calls=1, retries=2, successes=1, failures=0, giveups=0)
+
+
+def test_gives_up_after_max_attempts():
+    transport = ScriptedTransport([503, 503, 200])
+    rpc = UplinkJsonRpc(transport=transport, retry_policy=policy(max_attempts=2))
+    with pytest.raises(BadStatusCodeError):
+        rpc.uplink_accounts()
+    assert rpc.retry_policy.counters.giveups == 1
+
+
+def test_client_errors_are_not_retried():
+    transport = ScriptedTransport([404, 200])
+    rpc = UplinkJsonRpc(transport=transport, retry_policy=policy())
+    with pytest.raises(BadStatusCodeError):
+        rpc.uplink_accounts()
+    assert len(transport.urls) == 1
+
+
+def test_writes_only_retry_unestablished_connections():
+    policy_ = policy()
+    assert policy_.is_retryable(RpcConnectionFail('', None, cause=refused()), idempotent=False)
+    assert not policy_.is_retryable(RpcConnectionFail('', None, cause=RequestsConnectionError("reset")),
+                                     idempotent=False)
+    assert not policy_.is_retryable(BadStatusCodeError('', make_response(EMPTY, 503)), idempotent=False)
+
+
+def test_deadline():
+    transport = ScriptedTransport([503] * 10)
+    rpc = UplinkJsonRpc(transport=transport, retry_policy=RetryPolicy(
+        max_attempts=10, backoff=0.05, jitter=False, deadline=0.1))
+    with pytest.raises(BadStatusCodeError):
+        rpc.uplink_accounts()
+    assert len(transport.urls) == 2
@@ -0,0 +1,52 @@
+import pytest
+
+from uplink.cryptography import ecdsa_sign, ecdsa_new, pack_signature
+from uplink.sign_pool import SigningPool, sign_many
+from uplink.signing import EcdsaBackend
+
+from . import reference
+
+ECDSA = EcdsaBackend()
+
+
+@pytest.fixture(scope='module')
+def pool():
+    with SigningPool(processes=2, backend='ecdsa') as pool:
+        yield pool
+
+
+def expected(sk, messages):
+    return [pack_signature(*ecdsa_sign(sk, msg, deterministic=True, backend=ECDSA))
+            for msg in messages]
+
+
+def test_sign_headers_in_order(pool):
+    headers = [reference.testTransfer, reference.testCreateAsset,
+               reference.testCall(reference.test_args)]
+    messages = [hdr.to_binary() for hdr in headers]
+    headers = headers + [b'extra']
+    assert pool.sign_many(headers, reference.skey, deterministic=True) == \
+        expected(reference.skey, messages + [b'extra'])
+
+
+def test_sign_many_keys(pool):
+    messages = [str(i).encode() for i in range(10)]
+    _, sk = ecdsa_new()
+    for key in (reference.skey, sk, reference.skey):
+        assert pool.sign_many(messages, key, deterministic=True) == expected(key, messages)
+
+
+def test_empty_batch(pool):
+    assert pool.sign_many([], reference.skey) == []
+
+
+def test_closed_pool():
+    pool = SigningPool(processes=1)
+    pool.close()
+    with pytest.raises(RuntimeError):
+        pool.sign_many([b'message'], reference.skey)
+
+
+def test_sign_many_with_pool(pool):
+    assert sign_many([b'message'], reference.skey, deterministic=True, pool=pool) == \
+        expected(reference.skey, [b'message'])
@@ -0,0 +1,102 @@
+import pytest
+
+from uplink import signing
+from uplink.signing import (BACKENDS, EcdsaBackend, CryptographyBackend, get_backend,
+                            set_default_backend, order)
+from uplink.cryptography import ecdsa_sign, ecdsa_verify, ecdsa_new
+
+from . import reference
+
+MESSAGE = reference.testTransfer.to_binary()
+
+# ecdsa_new keys verify with sha3_256, the reference keys do not
+pk, sk = ecdsa_new()
+
+# Deterministic signature of the reference transfer with the reference key,
+# the same from every backend
+DETERMINISTIC = (
+    67192411752256168147174727989976018750357155361919992135311204600287838049601,
+    33568779294917330379624256880096700995177071321179268991127420643223496372361,
+)
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def backend(request):
+    return get_backend(request.param)
+
+
+@pytest.fixture
+def default_backend():
+    previous = signing.default_backend
+    yield
+    signing.default_backend = previous
+
+
+def test_signature_verifies(backend):
+    sig = ecdsa_sign(sk, MESSAGE, backend=backend)
+    assert ecdsa_verify(pk, sig, MESSAGE)
+
+
+def test_deterministic(backend):
+    first = ecdsa_sign(sk, MESSAGE, deterministic=True, backend=backend)
+    second = ecdsa_sign(sk, MESSAGE, deterministic=True, backend=backend)
+    assert first == second
+    assert ecdsa_verify(pk, first, MESSAGE)
+
+    other = ecdsa_sign(sk, MESSAGE + b'\x00', deterministic=True, backend=backend)
+    assert other != first
+
+
+def test_deterministic_agrees_across_backends(backend):
+    assert backend.sign(reference.skey, MESSAGE, deterministic=True) == DETERMINISTIC
+
+
+def test_random_nonces(backend):
+    # identical transactions must not get identical signatures, or the
+    # node rejects all but the first as duplicates
+    first = backend.sign(sk, MESSAGE)
+    second = backend.sign(sk, MESSAGE)
+    assert first != second
+    assert ecdsa_verify(pk, first, MESSAGE)
+    assert ecdsa_verify(pk, second, MESSAGE)
+
+
+def test_low_s(backend):
+    for deterministic in (True, False):
+        for i in range(8):
+            _, s = backend.sign(sk, MESSAGE + bytes(bytearray([i])), deterministic=deterministic)
+            assert s <= order // 2
+
+
+@pytest.mark.skipif('cryptography' not in BACKENDS, reason="cryptography is not installed")
+def test_cryptography_without_deterministic_signing():
+    backend = CryptographyBackend()
+    backend._deterministic = None
+    assert backend.sign(reference.skey, MESSAGE, deterministic=True) == DETERMINISTIC
+
+
+def test_keys_are_not_mixed_up(backend):
+    other_pk, other_sk = ecdsa_new()
+    ecdsa_sign(sk, MESSAGE, backend=backend)
+    sig = ecdsa_sign(other_sk, MESSAGE, backend=backend)
+    assert ecdsa_verify(other_pk, sig, MESSAGE)
+
+
+def test_fixed_nonce_uses_ecdsa(default_backend):
+    expected = EcdsaBackend().sign_with_k(reference.skey, MESSAGE, reference.nonce)
+    for name in BACKENDS:
+        set_default_backend(name)
+        assert reference.testTransfer.sign(reference.skey, k=reference.nonce) == expected
+
+
+def test_deterministic_nonce_is_rfc6979():
+    k = signing.deterministic_nonce(reference.skey, MESSAGE)
+    r, s = EcdsaBackend().sign_with_k(reference.skey, MESSAGE, k)
+    assert signing.low_s(r, s) == DETERMINISTIC
+
+
+def test_get_backend():
+    assert get_backend().name in BACKENDS
+    assert get_backend('ecdsa').name == 'ecdsa'
+    with pytest.raises(ValueError):
+        get_backend('openssl')
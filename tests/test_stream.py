@@ -0,0 +1,198 @@
+import json
+
+import pytest
+
+from uplink.protocol import Block, LazyBlock
+from uplink.client import UplinkJsonRpc
+from uplink import stream
+from uplink.stream import JsonArrayParser, object_members
+from uplink.exceptions import UplinkJsonRpcError, BadJsonError, BadStatusCodeError
+
+from .conftest import FakeTransport, make_response
+
+BLOCKS = [{
+    "index": i,
+    "header": {"origin": "a", "merkleRoot": "m", "timestamp": 1 + 0.5 * i, "prevHash": "p"},
+    "signatures": [{"signature": "sé", "signerAddr": "x"}],
+    "transactions": [],
+} for i in range(5)]
+
+
+class StreamTransport(FakeTransport):
+    def __init__(self, body, status_code=200):
+        super(StreamTransport, self).__init__()
+        self.body = body
+        self.status_code = status_code
+        self.closed = False
+
+    def respond(self, url, data):
+        response = make_response(self.body, self.status_code, stream=True)
+        response.close = lambda: setattr(self, 'closed', True)
+        return response
+
+
+def feed_bytewise(parser, data):
+    elems = []
+    for i in range(len(data)):
+        elems.extend(parser.feed(data[i:i + 1]))
+    return elems + parser.close()
+
+
+def test_parser_states_are_distinct():
+    states = [getattr(stream, name) for name in ('_START', '_KEY_OR_END', '_KEY', '_COLON', '_VALUE',
+                                                  '_ELEM_OR_END', '_ELEM', '_ELEM_SEP', '_SEP', '_DONE')]
+    assert states == list(range(10))
+
+
+def test_parser_bytewise():
+    data = json.dumps({"tag": "RPCResp", "contents": BLOCKS}, ensure_ascii=False).encode('utf-8')
+    parser = JsonArrayParser()
+    assert feed_bytewise(parser, data) == BLOCKS
+    assert parser.envelope == {"tag": "RPCResp"}
+    assert parser.done
+
+
+def test_parser_numbers_split_across_chunks():
+    parser = JsonArrayParser()
+    elems = parser.feed(b'{"contents": [12') + parser.feed(b'34, 5.') + parser.feed(b'5, true]')
+    elems += parser.feed(b', "n": 1') + parser.feed(b'}') + parser.close()
+    assert elems == [1234, 5.5, True]
+    assert parser.envelope == {"n": 1}
+
+
+def test_parser_empty_and_non_array():
+    parser = JsonArrayParser()
+    assert parser.feed(b' { "contents" : [ ] } ') + parser.close() == []
+
+    parser = JsonArrayParser()
+    assert feed_bytewise(parser, b'{"tag": "RPCRespError", "contents": {"errorMsg": "no"}}') == []
+    assert parser.envelope['contents'] == {"errorMsg": "no"}
+
+
+@pytest.mark.parametrize('data', [b'{"contents": [1, 2', b'[1, 2]', b'{"contents": [1 2]}', b'{} x'])
+def test_parser_bad_input(data):
+    parser = JsonArrayParser()
+    with pytest.raises(ValueError):
+        parser.feed(data)
+        parser.close()
+
+
+def test_client_iter_blocks():
+    body = json.dumps({"tag": "RPCResp", "contents": BLOCKS}).encode('utf-8')
+    transport = StreamTransport(body)
+    rpc = UplinkJsonRpc(transport=transport)
+
+    blocks = rpc.uplink_iter_blocks()
+    first = next(blocks)
+    assert isinstance(first, Block) and first.index == 0
+    assert transport.kwargs['stream'] is True
+    assert [b.index for b in blocks] == [1, 2, 3, 4]
+    assert transport.closed
+
+
+def test_client_iter_errors():
+    body = json.dumps({"tag": "RPCRespError", "contents": {"errorMsg": "boom"}}).encode('utf-8')
+    rpc = UplinkJsonRpc(transport=StreamTransport(body))
+    with pytest.raises(UplinkJsonRpcError):
+        list(rpc.uplink_iter_accounts())
+
+    rpc = UplinkJsonRpc(transport=StreamTransport(b'{"tag": "RPCResp", "contents": [{'))
+    with pytest.raises(BadJsonError):
+        list(rpc.uplink_iter_accounts())
+
+
+class CountingDecoder(json.JSONDecoder):
+    calls = 0
+    containers = 0
+
+    def raw_decode(self, s, idx=0):
+        self.calls += 1
+        value, end = json.JSONDecoder.raw_decode(self, s, idx)
+        self.containers += isinstance(value, (dict, list))
+        return value, end
+
+
+def test_parser_large_element_is_decoded_once():
+    elem = {"data": [{"s": 'a[{"\\' * 5, "n": i} for i in range(200)]}
+    data = json.dumps({"contents": [elem, 1, elem]}).encode('utf-8')
+    parser = JsonArrayParser()
+    parser._json = CountingDecoder()
+    # chunk boundaries fall inside strings and between a backslash and
+    # the character it escapes
+    elems = []
+    for i in range(0, len(data), 7):
+        elems.extend(parser.feed(data[i:i + 7]))
+    assert elems + parser.close() == [elem, 1, elem]
+    # per large element two attempts before scanning, then one decode of
+    # the complete text, instead of one decode per chunk
+    assert len(data) // 7 > 1000
+    assert parser._json.calls <= 10
+
+
+def test_parser_large_element_invalid():
+    parser = JsonArrayParser()
+    parser.feed(b'{"contents": [{"a": [1, 2')
+    parser.feed(b', 3, 4')
+    with pytest.raises(ValueError):
+        parser.feed(b'}]}')
+
+
+def test_client_iter_bad_status_closes_response():
+    transport = StreamTransport(b'not found', status_code=404)
+    rpc = UplinkJsonRpc(transport=transport)
+    with pytest.raises(BadStatusCodeError):
+        list(rpc.uplink_iter_blocks())
+    assert transport.closed
+
+
+def test_parser_raw_text():
+    parser = JsonArrayParser(raw=True)
+    elems = feed_bytewise(parser, b'{"contents": [ {"a": [1, 2]} , 3.5, ["]"]]}')
+    assert elems == [('{"a": [1, 2]}', {"a": (6, 12)}), ('3.5', None), ('["]"]', None)]
+
+
+def test_parser_raw_is_not_decoded():
+    deep = [[[[[[[[[[[[[[[["\\"]]]]]]]]]]]]]]]]
+    elems = [{"a": deep, "b{": ["x\"]"]}, {}, {"a": [{"s": '"[\\' * 50, "n": i} for i in range(300)]}]
+    data = json.dumps({"contents": elems}).encode('utf-8')
+    for size in (1, 7, len(data)):
+        parser = JsonArrayParser(raw=True)
+        parser._json = CountingDecoder()
+        found = []
+        for i in range(0, len(data), size):
+            found.extend(parser.feed(data[i:i + size]))
+        found += parser.close()
+        assert parser._json.containers == 0
+        assert [json.loads(text) for text, _ in found] == elems
+        for (text, members), elem in zip(found, elems):
+            assert members == object_members(text)
+            assert dict((name, json.loads(text[start:end]))
+                        for name, (start, end) in members.items()) == elem
+
+
+def test_object_members():
+    text = ' {"a" : 1 , "b\\u00e9":"}", "c": {"d": [null]}, "e": {}}'
+    members = object_members(text)
+    assert dict((name, text[start:end]) for name, (start, end) in members.items()) == \
+        {"a": "1", u"b\u00e9": '"}"', "c": '{"d": [null]}', "e": "{}"}
+    assert object_members('{}') == {}
+    with pytest.raises(ValueError):
+        object_members('[1]')
+
+
+def test_lazy_block():
+    raw = json.dumps(BLOCKS[2])
+    block = LazyBlock.from_json(raw)
+    assert block.index == 2 and block.header.timestamp == 2.0
+    assert block._transactions is None and block._signatures is None
+    assert block.signatures == BLOCKS[2]["signatures"]
+    assert block.to_dict() == Block(**BLOCKS[2]).to_dict()
+    assert not hasattr(block, '__dict__')
+
+
+def test_client_lazy_blocks():
+    body = json.dumps({"tag": "RPCResp", "contents": BLOCKS}).encode('utf-8')
+    rpc = UplinkJsonRpc(transport=StreamTransport(body))
+    blocks = rpc.uplink_blocks(lazy=True)
+    assert [type(b) for b in blocks] == [LazyBlock] * 5
+    assert [b.to_dict() for b in blocks] == [Block(**b).to_dict() for b in BLOCKS]
@@ -0,0 +1,85 @@
+import time
+import threading
+
+import pytest
+
+from uplink.submit import TransactionSubmitter, TxIntent
+
+
+class FakeRpc(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.issued = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def uplink_transfer_asset(self, private_key, from_address, to_address, balance, asset_address):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.005)
+        with self.lock:
+            self.in_flight -= 1
+            self.issued.append((from_address, balance))
+        if balance < 0:
+            raise ValueError("negative balance")
+        return "hash-{}-{}".format(from_address, balance)
+
+
+def transfer(origin, balance):
+    return TxIntent('transfer_asset', dict(private_key=None, from_address=origin, to_address='bob',
+                                           balance=balance, asset_address='gold'))
+
+
+def test_outcomes_and_stats():
+    rpc = FakeRpc()
+    submitter = TransactionSubmitter(rpc, workers=4, window=8)
+    intents = [transfer('alice', 1), transfer('bob', -1), TxIntent('get_asset', {})]
+    outcomes = submitter.run(intents)
+
+    assert [o.index for o in outcomes] == [0, 1, 2]
+    assert outcomes[0].result == "hash-alice-1" and outcomes[0].error is None
+    assert isinstance(outcomes[1].error, ValueError)
+    assert isinstance(outcomes[2].error, ValueError)
+    assert submitter.stats.submitted == 3
+    assert submitter.stats.succeeded == 1
+    assert submitter.stats.failed == 2
+
+
+def test_per_origin_order_and_concurrency():
+    rpc = FakeRpc()
+    origins = ['a', 'b', 'c', 'd', 'e', 'f']
+    intents = [transfer(origins[i % len(origins)], i) for i in range(120)]
+    submitter = TransactionSubmitter(rpc, workers=6, window=12)
+    outcomes = submitter.run(intents)
+
+    assert all(o.error is None for o in outcomes)
+    assert rpc.max_in_flight > 1
+    for origin in origins:
+        balances = [b for (o, b) in rpc.issued if o == origin]
+        assert balances == sorted(balances)
+
+
+def test_intents_error_is_raised():
+    def intents():
+        for i in range(3):
+            yield transfer('alice', i)
+        raise KeyError('bad intent')
+
+    outcomes = []
+    with pytest.raises(KeyError):
+        for outcome in TransactionSubmitter(FakeRpc(), workers=2).submit(intents()):
+            outcomes.append(outcome)
+    assert sorted(o.index for o in outcomes) == [0, 1, 2]
+
+
+def test_closing_stops_lanes():
+    rpc = FakeRpc()
+    submitter = TransactionSubmitter(rpc, workers=2, window=4)
+    outcomes = submitter.submit(transfer('alice', i) for i in range(1000))
+    next(outcomes)
+    outcomes.close()
+    time.sleep(0.1)
+    issued = len(rpc.issued)
+    time.sleep(0.1)
+    assert len(rpc.issued) == issued < 10
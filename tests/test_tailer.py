@@ -0,0 +1,119 @@
+import threading
+
+import pytest
+
+from uplink.protocol import Block
+from uplink.tailer import BlockTailer, FileCheckpoint, MemoryCheckpoint
+from uplink.exceptions import UplinkJsonRpcError, RpcConnectionFail
+
+
+def make_block(i):
+    header = {"origin": "a", "merkleRoot": "m", "timestamp": i, "prevHash": "p"}
+    return Block(header, [], i, [])
+
+
+class FakeRpc(object):
+    def __init__(self, n_blocks=0):
+        self.blocks = [make_block(i) for i in range(n_blocks)]
+        self.calls = []
+        self.fail = False
+        # number of upcoming calls that fail
+        self.failures = 0
+
+    def uplink_block(self, block_id):
+        self.calls.append(block_id)
+        if self.fail or self.failures:
+            self.failures = max(0, self.failures - 1)
+            raise RpcConnectionFail('connection error:', None)
+        if block_id >= len(self.blocks):
+            raise UplinkJsonRpcError('RPCRespError', {'errorMsg': 'no block'})
+        return self.blocks[block_id]
+
+
+def test_file_checkpoint(tmp_path):
+    checkpoint = FileCheckpoint(str(tmp_path / 'tail.json'))
+    assert checkpoint.load() is None
+    checkpoint.save(7)
+    checkpoint.save(8)
+    assert FileCheckpoint(checkpoint.path).load() == 8
+    assert [p.name for p in tmp_path.iterdir()] == ['tail.json']
+
+
+def test_poll_batches_and_resume(tmp_path):
+    rpc = FakeRpc(5)
+    path = str(tmp_path / 'tail.json')
+    tailer = BlockTailer(rpc, checkpoint=FileCheckpoint(path), batch_size=3)
+    assert [b.index for b in tailer.poll()] == [0, 1, 2]
+
+    follow = tailer.follow()
+    assert next(follow).index == 0
+    assert next(follow).index == 1
+    follow.close()
+
+    # block 1 was handed out but never acknowledged
+    tailer = BlockTailer(rpc, checkpoint=FileCheckpoint(path))
+    assert tailer.next_index == 1
+    blocks = tailer.poll()
+    assert [b.index for b in blocks] == [1, 2, 3, 4]
+    tailer.commit(blocks[-1])
+    assert tailer.poll() == []
+    assert FileCheckpoint(path).load() == 5
+
+
+def test_transport_errors_propagate():
+    rpc = FakeRpc(1)
+    rpc.fail = True
+    with pytest.raises(RpcConnectionFail):
+        BlockTailer(rpc).poll()
+
+
+def test_follow_retries_transport_errors():
+    rpc = FakeRpc(2)
+    rpc.failures = 1
+    tailer = BlockTailer(rpc, min_interval=0.01, max_interval=0.05)
+    follow = tailer.follow()
+    assert [next(follow).index for _ in range(2)] == [0, 1]
+    assert rpc.calls[:2] == [0, 0]
+
+    rpc.failures = 2
+    rpc.blocks.append(make_block(2))
+    assert next(follow).index == 2
+    follow.close()
+
+
+def test_adaptive_interval():
+    tailer = BlockTailer(FakeRpc(), min_interval=0.1, max_interval=1.0)
+    tailer._observe(0)
+    tailer._observe(0)
+    assert tailer.interval == pytest.approx(0.225)
+    for _ in range(10):
+        tailer._observe(0)
+    assert tailer.interval == 1.0
+
+    tailer._observe(1)
+    tailer._last_arrival -= 0.6
+    tailer._observe(1)
+    assert tailer.block_gap == pytest.approx(0.6, abs=0.05)
+    assert tailer.interval == pytest.approx(0.3, abs=0.05)
+
+
+def test_callbacks():
+    rpc = FakeRpc(3)
+    checkpoint = MemoryCheckpoint()
+    tailer = BlockTailer(rpc, checkpoint=checkpoint, min_interval=0.01, max_interval=0.01)
+    seen = []
+    done = threading.Event()
+
+    def on_block(block):
+        seen.append(block.index)
+        if block.index == 3:
+            done.set()
+
+    tailer.add_callback(on_block)
+    thread = tailer.start()
+    rpc.blocks.append(make_block(3))
+    assert done.wait(5)
+    tailer.stop()
+    thread.join(5)
+    assert seen == [0, 1, 2, 3]
+    assert checkpoint.load() >= 3
@@ -0,0 +1,84 @@
+import time
+
+from uplink.client import UplinkJsonRpc
+from uplink.transport import HTTPTransport
+from uplink.mock_node import MockNode
+
+
+def test_client_pool_settings():
+    rpc = UplinkJsonRpc(pool_connections=2, pool_maxsize=32, pool_idle_timeout=5)
+    assert rpc.transport.pool_connections == 2
+    assert rpc.transport.pool_maxsize == 32
+    assert rpc.transport.idle_timeout == 5
+
+
+def test_shared_transport():
+    transport = HTTPTransport()
+    assert UplinkJsonRpc(transport=transport).transport is transport
+    assert UplinkJsonRpc(port=8546, transport=transport).transport is transport
+
+
+def _pool(transport, node):
+    adapter = transport._session.get_adapter(node.url)
+    return adapter.poolmanager.connection_from_url(node.url)
+
+
+def _connected(pool, closed):
+    conn = pool._get_conn()
+    conn.connect()
+    close = conn.close
+
+    def tracked():
+        closed.append(conn)
+        close()
+    conn.close = tracked
+    return conn
+
+
+def test_idle_connection_closed_on_checkout():
+    transport = HTTPTransport(idle_timeout=5)
+    closed = []
+    with MockNode() as node:
+        pool = _pool(transport, node)
+        conn = _connected(pool, closed)
+        pool._put_conn(conn)
+        assert pool._get_conn() is conn
+        assert closed == []
+
+        pool._put_conn(conn)
+        conn._uplink_idle_since -= 10
+        assert pool._get_conn() is conn
+        assert closed == [conn]
+    transport.close()
+
+
+def test_idle_sweep_is_per_connection():
+    transport = HTTPTransport(idle_timeout=5)
+    closed = []
+    with MockNode() as node:
+        pool = _pool(transport, node)
+        stale, busy = _connected(pool, closed), _connected(pool, closed)
+        pool._put_conn(stale)
+        pool._put_conn(busy)
+        stale._uplink_idle_since -= 10
+
+        transport._evict_idle()
+        assert closed == []  # the first sweep is only due after the timeout
+
+        transport._next_sweep = 0
+        transport._evict_idle()
+        assert closed == [stale]
+        assert transport._next_sweep > time.time()
+
+        # a busy caller keeps reusing the most recent connection
+        transport.request('post', node.url + '/version')
+        assert pool._get_conn() is busy
+    transport.close()
+
+
+def test_no_idle_timeout():
+    transport = HTTPTransport(idle_timeout=None)
+    adapter = transport._session.get_adapter('http://localhost')
+    conn = adapter.poolmanager.connection_from_host('localhost', 8545)._get_conn()
+    assert not hasattr(conn, '_uplink_idle_since')
+    transport._evict_idle()
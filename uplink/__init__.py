@@ -5,6 +5,7 @@ from .exceptions import *
 from .protocol import *
 from .enum import *
 from .cryptography import *
+from .transactions import *
 from .client import UplinkJsonRpc
 from .utils import *
 from .version import *
\ No newline at end of file
@@ -0,0 +1,501 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio JSON RPC client for Uplink.
+
+Requires python 3.6+ and the optional ``aiohttp`` dependency::
+
+    $ pip install aiohttp
+"""
+
+import time
+import asyncio
+from collections import deque
+
+import aiohttp
+
+from .protocol import Block, LazyBlock, Peer, Account, Asset, Contract, Transaction, MemPool
+from .exceptions import (RpcConnectionFail, BadStatusCodeError,
+                         UplinkJsonRpcError, TransactionNonExistent, RpcTimeout)
+from .cryptography import derive_contract_address, derive_asset_address
+from .transactions import (create_account_tx, create_asset_tx, transfer_asset_tx, circulate_asset_tx,
+                           create_contract_tx, revoke_asset_tx, revoke_account_tx, call_contract_tx)
+from .transport import DEFAULT_POOL_MAXSIZE, DEFAULT_IDLE_TIMEOUT
+from .bulk import BulkResult
+from .stream import JsonArrayParser, STREAM_CHUNK_SIZE
+from .client import BaseUplinkJsonRpc, UPLINK_PORT
+
+
+class AsyncUplinkJsonRpc(BaseUplinkJsonRpc):
+    """
+    asyncio JSON RPC For Uplink
+
+    Offers every ``uplink_*`` method of :class:`~uplink.client.UplinkJsonRpc`
+    as a coroutine. Requests share a bounded pool of keep-alive connections;
+    when all ``pool_maxsize`` connections are busy further requests wait for
+    a free connection, so any number of requests may be in flight at once.
+
+    The underlying ``aiohttp`` session is created on first use and must be
+    released with :meth:`close`, or by using the client as an async context
+    manager::
+
+        async with AsyncUplinkJsonRpc() as rpc:
+            asset = await rpc.uplink_get_asset(address)
+
+    :param host: uplink node host
+    :param port: uplink node RPC port
+    :param tls: use https
+    :param session: existing ``aiohttp.ClientSession`` to send requests with
+    :param pool_maxsize: maximum number of concurrent connections to the node
+    :param pool_idle_timeout: seconds after which idle connections are closed
+    :param connect_timeout: seconds to wait for a connection, ``None`` to wait forever
+    :param read_timeout: seconds to wait for the node to respond, ``None`` to wait forever
+    :param codec: :class:`~uplink.codec.JsonCodec` for request and response
+                  bodies, by default the standard library one (exact
+                  for integers of any size)
+    :param metrics: :class:`~uplink.metrics.MetricsRegistry` recording every
+                    request, by default one for this client alone
+    """
+
+    def __init__(self, host='localhost', port=UPLINK_PORT, tls=False, session=None,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 connect_timeout=None, read_timeout=None, codec=None, metrics=None):
+        super(AsyncUplinkJsonRpc, self).__init__(host, port, tls, codec, metrics)
+        self.pool_maxsize = pool_maxsize
+        self.pool_idle_timeout = pool_idle_timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._session = session
+        self._owns_session = session is None
+
+    def _get_session(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize,
+                                             keepalive_timeout=self.pool_idle_timeout)
+            # no total timeout: time spent queueing for a pooled connection
+            # is bounded by the caller, e.g. with asyncio.wait_for
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.connect_timeout,
+                                            sock_read=self.read_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    async def close(self):
+        """Close the pooled connections held by this client"""
+        if self._session is not None and self._owns_session:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _call(self, data='', method='post', endpoint=''):
+        url = self._make_url(endpoint)
+        started = time.time()
+
+        try:
+            async with self._get_session().request(method.upper(), url, data=data) as response:
+                body = await response.read()
+                if response.status // 100 != 2:
+                    error = BadStatusCodeError("status code: " + str(response.status), response)
+                    self._record_request(url, data, started, len(body), error)
+                    raise error
+        except asyncio.TimeoutError as e:
+            self._record_request(url, data, started, error=e)
+            raise RpcTimeout('timeout:', None, cause=e)
+        except aiohttp.ClientConnectionError as e:
+            self._record_request(url, data, started, error=e)
+            raise RpcConnectionFail('connection error:', None, cause=e)
+        self._record_request(url, data, started, len(body))
+        try:
+            return self.codec.loads(body)
+        except ValueError as e:
+            raise self._bad_json(endpoint, data, e)
+
+    async def _iter_call(self, endpoint, cls, raw=False):
+        url = self._make_url(endpoint)
+        parser = JsonArrayParser(raw=raw)
+        started = time.time()
+        recorded = False
+
+        try:
+            async with self._get_session().request('POST', url, data='') as response:
+                # recorded once the headers arrive, like the blocking client,
+                # as the body has not been read yet
+                bytes_in = response.content_length or 0
+                recorded = True
+                if response.status // 100 != 2:
+                    error = BadStatusCodeError("status code: " + str(response.status), response)
+                    self._record_request(url, '', started, bytes_in, error)
+                    raise error
+                self._record_request(url, '', started, bytes_in)
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    for elem in self._stream_elements(parser, chunk, endpoint):
+                        yield cls.from_json(*elem) if raw else cls(**elem)
+        except asyncio.TimeoutError as e:
+            if not recorded:
+                self._record_request(url, '', started, error=e)
+            raise RpcTimeout('timeout:', None, cause=e)
+        except aiohttp.ClientConnectionError as e:
+            if not recorded:
+                self._record_request(url, '', started, error=e)
+            raise RpcConnectionFail('connection error:', None, cause=e)
+        for elem in self._stream_elements(parser, endpoint=endpoint):
+            yield cls.from_json(*elem) if raw else cls(**elem)
+
+    # Issues a transaction to the uplink RPC interface, returning the
+    # tranasction hash on success, and throwing an exception on failure.
+    async def _issue_transaction(self, tx):
+        data = self._make_cmd_data("Transaction", tx.to_dict())
+        response = await self._call(data)
+        if response["tag"] == "RPCTransactionOK":
+            return response["txHash"]
+        else:
+            print(response)
+            raise UplinkJsonRpcError("Malformed Transaction: " + str(tx), response)
+
+    async def uplink_reset_db(self, private_key, public_key):
+        """Resets and clears Uplink database (test mode only)"""
+        return await self._call(self._reset_db_data(private_key, public_key))
+
+    async def uplink_block(self, block_id):
+        """Get a block by index"""
+        result = await self._call(endpoint='blocks/{}'.format(block_id))
+        elems = self._handle_response(result, many=False)
+        return Block(**elems)
+
+    async def uplink_blocks(self, lazy=False):
+        """Get a list of all blocks, as LazyBlock objects with ``lazy``"""
+        if lazy:
+            return [block async for block in self._iter_call('blocks', LazyBlock, raw=True)]
+        result = await self._call(endpoint='blocks')
+        elems = self._handle_response(result, many=True)
+        return [Block(**args) for args in elems]
+
+    async def uplink_iter_blocks(self, lazy=False):
+        """Iterate over all blocks, parsing the response incrementally"""
+        cls = LazyBlock if lazy else Block
+        async for item in self._iter_call('blocks', cls, raw=lazy):
+            yield item
+
+    async def uplink_peers(self):
+        """Get a list of peers"""
+        result = await self._call(endpoint='peers')
+        elems = self._handle_response(result, many=True)
+        return [Peer(**args) for args in elems]
+
+    async def uplink_validators(self):
+        """Get a list of validating peers"""
+        result = await self._call(endpoint='peers/validators')
+        elems = self._handle_response(result, many=True)
+        return [Peer(**args) for args in elems]
+
+    async def uplink_get_transaction_status(self, tx_hash):
+        """Get a transactions status"""
+        response = await self._call(endpoint='transactions/status/{}'.format(tx_hash))
+        if response["contents"] == "NonExistent":
+            raise TransactionNonExistent(tx_hash)
+        else:
+            return response["contents"]
+
+    async def uplink_transactions(self, block_id=0):
+        """Get a list of transactions by block index"""
+        result = await self._call(endpoint='transactions/{}'.format(block_id))
+        elems = self._handle_response(result, many=True)
+        return [Transaction(**args) for args in elems]
+
+    async def uplink_accounts(self):
+        """Get a list of accounts"""
+        result = await self._call(endpoint='accounts')
+        elems = self._handle_response(result, many=True)
+        return [Account(**args) for args in elems]
+
+    async def uplink_iter_accounts(self):
+        """Iterate over all accounts, parsing the response incrementally"""
+        async for item in self._iter_call('accounts', Account):
+            yield item
+
+    async def uplink_get_account(self, address):
+        """Get individual account by address"""
+        result = await self._call(endpoint='accounts/{}'.format(address))
+        elems = self._handle_response(result, many=False)
+        return Account(**elems)
+
+    async def uplink_assets(self):
+        """Get a list of all assets"""
+        result = await self._call(endpoint='assets')
+        elems = self._handle_response(result, many=True)
+        return [Asset(**args) for args in elems]
+
+    async def uplink_iter_assets(self):
+        """Iterate over all assets, parsing the response incrementally"""
+        async for item in self._iter_call('assets', Asset):
+            yield item
+
+    async def uplink_get_asset(self, address):
+        """Get individual asset by address"""
+        result = await self._call(endpoint='assets/{}'.format(address))
+        elems = self._handle_response(result, many=False)
+        try:
+            if elems['errorMsg']:
+                print(elems['errorMsg'])
+                return False
+        except KeyError:
+            return Asset(**elems)
+
+    async def uplink_version(self):
+        """Get current Uplink version"""
+        return await self._call(endpoint='version')
+
+    async def uplink_contracts(self):
+        """Get a list of all contracts"""
+        result = await self._call(endpoint='contracts')
+        elems = self._handle_response(result, many=True)
+        return [Contract(**args) for args in elems]
+
+    async def uplink_iter_contracts(self):
+        """Iterate over all contracts, parsing the response incrementally"""
+        async for item in self._iter_call('contracts', Contract):
+            yield item
+
+    async def uplink_get_contract(self, address):
+        """Get individual contract by address"""
+        result = await self._call(endpoint='contracts/{}'.format(address))
+        elems = self._handle_response(result, many=False)
+        return Contract(**elems)
+
+    async def uplink_get_contract_callable(self, address):
+        """Get individual contract methods by address"""
+        result = await self._call(endpoint='contracts/{}/callable'.format(address))
+        return self._handle_response(result, many=False)
+
+    async def _fetch_many(self, fn, addresses, max_concurrency, ordered):
+        if max_concurrency is None:
+            max_concurrency = self.pool_maxsize
+        addresses = iter(addresses)
+        pending = deque()
+
+        async def fetch_one(key):
+            try:
+                return BulkResult(key, await fn(key), None)
+            except Exception as e:
+                return BulkResult(key, None, e)
+
+        def fill():
+            for key in addresses:
+                pending.append(asyncio.ensure_future(fetch_one(key)))
+                if len(pending) >= max_concurrency:
+                    return
+
+        try:
+            fill()
+            while pending:
+                if ordered:
+                    yield await pending.popleft()
+                else:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        pending.remove(task)
+                        yield task.result()
+                fill()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def uplink_get_accounts_many(self, addresses, max_concurrency=None, ordered=True):
+        """Get many accounts concurrently, yields BulkResult(address, Account, error)"""
+        async for result in self._fetch_many(self.uplink_get_account, addresses, max_concurrency, ordered):
+            yield result
+
+    async def uplink_get_assets_many(self, addresses, max_concurrency=None, ordered=True):
+        """Get many assets concurrently, yields BulkResult(address, Asset, error)"""
+        async for result in self._fetch_many(self.uplink_get_asset, addresses, max_concurrency, ordered):
+            yield result
+
+    async def uplink_get_contracts_many(self, addresses, max_concurrency=None, ordered=True):
+        """Get many contracts concurrently, yields BulkResult(address, Contract, error)"""
+        async for result in self._fetch_many(self.uplink_get_contract, addresses, max_concurrency, ordered):
+            yield result
+
+    async def uplink_validate_script(self, content):
+        """Validate a script"""
+        response = await self._call(content, endpoint="scripts/validate")
+        return self._handle_response(response, many=False)
+
+    async def uplink_parse_script(self, content):
+        """Parse a script"""
+        response = await self._call(self.codec.dumps(content), endpoint="scripts/command/parse")
+        return self._handle_response(response, many=False)
+
+    async def uplink_validate_method(self, content):
+        """Validate a method"""
+        response = await self._call(content, endpoint="scripts/validate/method")
+        return self._handle_response(response, many=False)
+
+    async def uplink_validate_def(self, content):
+        """Validate a definition"""
+        response = await self._call(content, endpoint="scripts/validate/def")
+        return self._handle_response(response, many=False)
+
+    async def uplink_command(self, payload):
+        """Run a script command"""
+        response = await self._call(self.codec.dumps(payload), endpoint="scripts/command")
+        return self._handle_response(response, many=False)
+
+    async def uplink_get_invalid_transaction(self, tx_hash):
+        """Get an invalid transaction"""
+        response = await self._call(endpoint='transactions/invalid/{}'.format(tx_hash))
+        if response["contents"] == "NonExistent":
+            raise TransactionNonExistent(tx_hash)
+        else:
+            return response["contents"]
+
+    async def uplink_get_invalid_transactions(self):
+        """Get list of invalid transactions"""
+        result = await self._call(endpoint='transactions/invalid')
+        return self._handle_response(result, many=True)
+
+    async def uplink_get_mempool(self):
+        """Get list of unconfirmed transactions"""
+        result = await self._call(endpoint='transactions/pool')
+        mem_pool_dict = self._handle_response(result, many=False)
+        return MemPool(mem_pool_dict)
+
+    async def uplink_get_mempool_size(self):
+        """Get size of node mempool"""
+        result = await self._call(endpoint='transactions/pool/size')
+        return self._handle_response(result, many=False)
+
+    async def uplink_get_mempools(self):
+        """Get unconfirmed transactions of all nodes in the network"""
+        return await self._call(endpoint='transactions/pool/all')
+
+    async def uplink_get_mempools_sizes(self):
+        """Get size of mempool for all nodes in the network"""
+        return await self._call(endpoint='transactions/pool/all/sizes')
+
+    async def uplink_test_saturate_network(self, n_txs, n_secs):
+        """Send cmd to p2p network to spawn n txs over m seconds (test mode only)"""
+        return await self._call(self._saturate_network_data(n_txs, n_secs))
+
+    async def uplink_test_reset_mempools(self):
+        """Send cmd to p2p network to reset all mempools (test mode only)"""
+        return await self._call(self._reset_mempools_data())
+
+    async def uplink_create_account(self, private_key, public_key,
+                                    from_address=None, metadata=None, timezone=None):
+        """Create new account, returns (tx_hash, account_address)"""
+        tx, acc_address = create_account_tx(private_key, public_key, from_address, metadata, timezone)
+        tx_hash = await self._issue_transaction(tx)
+        return (tx_hash, acc_address)
+
+    async def uplink_create_asset(self, private_key, origin, name,
+                                  supply, asset_type_nm, reference, issuer,
+                                  precision=None, metadata=None):
+        """Create Asset, returns (tx_hash, asset_address)"""
+        tx = create_asset_tx(private_key, origin, name, supply, asset_type_nm,
+                             reference, issuer, precision, metadata)
+        tx_hash = await self._issue_transaction(tx)
+        return (tx_hash, derive_asset_address(tx_hash))
+
+    async def uplink_transfer_asset(self, private_key, from_address, to_address, balance, asset_address):
+        """Transfer Asset holdings"""
+        tx = transfer_asset_tx(private_key, from_address, to_address, balance, asset_address)
+        return await self._issue_transaction(tx)
+
+    async def uplink_circulate_asset(self, private_key, from_address, amount, asset_address):
+        """Circulate asset supply"""
+        tx = circulate_asset_tx(private_key, from_address, amount, asset_address)
+        return await self._issue_transaction(tx)
+
+    async def uplink_create_contract(self, private_key, from_address, script):
+        """Create a new Contract, returns (tx_hash, contract_address)"""
+        tx = create_contract_tx(private_key, from_address, script)
+        tx_hash = await self._issue_transaction(tx)
+        return (tx_hash, derive_contract_address(tx_hash))
+
+    async def uplink_revoke_asset(self, private_key, from_address, asset_addr):
+        """Revoke Asset"""
+        tx = revoke_asset_tx(private_key, from_address, asset_addr)
+        return await self._issue_transaction(tx)
+
+    async def uplink_revoke_account(self, private_key, from_address, account_addr):
+        """Revoke account access"""
+        tx = revoke_account_tx(private_key, from_address, account_addr)
+        return await self._issue_transaction(tx)
+
+    async def uplink_call_contract(self, private_key, from_address, contract_addr, method, args):
+        """Call contract method"""
+        tx = call_contract_tx(private_key, from_address, contract_addr, method, args)
+        return await self._issue_transaction(tx)
+
+    async def uplink_query(self, query):
+        """Query Uplink Database - will only work if Uplink is created with postgres"""
+        result = await self._call(self._make_cmd_data('Query', params=query))
+        return self._handle_response(result, many=False)
+
+    async def uplink_sim_create(self, issuer, script, world=None):
+        """Create Simulation"""
+        result = await self._call(self._sim_create_data(issuer, script, world))
+        return self._handle_response(result, many=False)
+
+    async def uplink_sim_update(self, simulation_id, method_json):
+        """Update Simulation"""
+        result = await self._call(self._sim_update_data(simulation_id, method_json))
+        if self._handle_success(result):
+            return result
+        else:
+            print(result)
+            raise UplinkJsonRpcError("Update Simulation failure:", result)
+
+    # timestamp must be ISO_8601 formatted string
+    async def uplink_sim_update_set_time(self, simulation_id, timestamp):
+        """Update Simulation - Set Timestamp"""
+        params = self._sim_set_time_params(timestamp)
+        return await self.uplink_sim_update(simulation_id, params)
+
+    async def uplink_sim_update_add_timedelta(self, simulation_id, delta_str):
+        """Update Simulation - Add time delta"""
+        params = self._sim_add_timedelta_params(delta_str)
+        return await self.uplink_sim_update(simulation_id, params)
+
+    async def uplink_sim_call(self, simulation_id, caller, method, args):
+        """Update Simulation - Call Contact Method"""
+        params = self._sim_call_params(caller, method, args)
+        return await self.uplink_sim_update(simulation_id, params)
+
+    async def uplink_sim_query(self, simulation_id, query, addr=None, many=False):
+        """Query Simulation"""
+        result = await self._call(self._sim_query_data(simulation_id, query, addr))
+        return self._handle_response(result, many=many)
+
+    async def uplink_sim_query_methods(self, simulation_id):
+        """Query Simulation - Contract Methods"""
+        return await self.uplink_sim_query(simulation_id, "QueryMethods", many=True)
+
+    async def uplink_sim_query_contract(self, simulation_id):
+        """Query Simulation Contract"""
+        res = await self.uplink_sim_query(simulation_id, "QueryContract")
+
+        error_val = res.get("errorMsg")
+        if error_val:
+            print(error_val)
+            raise ValueError("Contract Simulation with id " + simulation_id + " does not exist")
+        else:
+            return Contract(**res)
+
+    async def uplink_sim_query_assets(self, simulation_id):
+        """Query Simulation - Assets"""
+        return await self.uplink_sim_query(simulation_id, "QueryAssets", many=True)
+
+    async def uplink_sim_query_asset(self, simulation_id, address):
+        """Query Simulation - Asset"""
+        res = await self.uplink_sim_query(simulation_id, "QueryAsset", address)
+
+        error_val = res.get("errorMsg")
+        if error_val:
+            print(error_val)
+            raise ValueError("Asset with address " + address + " does not exist")
+        else:
+            return Asset(**res)
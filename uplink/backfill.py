@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+from .bulk import fetch_many
+from .tailer import MemoryCheckpoint, fetch_block
+
+
+class BackfillStats(object):
+    """Progress of a backfill"""
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.blocks = 0
+        self.started = None
+        self.finished = None
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def blocks_per_second(self):
+        elapsed = self.elapsed
+        return self.blocks / elapsed if elapsed else 0.0
+
+    def __repr__(self):
+        return "<BackfillStats(blocks=%i, blocks_per_second=%.1f)>" % (
+            self.blocks, self.blocks_per_second)
+
+
+def chain_height(rpc, hint=0):
+    """
+    Number of blocks in the chain, found by probing ``uplink_block`` with an
+    exponential then a binary search (``O(log n)`` calls)
+
+    :param hint: index known to exist, e.g. from an earlier call
+    """
+    def exists(index):
+        return fetch_block(rpc, index) is not None
+
+    if not exists(hint):
+        return 0 if hint == 0 else chain_height(rpc)
+    low, high = hint, max(1, 2 * hint)
+    while exists(high):
+        low, high = high, 2 * high
+    # block low exists, block high does not
+    while high - low > 1:
+        mid = (low + high) // 2
+        if exists(mid):
+            low = mid
+        else:
+            high = mid
+    return high
+
+
+class Backfill(object):
+    """
+    Fetch the blocks with index in ``[start, end)`` concurrently, in order
+
+    The index range is split into ranges of ``range_size`` blocks, fetched by
+    up to ``max_workers`` threads. Finished ranges wait in a reorder buffer
+    until every range before them has been delivered, so blocks are yielded
+    in index order and at most ``2 * max_workers`` ranges are held in memory.
+
+    Once every block of a range has been processed, the index after it is
+    saved to ``checkpoint``; a backfill created with the same checkpoint
+    resumes from there. ::
+
+        backfill = Backfill(rpc, checkpoint=FileCheckpoint('backfill.json'))
+        for block in backfill:
+            index(block)
+        print(backfill.stats.blocks_per_second)
+
+    :param rpc: :class:`~uplink.client.UplinkJsonRpc` to fetch blocks with
+    :param start: first block index
+    :param end: index after the last block, by default the current chain height
+    :param max_workers: number of ranges fetched concurrently
+    :param range_size: number of consecutive blocks fetched by one worker
+    :param checkpoint: :class:`~uplink.tailer.FileCheckpoint` to resume from
+    :param progress: function called with :attr:`stats` after every range
+    """
+
+    def __init__(self, rpc, start=0, end=None, max_workers=8, range_size=16,
+                 checkpoint=None, progress=None):
+        self.rpc = rpc
+        self.checkpoint = checkpoint if checkpoint is not None else MemoryCheckpoint()
+        saved = self.checkpoint.load()
+        self.start = start if saved is None else max(start, saved)
+        if end is None:
+            end = chain_height(rpc)
+        self.end = end
+        self.max_workers = max_workers
+        self.range_size = range_size
+        self.progress = progress
+        self.stats = BackfillStats(self.start, self.end)
+
+    def ranges(self):
+        """``(first, last + 1)`` index pairs still to fetch"""
+        return ((i, min(i + self.range_size, self.end))
+                for i in range(self.start, self.end, self.range_size))
+
+    def _fetch_range(self, bounds):
+        return [self.rpc.uplink_block(i) for i in range(*bounds)]
+
+    def __iter__(self):
+        stats = self.stats
+        stats.started = time.time()
+        try:
+            for result in fetch_many(self._fetch_range, self.ranges(), self.max_workers):
+                if result.error is not None:
+                    raise result.error
+                for block in result.value:
+                    yield block
+                stats.blocks += len(result.value)
+                self.checkpoint.save(result.key[1])
+                if self.progress is not None:
+                    self.progress(stats)
+        finally:
+            stats.finished = time.time()
+
+    def run(self, fn):
+        """Call ``fn(block)`` for every block, returns :attr:`stats`"""
+        for block in self:
+            fn(block)
+        return self.stats
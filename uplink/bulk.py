@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .deadline import current_deadline, use_deadline
+
+# Outcome of a single lookup in a bulk request. Exactly one of value and
+# error is set; a failed lookup does not abort the rest of the batch.
+BulkResult = namedtuple('BulkResult', ['key', 'value', 'error'])
+
+
+def _fetch_one(fn, key, d):
+    try:
+        with use_deadline(d):
+            return BulkResult(key, fn(key), None)
+    except Exception as e:
+        return BulkResult(key, None, e)
+
+
+def fetch_many(fn, keys, max_workers, ordered=True):
+    """
+    Call ``fn`` for every key on a bounded pool of worker threads
+
+    At most ``2 * max_workers`` lookups are queued at any time, so ``keys``
+    may be an arbitrarily long (or lazy) iterable. If a deadline is active
+    it applies to every lookup, and once it passes no further lookups are
+    started and DeadlineExceeded is raised.
+
+    :param fn: function of a single key, e.g. ``rpc.uplink_get_account``
+    :param keys: iterable of keys to look up
+    :param max_workers: number of concurrent lookups
+    :param ordered: yield results in input order, otherwise as they complete
+    :return: generator of :class:`BulkResult`
+    """
+    keys = iter(keys)
+    d = current_deadline()
+    window = 2 * max_workers
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = deque()
+
+    def fill():
+        while len(pending) < window:
+            try:
+                key = next(keys)
+            except StopIteration:
+                return
+            if d is not None:
+                d.check()
+            pending.append(executor.submit(_fetch_one, fn, key, d))
+
+    try:
+        fill()
+        while pending:
+            if ordered:
+                yield pending.popleft().result()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    yield future.result()
+            fill()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+from collections import OrderedDict
+
+# Returned by cache lookups that miss, None is a valid cached value
+MISSING = object()
+
+
+class CacheStats(object):
+    """Hit, miss and eviction counters of a cache"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / float(lookups) if lookups else 0.0
+
+    def snapshot(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'hit_rate': self.hit_rate}
+
+    def __repr__(self):
+        return "<CacheStats(hits=%i, misses=%i, evictions=%i)>" % (
+            self.hits, self.misses, self.evictions)
+
+
+class LRUCache(object):
+    """
+    Thread safe least-recently-used cache bounded by entry count and/or size
+
+    Entries are evicted, least recently used first, once either
+    ``max_entries`` entries are held or their sizes add up to more than
+    ``max_bytes``. Cached values are shared between callers and must not be
+    modified.
+
+    :param max_entries: maximum number of entries, ``None`` for no limit
+    :param max_bytes: maximum total size of entries, ``None`` for no limit
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Cached value for key, or MISSING"""
+        with self._lock:
+            try:
+                value, size = self._entries.pop(key)
+            except KeyError:
+                self.stats.misses += 1
+                return MISSING
+            self._entries[key] = (value, size)
+            self.stats.hits += 1
+            return value
+
+    def put(self, key, value, size=0, started=None):
+        """
+        Cache value under key, ``size`` counts towards ``max_bytes``
+
+        :param started: time the value was read from the node, used by
+                        caches whose entries may change (see :class:`TTLCache`)
+        """
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            self._store(key, value, size)
+
+    def _store(self, key, value, size):
+        self._drop(key)
+        self._entries[key] = (value, size)
+        self.size += size
+        self._evict()
+
+    def _drop(self, key):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= old[1]
+
+    def _evict(self):
+        while self._entries and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries) or
+                (self.max_bytes is not None and self.size > self.max_bytes)):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.size -= size
+            self.stats.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class TTLCache(LRUCache):
+    """
+    LRU cache whose entries expire after a per-kind time to live
+
+    Keys are ``(kind, address)`` pairs where kind is one of ``account``,
+    ``asset``, ``contract`` or ``callable``. Kinds without a TTL are not
+    cached.
+
+    Keys may be held while a transaction that changes them is pending: they
+    are not cached until they are released, nor afterwards with a value
+    read before the hold or the release.
+
+    :param ttl: seconds an entry stays fresh, either one value for all kinds
+                or a dict mapping kind to seconds
+    :param max_entries: maximum number of entries, ``None`` for no limit
+    """
+
+    KINDS = ('account', 'asset', 'contract', 'callable')
+
+    def __init__(self, ttl=1.0, max_entries=4096):
+        super(TTLCache, self).__init__(max_entries=max_entries)
+        if not isinstance(ttl, dict):
+            ttl = dict((kind, ttl) for kind in self.KINDS)
+        self.ttl = ttl
+        self._held = {}
+        # time of the last hold or release of recently held keys
+        self._changed = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                (expires, value), size = self._entries.pop(key)
+            except KeyError:
+                self.stats.misses += 1
+                return MISSING
+            if time.time() >= expires:
+                self.size -= size
+                self.stats.misses += 1
+                return MISSING
+            self._entries[key] = ((expires, value), size)
+            self.stats.hits += 1
+            return value
+
+    def put(self, key, value, size=0, started=None):
+        ttl = self.ttl.get(key[0])
+        if ttl is None:
+            return
+        with self._lock:
+            if key in self._held:
+                return
+            changed = self._changed.get(key)
+            if changed is not None and started is not None and started <= changed:
+                return
+            self._store(key, (time.time() + ttl, value), size)
+
+    def _mark_changed(self, key, now):
+        self._drop(key)
+        self._changed.pop(key, None)
+        self._changed[key] = now
+        if self.max_entries is not None and len(self._changed) > self.max_entries:
+            self._changed.popitem(last=False)
+
+    def hold(self, keys):
+        """Drop the entries under keys and cache none of them until released"""
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                self._held[key] = self._held.get(key, 0) + 1
+                self._mark_changed(key, now)
+
+    def release(self, keys):
+        """Undo one :meth:`hold` of keys"""
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                count = self._held.pop(key, 0) - 1
+                if count > 0:
+                    self._held[key] = count
+                self._mark_changed(key, now)
+
+    def invalidate_address(self, address):
+        """Drop every cached entity stored under address"""
+        for kind in self.KINDS:
+            self.invalidate((kind, address))
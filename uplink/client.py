@@ -1,73 +1,81 @@
 # -*- coding: utf-8 -*-
 
-import json
 import time
-import codecs
-import requests
-from requests.exceptions import ConnectionError as RequestsConnectionError
-from .protocol import (Block, Peer, Account, Asset, Contract, Transaction,
-                       MemPool, Transfer, TxAccount, TxAsset, TxContract, CreateAccount,
-                       CreateAsset, CreateContract, RevokeAccount, Call, SyncLocal, Bind,
-                       CreateAccountHeader, CreateAssetHeader, TransferAssetHeader, Circulate, CirculateAssetHeader, AssetType,
-                       CreateContractHeader, RevokeAccountHeader, RevokeAsset, RevokeAssetHeader, CallHeader, BindHeader, SyncHeader)
-from .exceptions import (RpcConnectionFail, BadStatusCodeError, BadJsonError,
-                         BadResponseError, UplinkJsonRpcError,
-                         TransactionNonExistent)
+import functools
+import threading
+from contextlib import contextmanager
+from requests.exceptions import (ConnectionError as RequestsConnectionError, Timeout as RequestsTimeout,
+                                 ChunkedEncodingError)
+from .protocol import Block, LazyBlock, Peer, Account, Asset, Contract, Transaction, MemPool
+from .exceptions import (RpcConnectionFail, BadStatusCodeError, BadJsonError, UplinkJsonRpcError,
+                         TransactionNonExistent, RpcTimeout, DeadlineExceeded)
 from .cryptography import (pack_signature,
-                           get_time,
                            derive_contract_address,
                            derive_account_address,
                            derive_asset_address,
                            ecdsa_sign)
+from .transactions import (create_account_tx, create_asset_tx, transfer_asset_tx, circulate_asset_tx,
+                           create_contract_tx, revoke_asset_tx, revoke_account_tx, call_contract_tx,
+                           touched_addresses)
+from .transport import HTTPTransport, DEFAULT_POOL_MAXSIZE
+from .bulk import fetch_many
+from .retry import RetryPolicy
+from .deadline import current_deadline
+from .cache import MISSING
+from .stream import JsonArrayParser, STREAM_CHUNK_SIZE
+from .confirm import ConfirmationTracker
+from .codec import get_codec
+from .metrics import MetricsRegistry, normalize_endpoint, payload_size
+from .phases import phase, current_record
+from .recording import RecordingTransport
 
 UPLINK_PORT = 8545
 
 
-class UplinkJsonRpc(object):
-    """JSON RPC For Uplink"""
+def _timed_transaction(fn):
+    """Record the phases of a transaction method in the client's phase timer"""
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        if self.phase_timer is None:
+            return fn(self, *args, **kwargs)
+        with self.phase_timer.transaction():
+            return fn(self, *args, **kwargs)
+    return wrapper
 
-    def __init__(self, host='localhost', port=UPLINK_PORT, tls=False):
+
+class BaseUplinkJsonRpc(object):
+    """
+    Request construction and response handling shared by the blocking and
+    asyncio JSON RPC clients
+    """
+
+    def __init__(self, host='localhost', port=UPLINK_PORT, tls=False, codec=None, metrics=None):
         self.host = host
         self.port = port
         self.tls = tls
+        self.codec = codec if codec is not None else get_codec()
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
 
     def _make_url(self, endpoint):
         scheme = 'https' if self.tls else 'http'
         return '{}://{}:{}/{}'.format(scheme, self.host,
                                          self.port, endpoint)
 
+    def _record_request(self, url, data, started, bytes_in=0, error=None):
+        endpoint = normalize_endpoint(url.split('/', 3)[3], data)
+        self.metrics.record(endpoint, time.time() - started, payload_size(data), bytes_in, error)
+
+    def _bad_json(self, endpoint, data, cause):
+        error = BadJsonError("bad json error", cause)
+        self.metrics.record_error(normalize_endpoint(endpoint, data), error)
+        return error
+
     def _make_cmd_data(self, method, params={}):
         data = {
             'method': method,
             'params': params,
         }
-        return json.dumps(data)
-
-    def _call(self, data='', method='post', endpoint=''):
-        url = self._make_url(endpoint)
-
-        try:
-            response = getattr(requests, method)(url, data=data)
-        except RequestsConnectionError:
-            raise RpcConnectionFail('connection error:', None)
-        if response.status_code / 100 != 2:
-            raise BadStatusCodeError("status code: " + str(response.status_code), response)
-        try:
-            return response.json()
-        except ValueError as e:
-            raise BadJsonError("bad json error", e)
-
-
-    # Issues a transaction to the uplink RPC interface, returning the
-    # tranasction hash on success, and throwing an exception on failure.
-    def _issue_transaction(self, tx):
-        data = self._make_cmd_data("Transaction", tx.to_dict())
-        response = self._call(data)
-        if response["tag"] == "RPCTransactionOK":
-            return response["txHash"]
-        else:
-            print(response)
-            raise UplinkJsonRpcError("Malformed Transaction: " + str(tx), response)
+        return self.codec.dumps(data)
 
     def _handle_response(self, result, many=True):
         if result['tag'] in ["RPCResp", "RPCTransactionOK"]:
@@ -79,20 +87,32 @@ class UplinkJsonRpc(object):
         else:
             raise UplinkJsonRpcError(result["tag"], result["contents"])
 
+    def _stream_elements(self, parser, chunk=None, endpoint=''):
+        """
+        Feed the next chunk of a streamed list response to parser, or signal
+        the end of the body with ``chunk=None``. Returns the list elements
+        completed by the chunk.
+        """
+        try:
+            elems = parser.feed(chunk) if chunk is not None else parser.close()
+        except ValueError as e:
+            raise self._bad_json(endpoint, '', e)
+        envelope = parser.envelope
+        tag = envelope.get('tag')
+        if tag is not None and tag not in ["RPCResp", "RPCTransactionOK"]:
+            raise UplinkJsonRpcError(tag, envelope.get('contents'))
+        if chunk is None and (tag is None or 'contents' in envelope):
+            # contents was missing or not a list
+            raise UplinkJsonRpcError(tag, envelope.get('contents'))
+        return elems
+
     def _handle_success(self, result):
         if result['tag'] in ["RPCRespOK", "RPCTransactionOK"]:
             return True
         else:
             return False
 
-    def uplink_reset_db(self, private_key, public_key):
-        """
-        Resets and clears Uplink database.
-        This request will return an error if the node is not in test mode
-
-        :param private_key: private key of primary account
-        :param public_key: public key of primary account
-        """
+    def _reset_db_data(self, private_key, public_key):
         address = derive_account_address(public_key)
         r, s = ecdsa_sign(private_key, address.encode())
         signature = pack_signature(r, s)
@@ -104,8 +124,360 @@ class UplinkJsonRpc(object):
                 "signature": signature.decode()
             }
         }
+        return self._make_cmd_data("Test", params)
 
-        return self._call(self._make_cmd_data("Test", params))
+    def _saturate_network_data(self, n_txs, n_secs):
+        params = {
+            "method": "SaturateNetwork",
+            "params": {"nTxs": n_txs,
+                       "nSecs": n_secs}
+        }
+        return self._make_cmd_data("Test", params)
+
+    def _reset_mempools_data(self):
+        params = {
+            "method": "ResetMemPools",
+            "params": {}
+        }
+        return self._make_cmd_data("Test", params)
+
+    def _sim_create_data(self, issuer, script, world):
+        params = {
+            "tag": "CreateSimulationMsg",
+            "contents": {
+                "issuer": issuer,
+                "fcl": script,
+                "world": world
+            }
+        }
+        return self._make_cmd_data('Simulate', params=params)
+
+    def _sim_update_data(self, simulation_id, method_json):
+        params = {
+            "tag": "UpdateSimulationMsg",
+            "contents": {
+                "simKey": simulation_id,
+                "contents": method_json
+            }
+        }
+        return self._make_cmd_data('Simulate', params=params)
+
+    def _sim_set_time_params(self, timestamp):
+        return {
+            "tag": "ModifyTimestamp",
+            "contents": {
+                "tag": "SetTimestamp",
+                "contents": timestamp
+            }
+        }
+
+    def _sim_add_timedelta_params(self, delta_str):
+        return {
+            "tag": "ModifyTimestamp",
+            "contents": {
+                "tag": "AddTimeDelta",
+                "contents": delta_str
+            }
+        }
+
+    def _sim_call_params(self, caller, method, args):
+        return {
+            "tag": "CallMethod",
+            "contents": {
+                "caller": caller,
+                "methodName": method,
+                "methodArgs": [arg.to_dict() for arg in args]
+            }
+        }
+
+    def _sim_query_data(self, simulation_id, query, addr):
+        params = {
+            "tag": "QuerySimulationMsg",
+            "contents": {
+                "simKey": simulation_id,
+                "contents": {
+                    "tag": query,
+                    "contents": addr
+                }
+            }
+        }
+        return self._make_cmd_data('Simulate', params=params)
+
+
+class UplinkJsonRpc(BaseUplinkJsonRpc):
+    """
+    JSON RPC For Uplink
+
+    Requests are sent over a pool of keep-alive connections. Pass an existing
+    ``transport`` to share one pool between several clients, otherwise a
+    private :class:`~uplink.transport.HTTPTransport` is created from the
+    ``pool_*`` settings.
+
+    :param host: uplink node host
+    :param port: uplink node RPC port
+    :param tls: use https
+    :param transport: HTTP transport to send requests with
+    :param pool_connections: number of per-host connection pools
+    :param pool_maxsize: maximum number of kept-alive connections per host
+    :param pool_idle_timeout: seconds after which idle connections are closed
+    :param retry_policy: :class:`~uplink.retry.RetryPolicy` for failed calls,
+                         by default every call is attempted once
+    :param connect_timeout: seconds to wait for a connection, ``None`` to wait forever
+    :param read_timeout: seconds to wait for the node to respond, ``None`` to wait forever
+    :param block_cache: :class:`~uplink.cache.LRUCache` for blocks and their
+                        transactions, which never change once written
+    :param state_cache: :class:`~uplink.cache.TTLCache` for account, asset,
+                        contract and contract callable lookups. Entries are
+                        dropped when this client issues a transaction that
+                        touches them, and not cached again until
+                        :attr:`confirmations` sees it confirmed or rejected.
+    :param codec: :class:`~uplink.codec.JsonCodec` for request and response
+                  bodies, by default the standard library one (exact
+                  for integers of any size)
+    :param metrics: :class:`~uplink.metrics.MetricsRegistry` recording every
+                    request attempt, by default one for this client alone
+    :param phase_timer: :class:`~uplink.phases.PhaseTimer` recording where the
+                        time of each issued transaction goes, off by default
+    """
+
+    def __init__(self, host='localhost', port=UPLINK_PORT, tls=False, transport=None,
+                 pool_connections=None, pool_maxsize=None, pool_idle_timeout=None,
+                 retry_policy=None, connect_timeout=None, read_timeout=None,
+                 block_cache=None, state_cache=None, codec=None, metrics=None, phase_timer=None):
+        super(UplinkJsonRpc, self).__init__(host, port, tls, codec, metrics)
+
+        if transport is None:
+            pool_settings = {}
+            if pool_connections is not None:
+                pool_settings['pool_connections'] = pool_connections
+            if pool_maxsize is not None:
+                pool_settings['pool_maxsize'] = pool_maxsize
+            if pool_idle_timeout is not None:
+                pool_settings['idle_timeout'] = pool_idle_timeout
+            transport = HTTPTransport(**pool_settings)
+        self.transport = transport
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=1)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._local = threading.local()
+        self.block_cache = block_cache
+        self.state_cache = state_cache
+        self.phase_timer = phase_timer
+        self._confirmations = None
+        self._confirmations_lock = threading.Lock()
+
+    def close(self):
+        """Close the pooled connections held by this client's transport"""
+        if self._confirmations is not None:
+            self._confirmations.close()
+        self.stop_recording()
+        self.transport.close()
+
+    def start_recording(self, path):
+        """
+        Append every request and response of this client to the recording at
+        ``path``, to be served back later by a
+        :class:`~uplink.recording.ReplayTransport`
+        """
+        self.stop_recording()
+        self.transport = RecordingTransport(self.transport, path)
+
+    def stop_recording(self):
+        """Stop a recording started with :meth:`start_recording`"""
+        if isinstance(self.transport, RecordingTransport):
+            self.transport.close()
+            self.transport = self.transport.transport
+
+    @property
+    def confirmations(self):
+        """
+        :class:`~uplink.confirm.ConfirmationTracker` shared by every caller of
+        this client, created on first use
+        """
+        if self._confirmations is None:
+            with self._confirmations_lock:
+                if self._confirmations is None:
+                    self._confirmations = ConfirmationTracker(self)
+        return self._confirmations
+
+    @contextmanager
+    def timeouts(self, connect=None, read=None):
+        """
+        Override the client's timeouts for calls made in this block (on the
+        current thread) ::
+
+            with rpc.timeouts(read=0.5):
+                asset = rpc.uplink_get_asset(address)
+        """
+        previous = getattr(self._local, 'timeouts', None)
+        self._local.timeouts = (connect, read)
+        try:
+            yield
+        finally:
+            self._local.timeouts = previous
+
+    def _timeout(self):
+        connect, read = self.connect_timeout, self.read_timeout
+        override = getattr(self._local, 'timeouts', None)
+        if override is not None:
+            connect = override[0] if override[0] is not None else connect
+            read = override[1] if override[1] is not None else read
+
+        d = current_deadline()
+        if d is not None:
+            d.check()
+            remaining = d.remaining()
+            connect = remaining if connect is None else min(connect, remaining)
+            read = remaining if read is None else min(read, remaining)
+
+        if connect is None and read is None:
+            return None
+        return (connect, read)
+
+    def _call(self, data='', method='post', endpoint='', idempotent=True):
+        """
+        Send a request to the node and decode the JSON response
+
+        Failed attempts are retried according to the client's retry policy;
+        ``idempotent`` must be False for requests that change ledger or node
+        state.
+        """
+        return self._decode(self._call_raw(data, method, endpoint, idempotent), endpoint, data)
+
+    def _call_raw(self, data='', method='post', endpoint='', idempotent=True, stream=False):
+        url = self._make_url(endpoint)
+        return self.retry_policy.call(lambda: self._send(method, url, data, stream), idempotent)
+
+    def _decode(self, response, endpoint='', data=''):
+        try:
+            return self.codec.loads(response.content)
+        except ValueError as e:
+            raise self._bad_json(endpoint, data, e)
+
+    def _cached_call(self, cache, endpoint, key=None):
+        if cache is None:
+            return self._call(endpoint=endpoint)
+        key = endpoint if key is None else key
+        result = cache.get(key)
+        if result is MISSING:
+            started = time.time()
+            response = self._call_raw(endpoint=endpoint)
+            result = self._decode(response, endpoint)
+            contents = result.get('contents')
+            if result.get('tag') == 'RPCResp' and not (isinstance(contents, dict) and 'errorMsg' in contents):
+                cache.put(key, result, len(response.content), started)
+        return result
+
+    def _iter_call(self, endpoint, cls, raw=False):
+        """
+        Stream a list endpoint, yielding a ``cls`` instance for every element
+        as soon as it has been read from the response body. With ``raw`` the
+        instances are built with ``cls.from_json`` from each element's JSON
+        source.
+        """
+        response = self._call_raw(endpoint=endpoint, stream=True)
+        parser = JsonArrayParser(raw=raw)
+        chunks = response.iter_content(STREAM_CHUNK_SIZE)
+        try:
+            while True:
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    chunk = None
+                except (RequestsConnectionError, ChunkedEncodingError) as e:
+                    raise RpcConnectionFail('connection error:', None, cause=e)
+                for elem in self._stream_elements(parser, chunk, endpoint):
+                    yield cls.from_json(*elem) if raw else cls(**elem)
+                if chunk is None:
+                    return
+        finally:
+            response.close()
+
+    def _send(self, method, url, data, stream=False):
+        timeout = self._timeout()
+        started = time.time()
+        try:
+            response = self.transport.request(method, url, data=data, timeout=timeout, stream=stream)
+        except RequestsTimeout as e:
+            self._record_request(url, data, started, error=e)
+            d = current_deadline()
+            if d is not None and d.expired():
+                raise DeadlineExceeded("deadline of {}s exceeded".format(d.seconds), None)
+            raise RpcTimeout('timeout:', None, cause=e)
+        except RequestsConnectionError as e:
+            self._record_request(url, data, started, error=e)
+            raise RpcConnectionFail('connection error:', None, cause=e)
+        if stream:
+            # the body has not been read yet
+            bytes_in = int(response.headers.get('Content-Length') or 0)
+        else:
+            bytes_in = len(response.content)
+        if response.status_code // 100 != 2:
+            error = BadStatusCodeError("status code: " + str(response.status_code), response)
+            self._record_request(url, data, started, bytes_in, error)
+            if stream:
+                # hand the connection back to the pool
+                response.close()
+            raise error
+        self._record_request(url, data, started, bytes_in)
+        return response
+
+
+    # Issues a transaction to the uplink RPC interface, returning the
+    # tranasction hash on success, and throwing an exception on failure.
+    def _issue_transaction(self, tx):
+        record = current_record()
+        if record is not None:
+            record.tx_type = tx.header.contents.tag
+            record.mark('build')
+        with phase('to_dict'):
+            params = tx.to_dict()
+        with phase('encode'):
+            data = self._make_cmd_data("Transaction", params)
+        with phase('http'):
+            response = self._call(data, idempotent=False)
+        if response["tag"] == "RPCTransactionOK":
+            if self.state_cache is not None:
+                self._hold_until_confirmed(response["txHash"], touched_addresses(tx))
+            return response["txHash"]
+        else:
+            print(response)
+            raise UplinkJsonRpcError("Malformed Transaction: " + str(tx), response)
+
+    def _hold_until_confirmed(self, tx_hash, keys):
+        # A read before the transaction is committed would cache the state
+        # from before it, so the entities it changes are not cached until
+        # it is confirmed (or rejected).
+        if not keys:
+            return
+        cache = self.state_cache
+        cache.hold(keys)
+        try:
+            tracked = self.confirmations.track(tx_hash)
+        except RuntimeError:
+            # the client is closed
+            cache.release(keys)
+            return
+        tracked.add_done_callback(lambda _: cache.release(keys))
+
+    def _transaction_result(self, tx_hash, result, future):
+        if future:
+            future = self.confirmations.confirm(tx_hash, result)
+            record = current_record()
+            if record is not None:
+                record.defer_until(future)
+            return future
+        return result
+
+    def uplink_reset_db(self, private_key, public_key):
+        """
+        Resets and clears Uplink database.
+        This request will return an error if the node is not in test mode
+
+        :param private_key: private key of primary account
+        :param public_key: public key of primary account
+        """
+        return self._call(self._reset_db_data(private_key, public_key), idempotent=False)
 
     def uplink_block(self, block_id):
         """
@@ -115,20 +487,38 @@ class UplinkJsonRpc(object):
         :return: specific block
         """
         block_by_id = 'blocks/{}'.format(block_id)
-        result = self._call(endpoint=block_by_id)
+        result = self._cached_call(self.block_cache, block_by_id)
         elems = self._handle_response(result, many=False)
         return Block(**elems)
 
-    def uplink_blocks(self):
+    def uplink_blocks(self, lazy=False):
         """
         Get a list of all blocks
 
+        :param lazy: return :class:`~uplink.protocol.LazyBlock` objects, which
+                     decode transactions and signatures only when accessed
         :return: all blocks
         """
+        if lazy:
+            return list(self._iter_call('blocks', LazyBlock, raw=True))
         result = self._call(endpoint='blocks')
         elems = self._handle_response(result, many=True)
         return [Block(**args) for args in elems]
 
+    def uplink_iter_blocks(self, lazy=False):
+        """
+        Iterate over all blocks without loading the whole list into memory
+
+        The response body is parsed incrementally and each Block is yielded as
+        soon as it has been read.
+
+        :param lazy: yield :class:`~uplink.protocol.LazyBlock` objects
+        :return: generator of Block objects
+        """
+        if lazy:
+            return self._iter_call('blocks', LazyBlock, raw=True)
+        return self._iter_call('blocks', Block)
+
     def uplink_peers(self):
         """
         Get a list of peers and return number of peers
@@ -169,7 +559,7 @@ class UplinkJsonRpc(object):
         :return: all transactions specified by block id
         """
         transactions_by_id = 'transactions/{}'.format(block_id)
-        result = self._call(endpoint=transactions_by_id)
+        result = self._cached_call(self.block_cache, transactions_by_id)
         elems = self._handle_response(result, many=True)
         return [Transaction(**args) for args in elems]
 
@@ -183,6 +573,17 @@ class UplinkJsonRpc(object):
         elems = self._handle_response(result, many=True)
         return [Account(**args) for args in elems]
 
+    def uplink_iter_accounts(self):
+        """
+        Iterate over all accounts without loading the whole list into memory
+
+        The response body is parsed incrementally and each Account is yielded as
+        soon as it has been read.
+
+        :return: generator of Account objects
+        """
+        return self._iter_call('accounts', Account)
+
     def uplink_get_account(self, address):
         """
         Get individual account by address [/accounts/<address>]
@@ -191,7 +592,7 @@ class UplinkJsonRpc(object):
         :return: specific account and associated details
         """
         account_by_address = 'accounts/{}'.format(address)
-        result = self._call(endpoint=account_by_address)
+        result = self._cached_call(self.state_cache, account_by_address, ('account', address))
         elems = self._handle_response(result, many=False)
         return Account(**elems)
 
@@ -206,6 +607,17 @@ class UplinkJsonRpc(object):
 
         return [Asset(**args) for args in elems]
 
+    def uplink_iter_assets(self):
+        """
+        Iterate over all assets without loading the whole list into memory
+
+        The response body is parsed incrementally and each Asset is yielded as
+        soon as it has been read.
+
+        :return: generator of Asset objects
+        """
+        return self._iter_call('assets', Asset)
+
     def uplink_get_asset(self, address):
         """
         Get individual asset by address [/assets/<address>]
@@ -214,7 +626,7 @@ class UplinkJsonRpc(object):
         :return: specific asset and associated details
         """
         asset_by_address = 'assets/{}'.format(address)
-        result = self._call(endpoint=asset_by_address)
+        result = self._cached_call(self.state_cache, asset_by_address, ('asset', address))
         elems = self._handle_response(result, many=False)
         try:
             if elems['errorMsg']:
@@ -242,6 +654,17 @@ class UplinkJsonRpc(object):
 
         return [Contract(**args) for args in elems]
 
+    def uplink_iter_contracts(self):
+        """
+        Iterate over all contracts without loading the whole list into memory
+
+        The response body is parsed incrementally and each Contract is yielded as
+        soon as it has been read.
+
+        :return: generator of Contract objects
+        """
+        return self._iter_call('contracts', Contract)
+
     def uplink_get_contract(self, address):
         """
         Get individual contract by address
@@ -250,7 +673,7 @@ class UplinkJsonRpc(object):
         :return: specific contract and associated details
         """
         contract_by_address = 'contracts/{}'.format(address)
-        result = self._call(endpoint=contract_by_address)
+        result = self._cached_call(self.state_cache, contract_by_address, ('contract', address))
         elems = self._handle_response(result, many=False)
         return Contract(**elems)
 
@@ -260,10 +683,48 @@ class UplinkJsonRpc(object):
         return specific contract methods
         """
         contract_by_address = 'contracts/{}/callable'.format(address)
-        result = self._call(endpoint=contract_by_address)
+        result = self._cached_call(self.state_cache, contract_by_address, ('callable', address))
         elems = self._handle_response(result, many=False)
         return elems
 
+    def _fetch_many(self, fn, addresses, max_workers, ordered):
+        if max_workers is None:
+            max_workers = getattr(self.transport, 'pool_maxsize', DEFAULT_POOL_MAXSIZE)
+        return fetch_many(fn, addresses, max_workers, ordered=ordered)
+
+    def uplink_get_accounts_many(self, addresses, max_workers=None, ordered=True):
+        """
+        Get many accounts concurrently
+
+        :param addresses: iterable of account addresses
+        :param max_workers: number of concurrent requests, defaults to the connection pool size
+        :param ordered: yield results in input order, otherwise as they arrive
+        :return: generator of BulkResult(key=address, value=Account, error=exception)
+        """
+        return self._fetch_many(self.uplink_get_account, addresses, max_workers, ordered)
+
+    def uplink_get_assets_many(self, addresses, max_workers=None, ordered=True):
+        """
+        Get many assets concurrently
+
+        :param addresses: iterable of asset addresses
+        :param max_workers: number of concurrent requests, defaults to the connection pool size
+        :param ordered: yield results in input order, otherwise as they arrive
+        :return: generator of BulkResult(key=address, value=Asset, error=exception)
+        """
+        return self._fetch_many(self.uplink_get_asset, addresses, max_workers, ordered)
+
+    def uplink_get_contracts_many(self, addresses, max_workers=None, ordered=True):
+        """
+        Get many contracts concurrently
+
+        :param addresses: iterable of contract addresses
+        :param max_workers: number of concurrent requests, defaults to the connection pool size
+        :param ordered: yield results in input order, otherwise as they arrive
+        :return: generator of BulkResult(key=address, value=Contract, error=exception)
+        """
+        return self._fetch_many(self.uplink_get_contract, addresses, max_workers, ordered)
+
     def uplink_validate_script(self, content):
         """
         Validate a script
@@ -279,7 +740,7 @@ class UplinkJsonRpc(object):
         :return: errors or a compiled contract
         """
         endpoint = "scripts/command/parse"
-        response = self._call(json.dumps(content), endpoint=endpoint)
+        response = self._call(self.codec.dumps(content), endpoint=endpoint)
         return self._handle_response(response, many=False)
 
     def uplink_validate_method(self, content):
@@ -305,7 +766,7 @@ class UplinkJsonRpc(object):
 
         """
         endpoint = "scripts/command"
-        response = self._call(json.dumps(payload), endpoint=endpoint)
+        response = self._call(self.codec.dumps(payload), endpoint=endpoint)
         return self._handle_response(response, many=False)
 
     def uplink_get_invalid_transaction(self, tx_hash):
@@ -372,12 +833,7 @@ class UplinkJsonRpc(object):
         :param n_txs: number of transactions to send
         :param n_secs: number of seconds to send those transactions in
         """
-        params = {
-            "method": "SaturateNetwork",
-            "params": {"nTxs": n_txs,
-                       "nSecs": n_secs}
-        }
-        return self._call(self._make_cmd_data("Test", params))
+        return self._call(self._saturate_network_data(n_txs, n_secs), idempotent=False)
 
     def uplink_test_reset_mempools(self):
         """
@@ -386,14 +842,11 @@ class UplinkJsonRpc(object):
 
         :return: clears list of unconfirmed transactions on network
         """
-        params = {
-            "method": "ResetMemPools",
-            "params": {}
-        }
-        return self._call(self._make_cmd_data("Test", params))
+        return self._call(self._reset_mempools_data(), idempotent=False)
 
+    @_timed_transaction
     def uplink_create_account(self, private_key, public_key,
-                              from_address=None, metadata=None, timezone=None):
+                              from_address=None, metadata=None, timezone=None, future=False):
         """
         Create new account
 
@@ -402,33 +855,17 @@ class UplinkJsonRpc(object):
         :param from_address: Address of account to be created
         :param metadata: Metadata to be associated with created account
         :param timezone: Timezone information related to account
+        :param future: return a Future resolved once the transaction is accepted
         :return: account
         """
-        if timezone is None:
-            timezone, localtz = time.tzname
-        if metadata is None:
-            metadata = {}
-
-
-        public_key_hex = codecs.encode(public_key.to_string(), 'hex')
-
-        acc_address = derive_account_address(public_key)
-        hdr = CreateAccountHeader(
-            public_key_hex, metadata, acc_address, timezone)
-        txb = TxAccount(CreateAccount(hdr))
-
-        r, s = hdr.sign(private_key)
-        signature = pack_signature(r, s)
-
-        origin = acc_address if from_address is None else from_address
-        tx = Transaction(txb, signature, origin=origin)
-
+        tx, acc_address = create_account_tx(private_key, public_key, from_address, metadata, timezone)
         tx_hash = self._issue_transaction(tx)
-        return (tx_hash, acc_address)
+        return self._transaction_result(tx_hash, (tx_hash, acc_address), future)
 
+    @_timed_transaction
     def uplink_create_asset(self, private_key, origin, name,
                             supply, asset_type_nm, reference, issuer,
-                            precision=None, metadata=None):
+                            precision=None, metadata=None, future=False):
         """
         Create Asset
 
@@ -440,27 +877,17 @@ class UplinkJsonRpc(object):
         :param reference: Token, Security, GBP, EUR, CHF, USD
         :param issuer: same as origin
         :param precision: decimal precision for Fractional assets only
+        :param future: return a Future resolved once the transaction is accepted
         :return: tuple of transaction hash and asset address
         """
-        """Create Asset - returns (result, to_address)"""
-
-        if metadata is None:
-            metadata = {}
-
-        hdr = CreateAssetHeader(name, supply, asset_type_nm,
-                                reference, issuer, precision, metadata)
-        txb = TxAsset(CreateAsset(hdr))
-
-        r, s = hdr.sign(private_key)
-        signature = pack_signature(r, s)
-
-        tx = Transaction(txb, signature, origin=origin)
-
+        tx = create_asset_tx(private_key, origin, name, supply, asset_type_nm,
+                             reference, issuer, precision, metadata)
         tx_hash = self._issue_transaction(tx)
         asset_address = derive_asset_address(tx_hash)
-        return (tx_hash, asset_address)
+        return self._transaction_result(tx_hash, (tx_hash, asset_address), future)
 
-    def uplink_transfer_asset(self, private_key, from_address, to_address, balance, asset_address):
+    @_timed_transaction
+    def uplink_transfer_asset(self, private_key, from_address, to_address, balance, asset_address, future=False):
         """
         Transfer Asset holdings
 
@@ -469,21 +896,15 @@ class UplinkJsonRpc(object):
         :param to_address: address holdings are being transferred to
         :param balance: amount of holdings to be transferred
         :param asset_address: address of asset to be transferred
+        :param future: return a Future resolved once the transaction is accepted
         :return: transaction hash if successful
         """
-
-        hdr = TransferAssetHeader(asset_address, to_address, balance)
-
-        txb = TxAsset(Transfer(hdr))
-        r, s = hdr.sign(private_key)
-        signature = pack_signature(r, s)
-
-        tx = Transaction(txb, signature, origin=from_address)
-
+        tx = transfer_asset_tx(private_key, from_address, to_address, balance, asset_address)
         tx_hash = self._issue_transaction(tx)
-        return tx_hash
+        return self._transaction_result(tx_hash, tx_hash, future)
 
-    def uplink_circulate_asset(self, private_key, from_address, amount, asset_address):
+    @_timed_transaction
+    def uplink_circulate_asset(self, private_key, from_address, amount, asset_address, future=False):
         """
         Circulate asset supply
 
@@ -491,83 +912,60 @@ class UplinkJsonRpc(object):
         :param from_address: address of account circulating asset
         :param amount: amount of asset holdings to be circulated
         :param asset_address: address of asset to be circulated
+        :param future: return a Future resolved once the transaction is accepted
         :return: transaction hash if successful
         """
-        hdr = CirculateAssetHeader(asset_address, amount)
-        txb = TxAsset(Circulate(hdr))
-
-        r, s = hdr.sign(private_key)
-        signature = pack_signature(r, s)
-
-        tx = Transaction(txb, signature, origin=from_address)
-
+        tx = circulate_asset_tx(private_key, from_address, amount, asset_address)
         tx_hash = self._issue_transaction(tx)
-        return tx_hash
+        return self._transaction_result(tx_hash, tx_hash, future)
 
-    def uplink_create_contract(self, private_key, from_address, script):
+    @_timed_transaction
+    def uplink_create_contract(self, private_key, from_address, script, future=False):
         """
         Create a new Contract
 
         :param private_key: private key of account creating contract
         :param from_address: address of account creating contract
         :param script: contract code
+        :param future: return a Future resolved once the transaction is accepted
         :return: tuple of transaction hash and contract address
         """
-
-        hdr = CreateContractHeader(script)
-        txb = TxContract(CreateContract(hdr))
-
-        r, s = hdr.sign(private_key)
-        signature = pack_signature(r, s)
-
-        tx = Transaction(txb, signature, origin=from_address)
-
+        tx = create_contract_tx(private_key, from_address, script)
         tx_hash = self._issue_transaction(tx)
         contract_address = derive_contract_address(tx_hash)
-        return (tx_hash, contract_address)
+        return self._transaction_result(tx_hash, (tx_hash, contract_address), future)
 
-    def uplink_revoke_asset(self, private_key, from_address, asset_addr):
+    @_timed_transaction
+    def uplink_revoke_asset(self, private_key, from_address, asset_addr, future=False):
         """
         Revoke Asset
 
         :param private_key: private key of account revoking asset - must be the same account as the initial issuer of the asset
         :param from_address: address of the account revoking asset
         :param asset_addr: address of the asset being revoked
+        :param future: return a Future resolved once the transaction is accepted
         :return: transaction hash if successful
         """
-
-        hdr = RevokeAssetHeader(asset_addr)
-        txb = TxAsset(RevokeAsset(hdr))
-
-        r, s = hdr.sign(private_key)
-        signature = pack_signature(r, s)
-
-        tx = Transaction(txb, signature, origin=from_address)
-
+        tx = revoke_asset_tx(private_key, from_address, asset_addr)
         tx_hash = self._issue_transaction(tx)
-        return tx_hash
+        return self._transaction_result(tx_hash, tx_hash, future)
 
-    def uplink_revoke_account(self, private_key, from_address, account_addr):
+    @_timed_transaction
+    def uplink_revoke_account(self, private_key, from_address, account_addr, future=False):
         """Revoke account access
 
         :param private_key: private key of account revoking access - must be the same account as the account being revoked
         :param from_address: address of account revoking access
         :param account_addr: address of the account being revoked
+        :param future: return a Future resolved once the transaction is accepted
         :return: transaction hash if successful
         """
-
-        hdr = RevokeAccountHeader(account_addr)
-        txb = TxAccount(RevokeAccount(hdr))
-
-        r, s = hdr.sign(private_key)
-        signature = pack_signature(r, s)
-
-        tx = Transaction(txb, signature, origin=from_address)
-
+        tx = revoke_account_tx(private_key, from_address, account_addr)
         tx_hash = self._issue_transaction(tx)
-        return tx_hash
+        return self._transaction_result(tx_hash, tx_hash, future)
 
-    def uplink_call_contract(self, private_key, from_address, contract_addr, method, args):
+    @_timed_transaction
+    def uplink_call_contract(self, private_key, from_address, contract_addr, method, args, future=False):
         """Call contract method
 
         :param private_key: private key of account calling contract method
@@ -575,19 +973,12 @@ class UplinkJsonRpc(object):
         :param contract_addr: address of contract being called
         :param method: method name off contract being called
         :param args: arguments to the method
+        :param future: return a Future resolved once the transaction is accepted
         :return: transaction hash if successful
         """
-
-        hdr = CallHeader(contract_addr, method, args)
-        txb = TxContract(Call(hdr))
-
-        r, s = hdr.sign(private_key)
-        signature = pack_signature(r, s)
-
-        tx = Transaction(txb, signature, origin=from_address)
-
+        tx = call_contract_tx(private_key, from_address, contract_addr, method, args)
         tx_hash = self._issue_transaction(tx)
-        return tx_hash
+        return self._transaction_result(tx_hash, tx_hash, future)
 
     def uplink_query(self, query):
         """Query Uplink Database - will only work if Uplink is created with postgres
@@ -600,15 +991,7 @@ class UplinkJsonRpc(object):
 
     def uplink_sim_create(self, issuer, script, world=None):
         """Create Simulation"""
-        params = {
-            "tag": "CreateSimulationMsg",
-            "contents": {
-                "issuer": issuer,
-                "fcl": script,
-                "world": world
-            }
-        }
-        result = self._call(self._make_cmd_data('Simulate', params=params))
+        result = self._call(self._sim_create_data(issuer, script, world), idempotent=False)
         return self._handle_response(result, many=False)
 
     def uplink_sim_update(self, simulation_id, method_json):
@@ -619,14 +1002,7 @@ class UplinkJsonRpc(object):
         :param method_json: The dictionary representing the simulation update
         :return: RPCRespOK on success
         """
-        params = {
-            "tag": "UpdateSimulationMsg",
-            "contents": {
-                "simKey": simulation_id,
-                "contents": method_json
-            }
-        }
-        result = self._call(self._make_cmd_data('Simulate', params=params))
+        result = self._call(self._sim_update_data(simulation_id, method_json), idempotent=False)
         if self._handle_success(result):
             return result
         else:
@@ -642,13 +1018,7 @@ class UplinkJsonRpc(object):
         :param timestamp: The timestamp to set the contract's timestamp to
         :return: RPCRespOK on success
         """
-        params = {
-            "tag": "ModifyTimestamp",
-            "contents": {
-                "tag": "SetTimestamp",
-                "contents": timestamp
-            }
-        }
+        params = self._sim_set_time_params(timestamp)
         return self.uplink_sim_update(simulation_id, params)
 
     def uplink_sim_update_add_timedelta(self, simulation_id, delta_str):
@@ -659,13 +1029,7 @@ class UplinkJsonRpc(object):
         :param delta_str: The string representing the timedelta to add to the contract's timestamp
         :return: RPCRespOK on success
         """
-        params = {
-            "tag": "ModifyTimestamp",
-            "contents": {
-                "tag": "AddTimeDelta",
-                "contents": delta_str
-            }
-        }
+        params = self._sim_add_timedelta_params(delta_str)
         return self.uplink_sim_update(simulation_id, params)
 
     def uplink_sim_call(self, simulation_id, caller, method, args):
@@ -676,14 +1040,7 @@ class UplinkJsonRpc(object):
         :param method: The name of the contract method to call
         :param args: A list of arguments to pass to the method call
         """
-        params = {
-            "tag": "CallMethod",
-            "contents": {
-                "caller": caller,
-                "methodName": method,
-                "methodArgs": [arg.to_dict() for arg in args]
-            }
-        }
+        params = self._sim_call_params(caller, method, args)
         return self.uplink_sim_update(simulation_id, params)
 
     def uplink_sim_query(self, simulation_id, query, addr=None, many=False):
@@ -696,17 +1053,7 @@ class UplinkJsonRpc(object):
         :param many: Whether or not to expect a list of items as a response
         :return: The result of the "query" specified
         """
-        params = {
-            "tag": "QuerySimulationMsg",
-            "contents": {
-                "simKey": simulation_id,
-                "contents": {
-                    "tag": query,
-                    "contents": addr
-                }
-            }
-        }
-        result = self._call(self._make_cmd_data('Simulate', params=params))
+        result = self._call(self._sim_query_data(simulation_id, query, addr))
         return self._handle_response(result, many=many)
 
     def uplink_sim_query_methods(self, simulation_id):
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+# ------------------------------------------------------------------------
+# JSON codecs
+#
+# Decoding RPC responses and encoding request bodies may use a faster JSON
+# library when one is installed and asked for. The default is the standard
+# library: orjson and ujson decode integers beyond 64 bits inexactly, and
+# ledger amounts may be that large. Canonical serialization (the sorted
+# output of Serializable.to_json, used for golden files and hashing) always
+# goes through the standard library so it stays byte-identical everywhere.
+# ------------------------------------------------------------------------
+
+
+def canonical_dumps(obj, **kwargs):
+    """Deterministic serialization with sorted keys, always via stdlib json"""
+    return json.dumps(obj, sort_keys=True, **kwargs)
+
+
+class JsonCodec(object):
+    """Standard library codec, and the interface of the faster ones"""
+
+    name = 'json'
+
+    def loads(self, data):
+        """Decode JSON from bytes or text"""
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+    def dumps(self, obj):
+        """Encode obj as JSON text, key order and spacing are unspecified"""
+        return json.dumps(obj)
+
+    def __repr__(self):
+        return "<%s(name=%s)>" % (type(self).__name__, self.name)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    Codec backed by orjson. Values orjson cannot encode, such as integers
+    beyond 64 bits, are encoded by the standard library instead.
+
+    orjson decodes integers beyond 64 bits as floats, losing precision. Only
+    use it for responses known to hold no such integers.
+    """
+
+    name = 'orjson'
+
+    def loads(self, data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # raises again for malformed input
+            return super(OrjsonCodec, self).loads(data)
+
+    def dumps(self, obj):
+        try:
+            return orjson.dumps(obj).decode('utf-8')
+        except TypeError:
+            return super(OrjsonCodec, self).dumps(obj)
+
+
+class UjsonCodec(JsonCodec):
+    """Codec backed by ujson, for decoding only"""
+
+    name = 'ujson'
+
+    def loads(self, data):
+        try:
+            return ujson.loads(data)
+        except ValueError:
+            return super(UjsonCodec, self).loads(data)
+
+
+CODECS = {'json': JsonCodec}
+if orjson is not None:
+    CODECS['orjson'] = OrjsonCodec
+if ujson is not None:
+    CODECS['ujson'] = UjsonCodec
+
+def get_codec(name='json'):
+    """
+    JSON codec by name, the standard library one by default
+
+    :param name: ``json``, or ``orjson`` or ``ujson`` when installed
+    """
+    try:
+        return CODECS[name]()
+    except KeyError:
+        raise ValueError("JSON codec {!r} is not available".format(name))
+
+
+default_codec = get_codec()
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+
+import time
+import heapq
+import itertools
+import threading
+from collections import namedtuple, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+from .exceptions import (TransactionNonExistent, TransactionRejected, RpcConnectionFail,
+                         BadStatusCodeError, BadJsonError, DeadlineExceeded)
+
+ACCEPTED = 'Accepted'
+REJECTED = 'Rejected'
+NON_EXISTENT = 'NonExistent'
+FINAL_STATUSES = frozenset([ACCEPTED, REJECTED, NON_EXISTENT])
+
+# Failures of a status query that say nothing about the transaction
+TRANSIENT_ERRORS = (RpcConnectionFail, BadStatusCodeError, BadJsonError, DeadlineExceeded)
+
+# A transaction is queried at least every this many turns, even while an
+# older one is still pending
+_MAX_SKIPS = 4
+
+# Final status of a tracked transaction. ``detail`` is the status as
+# returned by the node, ``latency`` the seconds from tracking to resolution
+# and ``polls`` the number of status queries it took.
+TxStatus = namedtuple('TxStatus', ['tx_hash', 'status', 'detail', 'latency', 'polls'])
+
+
+def status_name(status):
+    """Name of a transaction status, which the node may return tagged"""
+    if isinstance(status, dict):
+        return status.get('tag')
+    return status
+
+
+class _Pending(object):
+    __slots__ = ('tx_hash', 'future', 'started', 'interval', 'polls', 'skips', 'failing_since')
+
+    def __init__(self, tx_hash, interval):
+        self.tx_hash = tx_hash
+        self.future = Future()
+        self.started = time.time()
+        self.interval = interval
+        self.polls = 0
+        self.skips = 0
+        self.failing_since = None
+
+
+class ConfirmationTracker(object):
+    """
+    Wait for many transactions from one shared polling loop
+
+    Each tracked transaction hash is polled with
+    ``uplink_get_transaction_status`` until it is Accepted, Rejected or
+    NonExistent. Polls are scheduled on a single timer heap and run on at
+    most ``max_workers`` threads, however many transactions are pending.
+
+    The node has no query for many statuses at once, so polls are batched
+    instead: every transaction due within ``initial_interval`` is polled in
+    the same turn, oldest first, split across the workers. A batch stops
+    querying at the first transaction that is still pending, since the ones
+    issued after it are almost always undecided as well; they are queried
+    again on a later turn, and at the latest after ``4`` skipped turns.
+
+    A status query that fails with one of :data:`TRANSIENT_ERRORS`, e.g. a
+    connection error, is retried like a pending status. The transaction
+    only fails once its queries have kept failing for ``timeout`` seconds.
+    Any other error fails it at once.
+
+    The first poll of a transaction is made after the moving average of
+    recent confirmation times (initially ``initial_interval``); while it stays
+    pending the interval between polls grows by ``backoff`` up to
+    ``max_interval``. ::
+
+        tracker = ConfirmationTracker(rpc)
+        for status in tracker.as_completed(tx_hashes, timeout=30):
+            print(status.tx_hash, status.status)
+
+    :param rpc: :class:`~uplink.client.UplinkJsonRpc` to poll with
+    :param initial_interval: shortest delay before the first poll, in seconds
+    :param max_interval: longest delay between two polls, in seconds
+    :param backoff: factor the polling interval grows by after each poll
+    :param max_workers: maximum number of concurrent status queries
+    :param smoothing: weight of the latest confirmation time in the moving average
+    :param timeout: seconds the status queries of a transaction may keep
+                    failing before it fails with the last error, or None to
+                    retry for as long as it is tracked
+    """
+
+    def __init__(self, rpc, initial_interval=0.05, max_interval=2.0, backoff=1.5, max_workers=4,
+                 smoothing=0.2, timeout=60.0):
+        self.rpc = rpc
+        self.timeout = timeout
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_workers = max_workers
+        self.smoothing = smoothing
+        self.confirm_time = None
+        self._heap = []
+        self._pending = {}
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._executor = None
+        self._thread = None
+        self._closed = False
+
+    def __len__(self):
+        """Number of transactions not yet resolved"""
+        return len(self._pending)
+
+    def _first_delay(self):
+        if self.confirm_time is None:
+            return self.initial_interval
+        # aim just before the typical confirmation
+        return max(self.initial_interval, min(self.max_interval, 0.8 * self.confirm_time))
+
+    def track(self, tx_hash):
+        """
+        Start tracking a transaction
+
+        :return: ``concurrent.futures.Future`` resolved with a :class:`TxStatus`,
+                 or with the exception raised while polling
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("ConfirmationTracker is closed")
+            entry = self._pending.get(tx_hash)
+            if entry is not None:
+                return entry.future
+            delay = self._first_delay()
+            entry = _Pending(tx_hash, delay)
+            self._pending[tx_hash] = entry
+            heapq.heappush(self._heap, (entry.started + delay, next(self._seq), entry))
+            if self._thread is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+                self._thread = threading.Thread(target=self._run, name='uplink-confirmations')
+                self._thread.daemon = True
+                self._thread.start()
+            self._cond.notify()
+        return entry.future
+
+    def wait(self, tx_hash, timeout=None):
+        """Block until the transaction is resolved, returns its :class:`TxStatus`"""
+        return self.track(tx_hash).result(timeout)
+
+    def confirm(self, tx_hash, result=None):
+        """
+        Future for the outcome of an issued transaction
+
+        It resolves with ``result`` once the transaction is Accepted, or fails
+        with TransactionRejected or TransactionNonExistent. The hash is
+        available as ``future.tx_hash``; in a coroutine, await
+        ``asyncio.wrap_future(future)``.
+
+        :param result: value of the future on acceptance, e.g. the tx hash
+        """
+        future = Future()
+        future.tx_hash = tx_hash
+
+        def resolve(tracked):
+            if tracked.cancelled():
+                future.cancel()
+                return
+            error = tracked.exception()
+            if error is not None:
+                future.set_exception(error)
+                return
+            status = tracked.result()
+            if status.status == ACCEPTED:
+                future.set_result(result)
+            elif status.status == REJECTED:
+                future.set_exception(TransactionRejected(tx_hash, status.detail))
+            else:
+                future.set_exception(TransactionNonExistent(tx_hash))
+
+        self.track(tx_hash).add_done_callback(resolve)
+        return future
+
+    def as_completed(self, tx_hashes, timeout=None):
+        """
+        Track every hash in tx_hashes, yielding each :class:`TxStatus` as soon
+        as it is resolved. A hash given more than once is yielded once.
+
+        :param timeout: seconds to wait for all of them, after which
+                        ``concurrent.futures.TimeoutError`` is raised
+        """
+        futures = [self.track(tx_hash) for tx_hash in OrderedDict.fromkeys(tx_hashes)]
+        for future in as_completed(futures, timeout):
+            yield future.result()
+
+    def close(self):
+        """Stop polling, cancelling every pending future"""
+        with self._cond:
+            self._closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+            del self._heap[:]
+            self._cond.notify()
+        for entry in pending:
+            entry.future.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _run(self):
+        cond = self._cond
+        while True:
+            with cond:
+                while True:
+                    if self._closed:
+                        return
+                    timeout = None
+                    if self._heap and self._in_flight < self.max_workers:
+                        timeout = self._heap[0][0] - time.time()
+                        if timeout <= 0:
+                            break
+                    cond.wait(timeout)
+                horizon = time.time() + self.initial_interval
+                due = []
+                while self._heap and self._heap[0][0] <= horizon:
+                    due.append(heapq.heappop(self._heap)[2])
+                due.sort(key=lambda entry: entry.started)
+                # every batch starts with one of the oldest transactions
+                slots = min(self.max_workers - self._in_flight, len(due))
+                batches = [due[i::slots] for i in range(slots)]
+                self._in_flight += slots
+            for batch in batches:
+                self._executor.submit(self._poll, batch)
+
+    def _query(self, entry):
+        entry.polls += 1
+        try:
+            return self.rpc.uplink_get_transaction_status(entry.tx_hash), None
+        except TransactionNonExistent:
+            return NON_EXISTENT, None
+        except Exception as e:
+            return None, e
+
+    def _poll(self, batch):
+        results = []
+        undecided = False
+        for entry in batch:
+            if undecided and entry.skips < _MAX_SKIPS:
+                entry.skips += 1
+                results.append((entry, None, None))
+                continue
+            entry.skips = 0
+            status, error = self._query(entry)
+            if error is not None or status_name(status) not in FINAL_STATUSES:
+                undecided = True
+            results.append((entry, status, error))
+
+        now = time.time()
+        resolved = []
+        with self._cond:
+            self._in_flight -= 1
+            if self._closed:
+                return
+            for entry, status, error in results:
+                name = status_name(status)
+                if error is None:
+                    entry.failing_since = None
+                elif isinstance(error, TRANSIENT_ERRORS):
+                    if entry.failing_since is None:
+                        entry.failing_since = now
+                    if self.timeout is None or now - entry.failing_since < self.timeout:
+                        error = None
+                if error is not None or name in FINAL_STATUSES:
+                    del self._pending[entry.tx_hash]
+                    resolved.append((entry, name, status, error))
+                    if name == ACCEPTED:
+                        latency = now - entry.started
+                        if self.confirm_time is None:
+                            self.confirm_time = latency
+                        else:
+                            self.confirm_time += self.smoothing * (latency - self.confirm_time)
+                else:
+                    entry.interval = min(self.max_interval, entry.interval * self.backoff)
+                    heapq.heappush(self._heap, (now + entry.interval, next(self._seq), entry))
+            self._cond.notify()
+
+        for entry, name, status, error in resolved:
+            if error is not None:
+                entry.future.set_exception(error)
+            else:
+                entry.future.set_result(
+                    TxStatus(entry.tx_hash, name, status, now - entry.started, entry.polls))
@@ -7,6 +7,8 @@ import codecs
 from base58 import b58encode, b58decode
 from ecdsa import SigningKey, SECP256k1, util, ellipticcurve, VerifyingKey
 
+from . import signing
+
 # ------------------------------------------------------------------------
 # Time
 # ------------------------------------------------------------------------
@@ -117,12 +119,19 @@ def save_key(sk, name):
     return 'name'
 
 
-def ecdsa_sign(sk, msg, k=None):
-    """Sign ecdsa"""
-    sig = sk.sign(msg, hashfunc=sha3.sha3_256, k=k)
-    signature = util.sigdecode_string(sig, order)
+def ecdsa_sign(sk, msg, k=None, deterministic=False, backend=None):
+    """Sign ecdsa
 
-    return signature  # matches haskell output
+    :param k: fixed nonce, signs with the pure Python ``ecdsa`` backend
+    :param deterministic: derive the nonce from key and message (RFC 6979)
+    :param backend: signing backend, defaults to the fastest one installed
+                    (see :mod:`uplink.signing`)
+    """
+    if k is not None:
+        return signing.EcdsaBackend().sign_with_k(sk, msg, k)
+    if backend is None:
+        backend = signing.default_backend
+    return backend.sign(sk, msg, deterministic=deterministic)  # matches haskell output
 
 
 def pack_signature(r, s):
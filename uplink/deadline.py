@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+from contextlib import contextmanager
+
+from .exceptions import DeadlineExceeded
+
+_local = threading.local()
+
+
+class Deadline(object):
+    """Point in time after which an operation should give up"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires = time.time() + seconds
+
+    def remaining(self):
+        """Seconds left, never negative"""
+        return max(0.0, self.expires - time.time())
+
+    def expired(self):
+        return time.time() >= self.expires
+
+    def check(self):
+        """Raise DeadlineExceeded if the deadline has passed"""
+        if self.expired():
+            raise DeadlineExceeded("deadline of {}s exceeded".format(self.seconds), None)
+
+    def __repr__(self):
+        return "<Deadline(remaining=%.3f)>" % self.remaining()
+
+
+def current_deadline():
+    """Innermost deadline active on this thread, or None"""
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def use_deadline(d):
+    """Make an existing deadline current, e.g. in a worker thread"""
+    if d is None:
+        yield None
+        return
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(d)
+    try:
+        yield d
+    finally:
+        stack.pop()
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    Give every RPC call in the block ``seconds`` to complete in total
+
+    Calls made after the deadline raise DeadlineExceeded and request
+    timeouts are shortened to the time remaining. Nested deadlines can only
+    shorten an enclosing one. ::
+
+        with deadline(5):
+            tx_hash = rpc.uplink_transfer_asset(...)
+            wait_until_tx_accepted(rpc, tx_hash)
+    """
+    d = Deadline(seconds)
+    parent = current_deadline()
+    if parent is not None and parent.expires < d.expires:
+        d = parent
+    with use_deadline(d):
+        yield d
+
+
+def check_deadline():
+    """Raise DeadlineExceeded if the current deadline has passed"""
+    d = current_deadline()
+    if d is not None:
+        d.check()
@@ -8,6 +8,17 @@ class UplinkJsonRpcError(Exception):
         return repr(self.message) + ":" + str(self.response)
 
 class RpcConnectionFail(UplinkJsonRpcError):
+    def __init__(self, message, response, cause=None):
+        super(RpcConnectionFail, self).__init__(message, response)
+        # underlying requests exception, used to classify the failure
+        self.cause = cause
+
+
+class RpcTimeout(RpcConnectionFail):
+    pass
+
+
+class DeadlineExceeded(UplinkJsonRpcError):
     pass
 
 
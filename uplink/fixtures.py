@@ -2,8 +2,10 @@ import time
 
 import os
 import pytest
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 
 from uplink.exceptions import TransactionRejected
+from uplink.deadline import current_deadline
 from uplink.client import UplinkJsonRpcError, UplinkJsonRpc, Account
 from uplink.cryptography import ecdsa_new
 
@@ -503,25 +505,39 @@ def wait_until_tx_accepted(rpc, tx_hash):
         raise TransactionRejected(tx_hash, status)
 
 
-def wait_until_tx_processed(rpc, tx_hash):
+def wait_until_tx_processed(rpc, tx_hash, timeout=20):
     """
     Wait until a transaction has been either Accepted or Rejected
+
+    The transaction is polled by the client's shared confirmation tracker.
+    Gives up with DeadlineExceeded once the current deadline has passed.
     """
-    query_tx_status = rpc.uplink_get_transaction_status
-    wait_until(lambda: query_tx_status(tx_hash) in ["NonExistent", "Accepted", "Rejected"])
-    return query_tx_status(tx_hash)
+    d = current_deadline()
+    future = rpc.confirmations.track(tx_hash)
+    try:
+        status = future.result(timeout if d is None else min(timeout, d.remaining()))
+    except FuturesTimeoutError:
+        if d is not None:
+            d.check()
+        raise TimeoutError("Timed out in wait_until_tx_processed")
+    return status.status
 
 def wait_until(pred, tries=20, delay=1):
     """
     Wait until predicate is true, else fail
 
+    Gives up with DeadlineExceeded once the current deadline has passed.
+
     :param pred:
     :param tries:
     :param delay:
     """
+    d = current_deadline()
     while tries != 0:
-        time.sleep(delay)
+        time.sleep(delay if d is None else min(delay, d.remaining()))
         tries -= 1
+        if d is not None:
+            d.check()
         if pred():
             return
 
@@ -0,0 +1,392 @@
+# -*- coding: utf-8 -*-
+"""
+Client-side load generator.
+
+Drives signed transfers, contract calls and reads through the SDK at a
+target rate or concurrency, from a pool of provisioned accounts, and
+reports achieved throughput, accepted and rejected transactions and
+submit and confirm latency percentiles over time::
+
+    $ uplink-loadgen --accounts 20 --save-pool pool.json --provision-only
+    $ uplink-loadgen --pool pool.json --rate 200 --duration 60 --mix transfer=8,call=1,read=1
+"""
+
+from __future__ import print_function
+
+import sys
+import json
+import time
+import random
+import codecs
+import argparse
+import threading
+
+import sha3
+from ecdsa import SigningKey, SECP256k1
+
+from .client import UplinkJsonRpc, UPLINK_PORT
+from .cryptography import ecdsa_new
+from .exceptions import TransactionRejected
+from .metrics import Histogram
+from .protocol import VNum, NumDecimal, Dec
+from .submit import TransactionSubmitter, TxIntent
+
+try:
+    import queue
+except ImportError:  # python 2
+    import Queue as queue  # type: ignore
+
+OPERATIONS = ('transfer', 'call', 'read')
+DEFAULT_MIX = {'transfer': 8, 'call': 1, 'read': 1}
+
+# Contract called by the ``call`` operation
+LOAD_CONTRACT = """
+global int counter = 0;
+
+transition initial -> terminal;
+
+@initial
+incr (int n) {
+  counter = counter + n;
+}
+
+@initial
+end () {
+  terminate();
+}
+"""
+
+
+def parse_mix(text):
+    """Parse ``transfer=8,call=1,read=1`` into a dict of operation weights"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError("unknown operation {!r}, expected one of {}".format(name, ', '.join(OPERATIONS)))
+        mix[name] = float(weight) if weight else 1.0
+    return mix
+
+
+def _wait_accepted(rpc, tx_hashes, timeout):
+    for status in rpc.confirmations.as_completed(tx_hashes, timeout):
+        if status.status != 'Accepted':
+            raise TransactionRejected(status.tx_hash, status.detail)
+
+
+class AccountPool(object):
+    """
+    Accounts holding an asset, and a contract, to generate load with
+
+    :param accounts: list of ``(private_key, address)``
+    :param asset_address: asset every account holds
+    :param contract_address: contract with an ``incr(int)`` method, or None
+    """
+
+    def __init__(self, accounts, asset_address, contract_address=None):
+        self.accounts = accounts
+        self.asset_address = asset_address
+        self.contract_address = contract_address
+
+    def __len__(self):
+        return len(self.accounts)
+
+    @classmethod
+    def provision(cls, rpc, size, holdings=1000000, workers=8, timeout=60):
+        """
+        Create ``size`` accounts, an asset issued by the first one with
+        ``holdings`` transferred to every account, and the load contract
+        """
+        keys = [ecdsa_new() for _ in range(size)]
+        submitter = TransactionSubmitter(rpc, workers=workers)
+        outcomes = submitter.run(TxIntent('create_account', {'private_key': sk, 'public_key': pk})
+                                 for pk, sk in keys)
+        for outcome in outcomes:
+            if outcome.error is not None:
+                raise outcome.error
+        _wait_accepted(rpc, [o.result[0] for o in outcomes], timeout)
+        accounts = [(sk, o.result[1]) for (pk, sk), o in zip(keys, outcomes)]
+
+        issuer_key, issuer = accounts[0]
+        supply = holdings * size
+        tx_hash, asset_address = rpc.uplink_create_asset(issuer_key, issuer, 'loadgen', supply,
+                                                         'Discrete', 'Token', issuer)
+        contract_hash, contract_address = rpc.uplink_create_contract(issuer_key, issuer, LOAD_CONTRACT)
+        _wait_accepted(rpc, [tx_hash, contract_hash], timeout)
+        _wait_accepted(rpc, [rpc.uplink_circulate_asset(issuer_key, issuer, supply, asset_address)], timeout)
+
+        outcomes = submitter.run(
+            TxIntent('transfer_asset', {'private_key': issuer_key, 'from_address': issuer,
+                                        'to_address': address, 'balance': holdings,
+                                        'asset_address': asset_address})
+            for _, address in accounts[1:])
+        for outcome in outcomes:
+            if outcome.error is not None:
+                raise outcome.error
+        _wait_accepted(rpc, [o.result for o in outcomes], timeout)
+        return cls(accounts, asset_address, contract_address)
+
+    def save(self, path):
+        data = {
+            'asset': self.asset_address,
+            'contract': self.contract_address,
+            'accounts': [{'key': codecs.encode(sk.to_string(), 'hex').decode(), 'address': address}
+                         for sk, address in self.accounts],
+        }
+        with open(path, 'w') as fd:
+            json.dump(data, fd, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as fd:
+            data = json.load(fd)
+        accounts = [(SigningKey.from_string(codecs.decode(a['key'], 'hex'), curve=SECP256k1,
+                                            hashfunc=sha3.sha3_256), a['address'])
+                    for a in data['accounts']]
+        return cls(accounts, data['asset'], data.get('contract'))
+
+
+class LoadStats(object):
+    """Outcome counters and latency histograms, for one interval or a whole run"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.counts = dict((name, 0) for name in ('submitted', 'accepted', 'rejected', 'errors', 'reads'))
+        self.submit_latency = Histogram()
+        self.confirm_latency = Histogram()
+        self.read_latency = Histogram()
+
+    def incr(self, name, n=1):
+        self.counts[name] += n
+
+    def summary(self, now=None):
+        elapsed = (now or time.time()) - self.started
+        counts = self.counts
+        finished = counts['accepted'] + counts['rejected']
+        summary = dict(counts)
+        summary.update({
+            'elapsed': elapsed,
+            'tps': counts['submitted'] / elapsed if elapsed else 0.0,
+            'accepted_tps': counts['accepted'] / elapsed if elapsed else 0.0,
+            'accept_ratio': counts['accepted'] / float(finished) if finished else 0.0,
+        })
+        for name in ('submit', 'confirm', 'read'):
+            hist = getattr(self, name + '_latency')
+            p50, p90, p99 = hist.percentiles(50, 90, 99)
+            summary[name + '_latency'] = {'p50': p50, 'p90': p90, 'p99': p99, 'max': hist.max or 0.0}
+        return summary
+
+
+def format_summary(summary):
+    return ("{elapsed:7.1f}s  tps {tps:8.1f}  accepted {accepted:6d}  rejected {rejected:5d}  "
+            "errors {errors:5d}  reads {reads:6d}  submit p50/p99 {sp50:7.1f}/{sp99:7.1f} ms  "
+            "confirm p50/p99 {cp50:7.1f}/{cp99:7.1f} ms").format(
+        sp50=1000 * summary['submit_latency']['p50'], sp99=1000 * summary['submit_latency']['p99'],
+        cp50=1000 * summary['confirm_latency']['p50'], cp99=1000 * summary['confirm_latency']['p99'],
+        **summary)
+
+
+class LoadGenerator(object):
+    """
+    Issue a mix of operations from an :class:`AccountPool`
+
+    With ``rate`` operations are started at that many per second by up to
+    ``concurrency`` threads, and latencies are measured from when each was
+    due, so a node falling behind shows up as growing latency rather than
+    as a lower request rate. Without it every thread issues operations back
+    to back.
+
+    :param rpc: :class:`~uplink.client.UplinkJsonRpc` to issue operations with
+    :param pool: :class:`AccountPool`
+    :param rate: target operations per second, or None for closed loop
+    :param concurrency: number of threads issuing operations
+    :param mix: dict of operation name (transfer, call, read) to weight
+    :param interval: seconds between interval reports
+    :param report: called with the summary dict of every interval
+    """
+
+    def __init__(self, rpc, pool, rate=None, concurrency=8, mix=None, interval=1.0, report=None):
+        self.rpc = rpc
+        self.pool = pool
+        self.rate = rate
+        self.concurrency = concurrency
+        mix = dict(mix or DEFAULT_MIX)
+        if not pool.contract_address:
+            mix.pop('call', None)
+        self._ops = [op for op in OPERATIONS if mix.get(op)]
+        self._weights = [mix[op] for op in self._ops]
+        self.interval = interval
+        self.report = report
+        self.total = LoadStats()
+        self._window = LoadStats()
+        self._lock = threading.Lock()
+        self._pending = set()
+
+    def _record(self, fn):
+        with self._lock:
+            fn(self.total)
+            fn(self._window)
+
+    def _confirmed(self, submitted):
+        def done(future):
+            with self._lock:
+                self._pending.discard(future)
+            if future.cancelled():
+                return
+            error = future.exception()
+            latency = time.time() - submitted
+
+            def record(stats):
+                if error is None:
+                    stats.incr('accepted')
+                    stats.confirm_latency.record(latency)
+                elif isinstance(error, TransactionRejected):
+                    stats.incr('rejected')
+                else:
+                    stats.incr('errors')
+            self._record(record)
+        return done
+
+    def _operation(self, rng, due):
+        op = self._choose(rng)
+        pool = self.pool
+        key, origin = rng.choice(pool.accounts)
+        try:
+            if op == 'read':
+                self.rpc.uplink_get_asset(pool.asset_address)
+                latency = time.time() - due
+                self._record(lambda stats: (stats.incr('reads'), stats.read_latency.record(latency)))
+                return
+            if op == 'transfer':
+                _, to_address = rng.choice(pool.accounts)
+                future = self.rpc.uplink_transfer_asset(key, origin, to_address, 1, pool.asset_address,
+                                                        future=True)
+            else:
+                future = self.rpc.uplink_call_contract(key, origin, pool.contract_address, 'incr',
+                                                       [VNum(NumDecimal(Dec(0, 1)))], future=True)
+        except Exception:
+            self._record(lambda stats: stats.incr('errors'))
+            return
+        submitted = time.time()
+        latency = submitted - due
+        self._record(lambda stats: (stats.incr('submitted'), stats.submit_latency.record(latency)))
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._confirmed(submitted))
+
+    def _choose(self, rng):
+        point = rng.uniform(0, sum(self._weights))
+        for op, weight in zip(self._ops, self._weights):
+            point -= weight
+            if point <= 0:
+                return op
+        return self._ops[-1]
+
+    def _work(self, seed, tickets, stop):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            if tickets is None:
+                self._operation(rng, time.time())
+                continue
+            due = tickets.get()
+            if due is None:
+                return
+            self._operation(rng, due)
+
+    def _pace(self, tickets, stop):
+        period = 1.0 / self.rate
+        due = time.time()
+        while not stop.is_set():
+            delay = due - time.time()
+            if delay > 0:
+                stop.wait(delay)
+            tickets.put(due)
+            due += period
+
+    def run(self, duration, drain_timeout=30):
+        """Generate load for ``duration`` seconds, returns the summary of the whole run"""
+        stop = threading.Event()
+        tickets = queue.Queue(maxsize=self.concurrency * 4) if self.rate else None
+        threads = [threading.Thread(target=self._work, args=(i, tickets, stop))
+                   for i in range(self.concurrency)]
+        if tickets is not None:
+            threads.append(threading.Thread(target=self._pace, args=(tickets, stop)))
+        self.total = LoadStats()
+        self._window = LoadStats()
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        end = time.time() + duration
+        while time.time() < end:
+            time.sleep(max(0.0, min(self.interval, end - time.time())))
+            with self._lock:
+                window, self._window = self._window, LoadStats()
+            if self.report is not None:
+                self.report(window.summary())
+
+        stop.set()
+        if tickets is not None:
+            for _ in range(self.concurrency):
+                try:
+                    tickets.put(None, timeout=1)
+                except queue.Full:
+                    break
+        for thread in threads:
+            thread.join(drain_timeout)
+
+        # wait for outstanding confirmations
+        deadline = time.time() + drain_timeout
+        while time.time() < deadline:
+            with self._lock:
+                if not self._pending:
+                    break
+            time.sleep(0.05)
+        return self.total.summary(end)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate transaction and read load on an uplink node")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=UPLINK_PORT)
+    parser.add_argument('--tls', action='store_true')
+    parser.add_argument('--pool', help="load a provisioned account pool from this JSON file")
+    parser.add_argument('--accounts', type=int, default=10, help="accounts to provision without --pool")
+    parser.add_argument('--save-pool', help="save the provisioned account pool to this JSON file")
+    parser.add_argument('--provision-only', action='store_true')
+    parser.add_argument('--rate', type=float, help="target operations per second, default closed loop")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--interval', type=float, default=1.0, help="seconds between reports")
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help="operation weights, e.g. transfer=8,call=1,read=1")
+    parser.add_argument('--json', help="write the final summary to this JSON file")
+    args = parser.parse_args(argv)
+
+    rpc = UplinkJsonRpc(args.host, args.port, args.tls, pool_maxsize=max(10, args.concurrency))
+    if args.pool:
+        pool = AccountPool.load(args.pool)
+    else:
+        print("provisioning {} accounts".format(args.accounts))
+        pool = AccountPool.provision(rpc, args.accounts)
+    if args.save_pool:
+        pool.save(args.save_pool)
+    if args.provision_only:
+        rpc.close()
+        return 0
+
+    generator = LoadGenerator(rpc, pool, args.rate, args.concurrency, args.mix, args.interval,
+                              report=lambda summary: print(format_summary(summary)))
+    summary = generator.run(args.duration)
+    print("total")
+    print(format_summary(summary))
+    if args.json:
+        with open(args.json, 'w') as fd:
+            json.dump(summary, fd, indent=2, sort_keys=True)
+    rpc.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
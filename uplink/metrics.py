@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import re
+import threading
+
+# Path segments replaced by a placeholder, so that e.g. every account lookup
+# is recorded under "accounts/{address}"
+_INDEX = re.compile(r'^-?[0-9]+$')
+_ADDRESS = re.compile(r'^[0-9A-Za-z]{32,}$')
+_METHOD = re.compile(r'"method"\s*:\s*"([^"]+)"')
+
+log = logging.getLogger(__name__)
+
+
+def normalize_endpoint(endpoint, data=None):
+    """
+    Metric label for a request
+
+    Block indexes and addresses in the path are replaced by ``{index}`` and
+    ``{address}``. Commands posted to the root endpoint are labelled with
+    their method name, e.g. ``Transaction``.
+    """
+    endpoint = endpoint.strip('/')
+    if not endpoint:
+        match = _METHOD.search(data[:128]) if isinstance(data, str) else None
+        return match.group(1) if match else '/'
+    segments = []
+    for segment in endpoint.split('/'):
+        if _INDEX.match(segment):
+            segment = '{index}'
+        elif _ADDRESS.match(segment):
+            segment = '{address}'
+        segments.append(segment)
+    return '/'.join(segments)
+
+
+def payload_size(data):
+    """Size in bytes of a request or response body, text is sent as UTF-8"""
+    if not data:
+        return 0
+    if not isinstance(data, bytes):
+        data = data.encode('utf-8')
+    return len(data)
+
+
+class Histogram(object):
+    """
+    Latency histogram with logarithmic buckets, in the style of HdrHistogram
+
+    Values are recorded in whole ``unit`` steps (microseconds by default) in
+    buckets whose width is at most ``2 ** -(significant_bits - 1)`` of their
+    value, so any percentile is reported within that relative error (1.6%
+    with the default 7 bits) using a few hundred buckets at most.
+
+    :param significant_bits: precision of the buckets
+    :param unit: seconds per recorded step
+    """
+
+    def __init__(self, significant_bits=7, unit=1e-6):
+        self.bits = significant_bits
+        self.unit = unit
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def _index(self, steps):
+        if steps < (1 << self.bits):
+            return steps
+        shift = steps.bit_length() - self.bits
+        return (shift << self.bits) + (steps >> shift)
+
+    def _value(self, index):
+        if index < (1 << self.bits):
+            return index
+        shift = index >> self.bits
+        mantissa = index & ((1 << self.bits) - 1)
+        # middle of the bucket
+        return (mantissa << shift) + ((1 << shift) - 1) / 2.0
+
+    def record(self, seconds):
+        index = self._index(max(0, int(seconds / self.unit)))
+        with self._lock:
+            self._counts[index] = self._counts.get(index, 0) + 1
+            self.count += 1
+            self.total += seconds
+            self.min = seconds if self.min is None else min(self.min, seconds)
+            self.max = seconds if self.max is None else max(self.max, seconds)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentiles(self, *ps):
+        """Values at the given percentiles (0-100), in seconds"""
+        with self._lock:
+            buckets = sorted(self._counts.items())
+            count = self.count
+        results = []
+        for p in ps:
+            if not count:
+                results.append(0.0)
+                continue
+            rank = max(1, int(round(count * p / 100.0)))
+            seen = 0
+            for index, n in buckets:
+                seen += n
+                if seen >= rank:
+                    break
+            results.append(min(self._value(index) * self.unit, self.max))
+        return results
+
+    def percentile(self, p):
+        return self.percentiles(p)[0]
+
+    def merge(self, other):
+        with other._lock:
+            counts = dict(other._counts)
+            count, total, lo, hi = other.count, other.total, other.min, other.max
+        with self._lock:
+            for index, n in counts.items():
+                self._counts[index] = self._counts.get(index, 0) + n
+            self.count += count
+            self.total += total
+            if lo is not None:
+                self.min = lo if self.min is None else min(self.min, lo)
+                self.max = hi if self.max is None else max(self.max, hi)
+
+
+class EndpointMetrics(object):
+    """Counters and latency histogram of one endpoint"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.latency = Histogram()
+
+    def snapshot(self):
+        p50, p90, p99 = self.latency.percentiles(50, 90, 99)
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'bytes_out': self.bytes_out,
+            'bytes_in': self.bytes_in,
+            'mean': self.latency.mean,
+            'p50': p50,
+            'p90': p90,
+            'p99': p99,
+            'max': self.latency.max or 0.0,
+        }
+
+
+class MetricsRegistry(object):
+    """
+    Per-endpoint request metrics of one or more clients
+
+    Every request attempt is recorded under its normalized endpoint label
+    (see :func:`normalize_endpoint`). Hooks are called with each
+    measurement as it is recorded, to forward it to another metrics system::
+
+        def hook(endpoint, latency, bytes_out, bytes_in, error):
+            statsd.timing('uplink.' + endpoint, latency * 1000)
+
+        rpc.metrics.add_hook(hook)
+        ...
+        print(rpc.metrics.snapshot()['accounts/{address}']['p99'])
+    """
+
+    def __init__(self):
+        self._endpoints = {}
+        self._hooks = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, fn):
+        """Call ``fn(endpoint, latency, bytes_out, bytes_in, error)`` for every request"""
+        self._hooks.append(fn)
+
+    def remove_hook(self, fn):
+        self._hooks.remove(fn)
+
+    def endpoint(self, label):
+        metrics = self._endpoints.get(label)
+        if metrics is None:
+            with self._lock:
+                metrics = self._endpoints.setdefault(label, EndpointMetrics())
+        return metrics
+
+    def record(self, endpoint, latency, bytes_out=0, bytes_in=0, error=None):
+        """Record one request, ``endpoint`` must already be normalized"""
+        metrics = self.endpoint(endpoint)
+        with self._lock:
+            metrics.requests += 1
+            metrics.bytes_out += bytes_out
+            metrics.bytes_in += bytes_in
+            if error is not None:
+                metrics.errors += 1
+        metrics.latency.record(latency)
+        for fn in self._hooks:
+            try:
+                fn(endpoint, latency, bytes_out, bytes_in, error)
+            except Exception:
+                log.exception('metrics hook %r failed', fn)
+
+    def record_error(self, endpoint, error):
+        """
+        Count an error found after the request was recorded, such as a body
+        that is not valid JSON. Hooks are not called again.
+        """
+        metrics = self.endpoint(endpoint)
+        with self._lock:
+            metrics.errors += 1
+
+    def snapshot(self):
+        """Dict of endpoint label to counters and p50/p90/p99 latency in seconds"""
+        with self._lock:
+            endpoints = list(self._endpoints.items())
+        return dict((label, metrics.snapshot()) for label, metrics in endpoints)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
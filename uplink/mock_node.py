@@ -0,0 +1,469 @@
+# -*- coding: utf-8 -*-
+"""
+In-process stand-in for an Uplink node, for tests and benchmarks.
+
+Serves the REST and JSON RPC endpoints used by the client from an
+in-memory ledger: accounts, assets, contracts, blocks, transaction status,
+mempool, the Transaction command and Simulate. Transactions are applied
+with simple ledger rules (origin must exist, holdings must cover
+transfers, only issuers circulate and revoke assets) and committed in
+blocks; contract scripts are stored but never evaluated, and signatures
+are not verified. ::
+
+    with MockNode(latency=0.002) as node:
+        rpc = node.client()
+        tx_hash, address = rpc.uplink_create_account(sk, pk)
+"""
+
+import time
+import codecs
+import sha3
+import random
+import threading
+from collections import OrderedDict
+
+from ecdsa import VerifyingKey, SECP256k1
+
+from .client import UplinkJsonRpc
+from .codec import default_codec, canonical_dumps
+from .cryptography import derive_account_address, derive_asset_address, derive_contract_address
+from .version import __version__
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:  # python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer  # type: ignore
+    from SocketServer import ThreadingMixIn  # type: ignore
+
+PENDING = 'Pending'
+ACCEPTED = 'Accepted'
+
+
+class Rejected(Exception):
+    """A transaction breaks the ledger rules"""
+
+
+class NotFound(Exception):
+    """No ledger entry at the requested address or index"""
+
+
+def _text(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def _now():
+    return int(time.time() * 1000000)
+
+
+def _sha3(text):
+    return sha3.sha3_256(text.encode('utf-8')).hexdigest()
+
+
+def _dec(value, places=0):
+    return {'tag': 'Dec', 'decimalPlaces': places, 'decimalIntegerValue': value}
+
+
+def _amount(dec):
+    return dec['decimalIntegerValue'] if isinstance(dec, dict) else dec
+
+
+class Ledger(object):
+    """
+    In-memory ledger state of the mock node
+
+    Submitted transactions wait in the mempool until :meth:`commit` applies
+    them in order and writes the accepted ones into a new block. Entries are
+    replaced rather than modified, so readers can serialize them without
+    holding the lock.
+    """
+
+    def __init__(self, node_address='mock-node'):
+        self.node_address = node_address
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.accounts = OrderedDict()
+            self.assets = OrderedDict()
+            self.contracts = OrderedDict()
+            self.pool = OrderedDict()
+            self.statuses = {}
+            self.invalid = OrderedDict()
+            self.simulations = {}
+            self.blocks = []
+            self._append_block([])
+
+    def _append_block(self, transactions):
+        prev = self.blocks[-1] if self.blocks else None
+        block = {
+            'index': len(self.blocks),
+            'header': {
+                'origin': self.node_address,
+                'merkleRoot': _sha3(''.join(tx['signature'] for tx in transactions)),
+                'timestamp': _now(),
+                'prevHash': _sha3(canonical_dumps(prev)) if prev else '',
+            },
+            'signatures': [],
+            'transactions': transactions,
+        }
+        self.blocks.append(block)
+        return block
+
+    def submit(self, tx):
+        """Add a transaction to the mempool, returns its hash"""
+        tx_hash = _sha3(canonical_dumps(tx))
+        with self.lock:
+            if tx_hash in self.statuses:
+                raise Rejected("duplicate transaction {}".format(tx_hash))
+            self.pool[tx_hash] = tx
+            self.statuses[tx_hash] = PENDING
+        return tx_hash
+
+    def commit(self):
+        """Apply every pooled transaction, returns the new block or None"""
+        with self.lock:
+            if not self.pool:
+                return None
+            accepted = []
+            for tx_hash, tx in self.pool.items():
+                try:
+                    self._apply(tx_hash, tx)
+                except Rejected as e:
+                    reason = str(e)
+                    self.statuses[tx_hash] = {'tag': 'Rejected', 'contents': reason}
+                    self.invalid[tx_hash] = {'reason': reason, 'transaction': tx,
+                                             'signature': tx['signature']}
+                else:
+                    self.statuses[tx_hash] = ACCEPTED
+                    accepted.append(tx)
+            self.pool.clear()
+            if accepted:
+                return self._append_block(accepted)
+            return None
+
+    def _apply(self, tx_hash, tx):
+        kind = tx['header']['contents']['tag']
+        hdr = tx['header']['contents']['contents']
+        origin = tx['origin']
+
+        if kind == 'CreateAccount':
+            public_key = VerifyingKey.from_string(codecs.decode(hdr['pubKey'], 'hex'), curve=SECP256k1)
+            address = _text(derive_account_address(public_key))
+            if address in self.accounts:
+                raise Rejected("account {} already exists".format(address))
+            self.accounts[address] = {'address': address, 'publicKey': hdr['pubKey'],
+                                      'timezone': hdr['timezone'], 'metadata': hdr['metadata']}
+            return
+
+        if origin not in self.accounts:
+            raise Rejected("origin account {} does not exist".format(origin))
+
+        if kind == 'CreateAsset':
+            address = _text(derive_asset_address(tx_hash))
+            self.assets[address] = {
+                'address': address, 'issuedOn': _now(), 'assetType': hdr['assetType'],
+                'name': hdr['assetName'], 'reference': hdr['reference'], 'supply': hdr['supply'],
+                'holdings': {}, 'issuer': hdr['issuer'], 'metadata': hdr['metadata'],
+            }
+        elif kind == 'Circulate':
+            asset = self._asset(hdr['assetAddr'])
+            if asset['issuer'] != origin:
+                raise Rejected("only the issuer may circulate asset {}".format(asset['address']))
+            amount = _amount(hdr['amount'])
+            supply = asset['supply']
+            if amount > supply['decimalIntegerValue']:
+                raise Rejected("insufficient supply")
+            asset['supply'] = _dec(supply['decimalIntegerValue'] - amount, supply['decimalPlaces'])
+            self._credit(asset, origin, amount)
+            self.assets[asset['address']] = asset
+        elif kind == 'Transfer':
+            asset = self._asset(hdr['assetAddr'])
+            if hdr['toAddr'] not in self.accounts:
+                raise Rejected("account {} does not exist".format(hdr['toAddr']))
+            balance = _amount(hdr['balance'])
+            held = asset['holdings'].get(origin)
+            if held is None or held['decimalIntegerValue'] < balance:
+                raise Rejected("insufficient holdings")
+            self._credit(asset, origin, -balance)
+            self._credit(asset, hdr['toAddr'], balance)
+            self.assets[asset['address']] = asset
+        elif kind == 'RevokeAsset':
+            asset = self._asset(hdr['address'])
+            if asset['issuer'] != origin:
+                raise Rejected("only the issuer may revoke asset {}".format(asset['address']))
+            del self.assets[asset['address']]
+        elif kind == 'RevokeAccount':
+            if hdr['address'] != origin:
+                raise Rejected("accounts may only revoke themselves")
+            del self.accounts[origin]
+        elif kind == 'CreateContract':
+            address = _text(derive_contract_address(tx_hash))
+            self.contracts[address] = {
+                'timestamp': _now(), 'address': address, 'storage': {}, 'methods': [],
+                'script': hdr['contract'], 'owner': origin, 'state': 'initial',
+            }
+        elif kind == 'Call':
+            if hdr['address'] not in self.contracts:
+                raise Rejected("contract {} does not exist".format(hdr['address']))
+        else:
+            raise Rejected("unsupported transaction {}".format(kind))
+
+    def _asset(self, address):
+        """Copy of an asset, to be stored back once modified"""
+        asset = self.assets.get(address)
+        if asset is None:
+            raise Rejected("asset {} does not exist".format(address))
+        return dict(asset, holdings=dict(asset['holdings']))
+
+    def _credit(self, asset, address, amount):
+        places = asset['supply']['decimalPlaces']
+        held = asset['holdings'].get(address)
+        asset['holdings'][address] = _dec((held['decimalIntegerValue'] if held else 0) + amount, places)
+
+    # Queries
+
+    def get(self, table, key):
+        with self.lock:
+            try:
+                return table[key]
+            except (KeyError, IndexError):
+                raise NotFound(key)
+
+    def values(self, table):
+        with self.lock:
+            return list(table.values())
+
+    def simulate(self, msg):
+        """Handle a Simulate command, returns the RPC response"""
+        tag, contents = msg['tag'], msg['contents']
+        with self.lock:
+            if tag == 'CreateSimulationMsg':
+                key = str(len(self.simulations) + 1)
+                self.simulations[key] = {
+                    'contract': {'timestamp': _now(), 'address': key, 'storage': {}, 'methods': [],
+                                 'script': contents['fcl'], 'owner': contents['issuer'],
+                                 'state': 'initial'},
+                    'assets': OrderedDict(self.assets),
+                }
+                return {'tag': 'RPCResp', 'contents': {'simKey': key}}
+
+            sim = self.simulations.get(contents['simKey'])
+            if sim is None:
+                return {'tag': 'RPCResp', 'contents': {
+                    'errorMsg': "simulation {} does not exist".format(contents['simKey'])}}
+            if tag == 'UpdateSimulationMsg':
+                update = contents['contents']
+                if update['tag'] == 'ModifyTimestamp' and update['contents']['tag'] == 'SetTimestamp':
+                    sim['contract']['timestamp'] = update['contents']['contents']
+                return {'tag': 'RPCRespOK', 'contents': None}
+
+            query, addr = contents['contents']['tag'], contents['contents']['contents']
+            if query == 'QueryContract':
+                result = sim['contract']
+            elif query == 'QueryMethods':
+                result = []
+            elif query == 'QueryAssets':
+                result = list(sim['assets'].values())
+            elif addr in sim['assets']:
+                result = sim['assets'][addr]
+            else:
+                result = {'errorMsg': "asset {} does not exist".format(addr)}
+            return {'tag': 'RPCResp', 'contents': result}
+
+
+def _ok(contents):
+    return {'tag': 'RPCResp', 'contents': contents}
+
+
+def _error(kind, message):
+    return {'tag': 'RPCRespError', 'contents': {'errorType': kind, 'errorMsg': message}}
+
+
+class MockNode(object):
+    """
+    Mock Uplink node serving HTTP on a background thread
+
+    :param host: interface to listen on
+    :param port: port to listen on, by default any free one
+    :param latency: seconds added to every response
+    :param jitter: up to this many more seconds added at random
+    :param block_interval: seconds between blocks; with 0 every transaction
+                           is committed in its own block as it is submitted
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, block_interval=0.05):
+        self.latency = latency
+        self.jitter = jitter
+        self.block_interval = block_interval
+        self.ledger = Ledger()
+        self._server = _ThreadingServer((host, port), _Handler)
+        self._server.node = self
+        self.host, self.port = self._server.server_address[:2]
+        self._stopped = threading.Event()
+        self._threads = []
+
+    @property
+    def url(self):
+        return 'http://{}:{}'.format(self.host, self.port)
+
+    def start(self):
+        serve = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.05},
+                                 name='uplink-mock-node')
+        self._threads.append(serve)
+        if self.block_interval:
+            self._threads.append(threading.Thread(target=self._commit_loop, name='uplink-mock-blocks'))
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._server.shutdown()
+        self._server.server_close()
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def client(self, **kwargs):
+        """:class:`~uplink.client.UplinkJsonRpc` connected to this node"""
+        return UplinkJsonRpc(self.host, self.port, **kwargs)
+
+    def _commit_loop(self):
+        while not self._stopped.wait(self.block_interval):
+            self.ledger.commit()
+
+    def _delay(self):
+        delay = self.latency
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def handle(self, path, body):
+        """Response to a request for path, as ``(status_code, json_value)``"""
+        parts = [part for part in path.split('?')[0].split('/') if part]
+        if not parts:
+            return 200, self._command(default_codec.loads(body) if body else {})
+        route, args = parts[0], parts[1:]
+        handler = getattr(self, '_get_' + route, None)
+        if handler is None:
+            return 404, _error('NotFound', "no endpoint /{}".format(path.strip('/')))
+        try:
+            return 200, handler(*args)
+        except NotFound as e:
+            return 200, _error('NotFound', "{} not found".format(e))
+        except (TypeError, ValueError, IndexError):
+            return 404, _error('NotFound', "no endpoint /{}".format(path.strip('/')))
+
+    def _command(self, cmd):
+        method, params = cmd.get('method'), cmd.get('params')
+        ledger = self.ledger
+        if method == 'Transaction':
+            try:
+                tx_hash = ledger.submit(params)
+            except Rejected as e:
+                return _error('InvalidTransaction', str(e))
+            if not self.block_interval:
+                ledger.commit()
+            return {'tag': 'RPCTransactionOK', 'txHash': tx_hash}
+        if method == 'Simulate':
+            return ledger.simulate(params)
+        if method == 'Test':
+            if params['method'] == 'ResetDB':
+                ledger.reset()
+            elif params['method'] == 'ResetMemPools':
+                with ledger.lock:
+                    ledger.pool.clear()
+            return {'tag': 'RPCRespOK', 'contents': None}
+        return _error('NotSupported', "command {} is not supported by the mock node".format(method))
+
+    def _get_version(self):
+        # unlike the other endpoints, not wrapped in an RPCResp
+        return {'version': __version__, 'commit': 'mock', 'branch': 'mock', 'dirty': False}
+
+    def _get_peers(self, validators=None):
+        pid = 'pid://{}:{}:0:0'.format(self.host, self.port)
+        return _ok([{'tag': 'Peer', 'contents': {'peerPid': pid, 'peerAccAddr': self.ledger.node_address}}])
+
+    def _get_blocks(self, index=None):
+        if index is None:
+            with self.ledger.lock:
+                return _ok(list(self.ledger.blocks))
+        return _ok(self.ledger.get(self.ledger.blocks, int(index)))
+
+    def _get_accounts(self, address=None):
+        if address is None:
+            return _ok(self.ledger.values(self.ledger.accounts))
+        return _ok(self.ledger.get(self.ledger.accounts, address))
+
+    def _get_assets(self, address=None):
+        if address is None:
+            return _ok(self.ledger.values(self.ledger.assets))
+        return _ok(self.ledger.get(self.ledger.assets, address))
+
+    def _get_contracts(self, address=None, callable=None):
+        if address is None:
+            return _ok(self.ledger.values(self.ledger.contracts))
+        contract = self.ledger.get(self.ledger.contracts, address)
+        if callable == 'callable':
+            return _ok({})
+        return _ok(contract)
+
+    def _get_transactions(self, *args):
+        ledger = self.ledger
+        if args[0] == 'status':
+            with ledger.lock:
+                return _ok(ledger.statuses.get(args[1], 'NonExistent'))
+        if args[0] == 'invalid':
+            if len(args) == 1:
+                return _ok(ledger.values(ledger.invalid))
+            return _ok(ledger.get(ledger.invalid, args[1]))
+        if args[0] == 'pool':
+            with ledger.lock:
+                pool = {'size': len(ledger.pool), 'transactions': list(ledger.pool.values())}
+            if args[1:] == ('size',):
+                return _ok({'size': pool['size']})
+            if args[1:] == ('all',):
+                return _ok({ledger.node_address: pool})
+            if args[1:] == ('all', 'sizes'):
+                return _ok({ledger.node_address: pool['size']})
+            return _ok(pool)
+        return _ok(ledger.get(ledger.blocks, int(args[0]))['transactions'])
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately; without TCP_NODELAY a
+    # kept-alive socket stalls on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        node = self.server.node
+        node._delay()
+        status, result = node.handle(self.path, body)
+        payload = default_codec.dumps(result).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+class _ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
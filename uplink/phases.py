@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+from contextlib import contextmanager
+
+from .metrics import Histogram
+
+# Phases of issuing a transaction, in order
+PHASES = ('build', 'sign', 'pack', 'to_dict', 'encode', 'http', 'confirm')
+
+_local = threading.local()
+
+
+class PhaseRecord(object):
+    """
+    Phase durations of one transaction
+
+    Time spent in a phase nested inside another is only counted once, in the
+    inner phase.
+    """
+
+    def __init__(self, timer):
+        self.timer = timer
+        self.tx_type = None
+        self.durations = {}
+        self.started = time.time()
+        self.deferred = False
+        self._stack = []
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def mark(self, name):
+        """Count the time since the start not spent in any phase as ``name``"""
+        elapsed = time.time() - self.started
+        self.add(name, max(0.0, elapsed - sum(self.durations.values())))
+
+    def defer_until(self, future):
+        """Time until future is done as the ``confirm`` phase, then finish"""
+        self.deferred = True
+        issued = time.time()
+
+        def confirmed(_):
+            self.add('confirm', time.time() - issued)
+            self.finish()
+
+        future.add_done_callback(confirmed)
+
+    def finish(self):
+        self.timer.add(self.tx_type or 'unknown', self.durations)
+
+
+def current_record():
+    """Phase record of the transaction being issued on this thread, or None"""
+    return getattr(_local, 'record', None)
+
+
+@contextmanager
+def phase(name):
+    """Time the block as phase ``name`` of the current transaction, if any"""
+    record = getattr(_local, 'record', None)
+    if record is None:
+        yield
+        return
+    frame = [time.time(), 0.0]
+    record._stack.append(frame)
+    try:
+        yield
+    finally:
+        record._stack.pop()
+        elapsed = time.time() - frame[0]
+        record.add(name, elapsed - frame[1])
+        if record._stack:
+            record._stack[-1][1] += elapsed
+
+
+class PhaseTimer(object):
+    """
+    Time spent in each phase of issuing transactions, per transaction type
+
+    Phases are header construction (``build``), signing (``sign``),
+    signature packing (``pack``), ``Transaction.to_dict`` (``to_dict``),
+    JSON encoding (``encode``), the RPC request (``http``) and, for
+    transactions issued with ``future=True``, the wait for acceptance
+    (``confirm``). ::
+
+        rpc = UplinkJsonRpc(phase_timer=PhaseTimer())
+        ...
+        print(rpc.phase_timer.format_report())
+    """
+
+    def __init__(self):
+        self._types = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self):
+        """Record the phases of the transaction issued in the block"""
+        previous = getattr(_local, 'record', None)
+        record = _local.record = PhaseRecord(self)
+        try:
+            yield record
+        finally:
+            _local.record = previous
+        if not record.deferred:
+            record.finish()
+
+    def add(self, tx_type, durations):
+        with self._lock:
+            phases = self._types.setdefault(tx_type, {})
+            for name, seconds in durations.items():
+                hist = phases.get(name)
+                if hist is None:
+                    hist = phases[name] = Histogram()
+                hist.record(seconds)
+
+    def report(self):
+        """
+        Dict of transaction type to phase to ``count``, ``mean``, ``p50``,
+        ``p99`` (in seconds) and ``share`` of the total time spent
+        """
+        with self._lock:
+            types = dict((tx_type, dict(phases)) for tx_type, phases in self._types.items())
+        report = {}
+        for tx_type, phases in types.items():
+            total = sum(hist.total for hist in phases.values()) or 1.0
+            report[tx_type] = {}
+            for name, hist in phases.items():
+                p50, p99 = hist.percentiles(50, 99)
+                report[tx_type][name] = {
+                    'count': hist.count,
+                    'mean': hist.mean,
+                    'p50': p50,
+                    'p99': p99,
+                    'share': hist.total / total,
+                }
+        return report
+
+    def format_report(self):
+        """The report as a text table, times in milliseconds"""
+        lines = ["{:<16} {:<8} {:>8} {:>10} {:>10} {:>10} {:>7}".format(
+            'type', 'phase', 'count', 'mean ms', 'p50 ms', 'p99 ms', 'share')]
+        report = self.report()
+        order = dict((name, i) for i, name in enumerate(PHASES))
+        for tx_type in sorted(report):
+            phases = report[tx_type]
+            for name in sorted(phases, key=lambda n: order.get(n, len(order))):
+                row = phases[name]
+                lines.append("{:<16} {:<8} {:>8} {:>10.3f} {:>10.3f} {:>10.3f} {:>6.1f}%".format(
+                    tx_type, name, row['count'], 1000 * row['mean'], 1000 * row['p50'],
+                    1000 * row['p99'], 100 * row['share']))
+        return '\n'.join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._types = {}
@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+
+import re
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .client import UplinkJsonRpc, UPLINK_PORT
+from .retry import RetryPolicy
+from .transport import DEFAULT_POOL_MAXSIZE
+from .deadline import current_deadline, use_deadline
+from .exceptions import RpcConnectionFail, BadStatusCodeError
+
+# Cloud Haskell process ids as reported by /peers, e.g. "pid://10.0.0.2:8001:0:10"
+_PID_HOST = re.compile(r'^(?:pid|nid)://([^:/]+):(\d+)')
+
+BALANCERS = ('p2c', 'least_outstanding')
+
+
+def peer_host(pid):
+    """Host of an uplink peer process id, or None if it cannot be parsed"""
+    match = _PID_HOST.match(pid or '')
+    return match.group(1) if match else None
+
+
+class Node(object):
+    """
+    One uplink node of a :class:`MultiNodeUplinkJsonRpc`, with the state used
+    for balancing and health checking
+    """
+
+    def __init__(self, host, port=UPLINK_PORT, tls=False):
+        self.host = host
+        self.port = int(port)
+        self.tls = tls
+        self.healthy = True
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.errors = 0
+        self.latency = None
+
+    @property
+    def key(self):
+        return (self.host, self.port)
+
+    def url(self, endpoint):
+        scheme = 'https' if self.tls else 'http'
+        return '{}://{}:{}/{}'.format(scheme, self.host, self.port, endpoint)
+
+    def __repr__(self):
+        return "<Node(%s:%i, healthy=%s, outstanding=%i)>" % (
+            self.host, self.port, self.healthy, self.outstanding)
+
+
+def _parse_node(node, tls):
+    if isinstance(node, Node):
+        return node
+    if isinstance(node, (tuple, list)):
+        return Node(node[0], node[1], tls)
+    host, _, port = node.rpartition(':')
+    if not host:
+        return Node(node, UPLINK_PORT, tls)
+    return Node(host, port, tls)
+
+
+class LatencyWindow(object):
+    """Percentiles over the most recent ``size`` latency samples"""
+
+    def __init__(self, size=1000, refresh=50):
+        self._samples = deque(maxlen=size)
+        self._sorted = []
+        self._stale = 0
+        self._refresh = refresh
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._samples)
+
+    def add(self, latency):
+        with self._lock:
+            self._samples.append(latency)
+            self._stale += 1
+
+    def percentile(self, p):
+        """p-th percentile (0-100) of the window, None while it is empty"""
+        with self._lock:
+            # re-sort only every ``refresh`` samples, percentiles move slowly
+            if self._stale and (self._stale >= self._refresh or len(self._samples) <= self._refresh):
+                self._sorted = sorted(self._samples)
+                self._stale = 0
+            samples = self._sorted
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * p / 100.0))]
+
+
+class HedgeStats(object):
+    """Counters of hedged reads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.fired = 0
+        self.won = 0
+        self.over_budget = 0
+
+    def incr(self, name, n=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'fired': self.fired,
+                'won': self.won,
+                'over_budget': self.over_budget,
+            }
+
+
+class MultiNodeUplinkJsonRpc(UplinkJsonRpc):
+    """
+    JSON RPC client spreading requests over several uplink nodes
+
+    Reads are balanced over the healthy nodes, either by picking the less
+    busy of two random nodes (``p2c``) or the node with the fewest requests
+    in flight (``least_outstanding``). Transactions and other writes go to
+    the first healthy node in ``preferred`` order, which defaults to the
+    order of ``nodes``.
+
+    A node is ejected after ``eject_after`` consecutive failed requests or
+    health checks. A background thread calls ``version`` on every node each
+    ``health_interval`` seconds and re-admits ejected nodes once they
+    answer. If every node is ejected, requests are spread over all of them.
+
+    Transaction status queries go to the write node as well: another node
+    may not have received a transaction the write node just accepted, and
+    would answer NonExistent, which the confirmation tracker takes as final.
+
+    Failed attempts are retried on another node according to
+    ``retry_policy``; by default each node is tried once.
+
+    With ``hedge`` enabled, a read that has not been answered within the
+    ``hedge_percentile`` of recent read latencies is sent to a second node
+    as well, and the first successful response is used. At most a
+    ``hedge_budget`` fraction of reads is hedged; :attr:`hedge_stats`
+    counts how many hedges were sent and how many answered first. ::
+
+        rpc = MultiNodeUplinkJsonRpc(['10.0.0.1:8545', '10.0.0.2:8545'])
+
+    The remaining keyword arguments are passed on to
+    :class:`~uplink.client.UplinkJsonRpc`.
+
+    :param nodes: node endpoints as ``"host:port"`` strings or ``(host, port)`` pairs
+    :param balancer: ``p2c`` or ``least_outstanding``
+    :param preferred: endpoints to send writes to, in order of preference
+    :param health_interval: seconds between health checks, ``None`` to disable them
+    :param health_timeout: seconds a health check may take
+    :param eject_after: consecutive failures after which a node is ejected
+    :param discover: add the nodes found by ``uplink_peers`` on start up
+    :param rpc_port: RPC port assumed for discovered nodes
+    :param hedge: send slow reads to a second node
+    :param hedge_percentile: percentile of read latency after which a read is hedged
+    :param hedge_budget: maximum fraction of reads that may be hedged
+    :param hedge_delay: delay before hedging until enough latencies have been seen
+    """
+
+    # Reads observed before the latency percentile is trusted
+    HEDGE_MIN_SAMPLES = 20
+
+    def __init__(self, nodes, tls=False, balancer='p2c', preferred=None, health_interval=5.0,
+                 health_timeout=1.0, eject_after=3, discover=False, rpc_port=UPLINK_PORT,
+                 hedge=False, hedge_percentile=95.0, hedge_budget=0.05, hedge_delay=0.05,
+                 **kwargs):
+        if balancer not in BALANCERS:
+            raise ValueError("balancer must be one of {}".format(', '.join(BALANCERS)))
+        self.nodes = [_parse_node(node, tls) for node in nodes]
+        if not self.nodes:
+            raise ValueError("at least one node is required")
+        kwargs.setdefault('pool_connections', max(10, len(self.nodes)))
+        if kwargs.get('retry_policy') is None:
+            kwargs['retry_policy'] = RetryPolicy(max_attempts=len(self.nodes), backoff=0.0, jitter=False)
+        first = self.nodes[0]
+        super(MultiNodeUplinkJsonRpc, self).__init__(first.host, first.port, tls, **kwargs)
+
+        self.balancer = balancer
+        self.preferred = [_parse_node(node, tls).key for node in (preferred or [])]
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.eject_after = eject_after
+        self.rpc_port = rpc_port
+        self._nodes_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._health_thread = None
+
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_budget = hedge_budget
+        self.hedge_delay = hedge_delay
+        self.hedge_stats = HedgeStats()
+        self.read_latency = LatencyWindow()
+        self._hedge_executor = None
+        self._hedge_lock = threading.Lock()
+
+        if discover:
+            self.discover()
+        if health_interval is not None:
+            self._health_thread = threading.Thread(target=self._health_loop, name='uplink-health-check')
+            self._health_thread.daemon = True
+            self._health_thread.start()
+
+    def close(self):
+        self._stopped.set()
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+        super(MultiNodeUplinkJsonRpc, self).close()
+
+    def healthy_nodes(self):
+        return [node for node in self.nodes if node.healthy]
+
+    def add_node(self, host, port=UPLINK_PORT):
+        """Add a node unless it is already known, returns the Node"""
+        with self._nodes_lock:
+            for node in self.nodes:
+                if node.key == (host, int(port)):
+                    return node
+            node = Node(host, port, self.tls)
+            self.nodes = self.nodes + [node]
+            return node
+
+    def discover(self):
+        """Add every peer reported by ``uplink_peers``, returns the new nodes"""
+        known = set(node.key for node in self.nodes)
+        added = []
+        for peer in self.uplink_peers():
+            host = peer_host(peer.contents.peer_pid)
+            if host is not None and (host, self.rpc_port) not in known:
+                added.append(self.add_node(host, self.rpc_port))
+                known.add((host, self.rpc_port))
+        return added
+
+    # ------------------------------------------------------------------
+    # Node selection
+    # ------------------------------------------------------------------
+
+    def _candidates(self):
+        return self.healthy_nodes() or list(self.nodes)
+
+    def _choose_read(self, exclude=()):
+        nodes = [node for node in self._candidates() if node not in exclude] or self._candidates()
+        if len(nodes) == 1:
+            return nodes[0]
+        if self.balancer == 'p2c':
+            nodes = random.sample(nodes, 2)
+        else:
+            # break ties at random
+            random.shuffle(nodes)
+        return min(nodes, key=lambda n: n.outstanding)
+
+    def _choose_write(self, exclude=()):
+        nodes = [node for node in self._candidates() if node not in exclude] or self._candidates()
+        by_key = dict((node.key, node) for node in nodes)
+        for key in self.preferred:
+            if key in by_key:
+                return by_key[key]
+        return nodes[0]
+
+    def _record(self, node, ok, latency=None):
+        with self._nodes_lock:
+            node.outstanding -= 1
+            if ok:
+                node.consecutive_failures = 0
+                if latency is not None:
+                    node.latency = latency if node.latency is None else 0.8 * node.latency + 0.2 * latency
+            else:
+                node.errors += 1
+                node.consecutive_failures += 1
+                if node.consecutive_failures >= self.eject_after:
+                    node.healthy = False
+
+    def _send_to(self, node, method, endpoint, data, stream):
+        with self._nodes_lock:
+            node.outstanding += 1
+            node.requests += 1
+        started = time.time()
+        try:
+            response = self._send(method, node.url(endpoint), data, stream)
+        except RpcConnectionFail:
+            self._record(node, False)
+            raise
+        except BadStatusCodeError as e:
+            self._record(node, e.response.status_code < 500)
+            raise
+        except Exception:
+            self._record(node, True, time.time() - started)
+            raise
+        self._record(node, True, time.time() - started)
+        return response
+
+    def uplink_get_transaction_status(self, tx_hash):
+        self._local.write_node_reads = True
+        try:
+            return super(MultiNodeUplinkJsonRpc, self).uplink_get_transaction_status(tx_hash)
+        finally:
+            self._local.write_node_reads = False
+
+    def _call_raw(self, data='', method='post', endpoint='', idempotent=True, stream=False):
+        to_write_node = not idempotent or getattr(self._local, 'write_node_reads', False)
+        if self.hedge and not to_write_node and not stream and len(self.nodes) > 1:
+            return self.retry_policy.call(lambda: self._hedged_read(method, endpoint, data), True)
+
+        choose = self._choose_write if to_write_node else self._choose_read
+        tried = []
+
+        def attempt():
+            node = choose(tried)
+            tried.append(node)
+            return self._send_to(node, method, endpoint, data, stream)
+
+        return self.retry_policy.call(attempt, idempotent)
+
+    # ------------------------------------------------------------------
+    # Hedged reads
+    # ------------------------------------------------------------------
+
+    def _current_hedge_delay(self):
+        if len(self.read_latency) < self.HEDGE_MIN_SAMPLES:
+            return self.hedge_delay
+        return self.read_latency.percentile(self.hedge_percentile)
+
+    def _hedge_allowed(self):
+        stats = self.hedge_stats
+        # allow a few hedges before the budget has anything to go by
+        if stats.fired < max(1.0, self.hedge_budget * stats.requests):
+            return True
+        stats.incr('over_budget')
+        return False
+
+    def _executor(self):
+        if self._hedge_executor is None:
+            with self._hedge_lock:
+                if self._hedge_executor is None:
+                    pool_maxsize = getattr(self.transport, 'pool_maxsize', DEFAULT_POOL_MAXSIZE)
+                    workers = 2 * pool_maxsize * len(self.nodes)
+                    self._hedge_executor = ThreadPoolExecutor(max_workers=workers)
+        return self._hedge_executor
+
+    def _hedged_read(self, method, endpoint, data):
+        stats = self.hedge_stats
+        stats.incr('requests')
+        # carry this thread's deadline and timeout overrides to the workers
+        d = current_deadline()
+        timeouts = getattr(self._local, 'timeouts', None)
+
+        def read(node):
+            self._local.timeouts = timeouts
+            try:
+                with use_deadline(d):
+                    started = time.time()
+                    response = self._send_to(node, method, endpoint, data, False)
+                    self.read_latency.add(time.time() - started)
+                    return response
+            finally:
+                self._local.timeouts = None
+
+        executor = self._executor()
+        first = self._choose_read()
+        primary = executor.submit(read, first)
+        done, _ = wait([primary], timeout=self._current_hedge_delay())
+        if done or not self._hedge_allowed():
+            return primary.result()
+        second = self._choose_read([first])
+        if second is first:
+            return primary.result()
+
+        stats.incr('fired')
+        hedge = executor.submit(read, second)
+        pending = set([primary, hedge])
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: f is hedge):
+                if future.exception() is None:
+                    if future is hedge:
+                        stats.incr('won')
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    # ------------------------------------------------------------------
+    # Health checking
+    # ------------------------------------------------------------------
+
+    def check_node(self, node):
+        """Health check a node, re-admitting or ejecting it, returns True if it answered"""
+        try:
+            response = self.transport.request('post', node.url('version'), data='',
+                                              timeout=self.health_timeout)
+            ok = response.status_code // 100 == 2
+        except Exception:
+            ok = False
+        with self._nodes_lock:
+            if ok:
+                node.consecutive_failures = 0
+                node.healthy = True
+            else:
+                node.consecutive_failures += 1
+                if node.consecutive_failures >= self.eject_after:
+                    node.healthy = False
+        return ok
+
+    def _health_loop(self):
+        while not self._stopped.wait(self.health_interval):
+            for node in self.nodes:
+                self.check_node(node)
@@ -1,4 +1,3 @@
-import json
 import struct
 import six
 from uplink.utils import to_bytes
@@ -9,6 +8,8 @@ import datetime
 from datetime import timedelta
 import uplink.enum as enum
 from uplink.cryptography import (ecdsa_sign, derive_asset_address)
+from uplink.codec import canonical_dumps, default_codec
+from uplink.stream import object_members
 from typing import Tuple, Union
 
 
@@ -39,7 +40,7 @@ def convert_amount_incoming(value, desired_precision=2):
 class Serializer(object):
     @staticmethod
     def serialize(object, **kwargs):
-        return json.dumps(object, sort_keys=True, **kwargs)
+        return canonical_dumps(object, **kwargs)
 
 
 def _to_dict(obj, classkey=None, *args, **kwargs):
@@ -84,9 +85,9 @@ class Serializable(object):
     def to_json(self, **kwargs):
         return Serializer.serialize(self.to_dict(), **kwargs)
 
-    def sign(self, privkey, k=None):
+    def sign(self, privkey, k=None, deterministic=False):
         stream = self.to_binary()
-        return ecdsa_sign(privkey, stream, k=k)
+        return ecdsa_sign(privkey, stream, k=k, deterministic=deterministic)
 
 
 class Tagged(object):
@@ -120,6 +121,79 @@ class Block(Serializable):
         return "<Block(index=%i)>" % self.index
 
 
+class LazyBlock(object):
+    """
+    Block Object that decodes its transactions and signatures on first access
+
+    Only the index and header are decoded, the rest of the block is kept as
+    its JSON source. Use it when scanning many blocks for their headers.
+    """
+
+    __slots__ = ('header', 'index', 'addr', '_raw', '_spans', '_transactions', '_signatures')
+
+    def __init__(self, raw, index, header, spans):
+        self._raw = raw
+        self._spans = spans
+        self.index = index
+        self.header = BlockHeader(header)
+        self.addr = None
+        self._transactions = None
+        self._signatures = None
+
+    @classmethod
+    def from_json(cls, raw, members=None):
+        """
+        Build from the JSON source of a block
+
+        :param raw: JSON text of the block
+        :param members: offsets of the block's members in raw, as returned by
+                        :func:`~uplink.stream.object_members`
+        """
+        if members is None:
+            members = object_members(raw)
+        index, header = (default_codec.loads(raw[start:end])
+                         for start, end in (members['index'], members['header']))
+        return cls(raw, index, header, (members['transactions'], members['signatures']))
+
+    def _decode(self, i):
+        start, end = self._spans[i]
+        return default_codec.loads(self._raw[start:end])
+
+    @property
+    def raw(self):
+        return self._raw
+
+    @property
+    def transactions(self):
+        if self._transactions is None:
+            self._transactions = self._decode(0)
+        return self._transactions
+
+    @property
+    def signatures(self):
+        if self._signatures is None:
+            self._signatures = self._decode(1)
+        return self._signatures
+
+    def _asdict(self):
+        return {
+            'header': self.header,
+            'transactions': self.transactions,
+            'index': self.index,
+            'signatures': self.signatures,
+            'addr': self.addr,
+        }
+
+    def to_dict(self, *args, **kwargs):
+        return _to_dict(self, *args, **kwargs)
+
+    def to_json(self, **kwargs):
+        return Serializer.serialize(self.to_dict(), **kwargs)
+
+    def __repr__(self):
+        return "<LazyBlock(index=%i)>" % self.index
+
+
 class BlockHeader(Serializable):
     """Header child Object"""
 
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+import io
+import gzip
+import json
+import time
+import threading
+from collections import deque
+
+import requests
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout as RequestsTimeout
+
+from .metrics import normalize_endpoint
+
+# ------------------------------------------------------------------------
+# Record and replay of RPC traffic
+#
+# A recording holds one JSON object per line, per request:
+#
+#   {"t": 0.125, "latency": 0.004, "method": "post", "path": "blocks/1",
+#    "request": "", "status": 200, "response": "{\"tag\": ...}"}
+#
+# ``t`` is the start of the request in seconds since the recording began.
+# Requests that failed without a response have ``error`` (``connection``
+# or ``timeout``) instead of ``status`` and ``response``. Files whose name
+# ends in ``.gz`` are gzip compressed.
+# ------------------------------------------------------------------------
+
+_ERRORS = {'connection': RequestsConnectionError, 'timeout': RequestsTimeout}
+
+
+def _open(path, mode):
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, mode + 'b'), encoding='utf-8')
+    return io.open(path, mode, encoding='utf-8')
+
+
+def _path(url):
+    # scheme://host:port/path
+    parts = url.split('/', 3)
+    return parts[3] if len(parts) > 3 else ''
+
+
+def _text(data):
+    if data is None:
+        return ''
+    return data.decode('utf-8') if isinstance(data, bytes) else data
+
+
+def read_recording(path):
+    """Iterate over the requests of a recording, as dicts"""
+    with _open(path, 'r') as fd:
+        for line in fd:
+            if line.strip():
+                yield json.loads(line)
+
+
+class RecordingTransport(object):
+    """
+    Transport that sends requests through ``transport`` and appends each
+    request and response to the recording at ``path``
+
+    Streamed response bodies are read in full before they are returned.
+    """
+
+    def __init__(self, transport, path):
+        self.transport = transport
+        self.path = path
+        self.started = time.time()
+        self._fd = _open(path, 'a')
+        self._lock = threading.Lock()
+
+    @property
+    def pool_maxsize(self):
+        return self.transport.pool_maxsize
+
+    def _write(self, entry):
+        line = json.dumps(entry, separators=(',', ':'))
+        with self._lock:
+            if not self._fd.closed:
+                self._fd.write(line + '\n')
+                self._fd.flush()
+
+    def request(self, method, url, data=None, **kwargs):
+        started = time.time()
+        entry = {'t': round(started - self.started, 6), 'method': method, 'path': _path(url),
+                 'request': _text(data)}
+        try:
+            response = self.transport.request(method, url, data=data, **kwargs)
+        except RequestsTimeout:
+            entry.update(latency=round(time.time() - started, 6), error='timeout')
+            self._write(entry)
+            raise
+        except RequestsConnectionError:
+            entry.update(latency=round(time.time() - started, 6), error='connection')
+            self._write(entry)
+            raise
+        body = response.content
+        entry.update(latency=round(time.time() - started, 6), status=response.status_code,
+                     response=_text(body))
+        self._write(entry)
+        return response
+
+    def close(self):
+        """Close the recording, and not the wrapped transport"""
+        with self._lock:
+            self._fd.close()
+
+
+class ReplayTransport(object):
+    """
+    Transport that answers requests from a recording instead of a node
+
+    Each request is answered with the next recorded response to the same
+    method, path and body, so a client repeating the recorded calls gets
+    the recorded answers even when they are made concurrently. Requests
+    that were not recorded as such, e.g. transactions signed again, get the
+    next response recorded for their endpoint (see
+    :func:`~uplink.metrics.normalize_endpoint`). Once every recorded
+    response to a request has been served they are served again from the
+    first.
+
+    :param path: recording made by :class:`RecordingTransport`
+    :param realtime: delay every response by its recorded latency,
+                     otherwise respond as fast as possible
+    :param speed: divide recorded latencies by this factor in realtime mode
+    """
+
+    def __init__(self, path, realtime=False, speed=1.0):
+        self.path = path
+        self.realtime = realtime
+        self.speed = speed
+        self.requests = 0
+        self._entries = {}
+        self._by_endpoint = {}
+        self._lock = threading.Lock()
+        for entry in read_recording(path):
+            key = (entry['method'], entry['path'], entry['request'])
+            self._entries.setdefault(key, deque()).append(entry)
+            label = (entry['method'], normalize_endpoint(entry['path'], entry['request']))
+            self._by_endpoint.setdefault(label, deque()).append(entry)
+
+    def __len__(self):
+        """Number of recorded requests"""
+        return sum(len(entries) for entries in self._entries.values())
+
+    def request(self, method, url, data=None, **kwargs):
+        path, body = _path(url), _text(data)
+        with self._lock:
+            entries = self._entries.get((method, path, body))
+            if not entries:
+                entries = self._by_endpoint.get((method, normalize_endpoint(path, body)))
+            if not entries:
+                raise LookupError("no recorded response to {} /{}".format(method.upper(), path))
+            entry = entries.popleft()
+            entries.append(entry)
+            self.requests += 1
+
+        if self.realtime and entry['latency'] > 0:
+            time.sleep(entry['latency'] / self.speed)
+        if 'error' in entry:
+            raise _ERRORS[entry['error']]("recorded {} error".format(entry['error']))
+
+        response = requests.models.Response()
+        response.status_code = entry['status']
+        response._content = entry['response'].encode('utf-8')
+        response._content_consumed = True
+        response.encoding = 'utf-8'
+        response.url = url
+        response.headers['Content-Type'] = 'application/json'
+        response.headers['Content-Length'] = str(len(response._content))
+        return response
+
+    def close(self):
+        pass
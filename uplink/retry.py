@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+import time
+import random
+import threading
+
+from requests.exceptions import ConnectTimeout, ReadTimeout
+
+from .exceptions import RpcConnectionFail, BadStatusCodeError
+from .deadline import current_deadline
+
+# Gateway errors and throttling: the node (or a proxy) did not process the
+# request, or asked us to come back later.
+RETRY_STATUSES = frozenset([429, 502, 503, 504])
+
+
+def connection_not_established(error):
+    """True if the request failed before any byte reached the node"""
+    cause = getattr(error, 'cause', None)
+    if isinstance(cause, ConnectTimeout):
+        return True
+    if isinstance(cause, ReadTimeout) or cause is None:
+        return False
+    reason = getattr(cause.args[0], 'reason', None) if cause.args else None
+    return type(reason).__name__ in ('NewConnectionError', 'ConnectTimeoutError')
+
+
+class RetryCounters(object):
+    """Thread safe counters for monitoring a RetryPolicy"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.successes = 0
+        self.failures = 0
+        self.giveups = 0
+
+    def incr(self, name, n=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'retries': self.retries,
+                'successes': self.successes,
+                'failures': self.failures,
+                'giveups': self.giveups,
+            }
+
+
+class RetryPolicy(object):
+    """
+    Exponential backoff with jitter for failed RPC calls
+
+    Idempotent reads are retried on connection errors, timeouts and the
+    statuses in ``retry_statuses``. Writes (transactions, test and
+    simulation commands) are only retried when the connection could not be
+    established, since otherwise the node may already have accepted them.
+
+    A call is abandoned once ``max_attempts`` attempts have been made or the
+    next attempt would start after ``deadline`` seconds from the first one,
+    or after the enclosing :func:`uplink.deadline.deadline`.
+
+    :param max_attempts: maximum number of attempts per call, including the first
+    :param backoff: delay before the first retry, doubled for every further retry
+    :param max_backoff: upper bound on a single delay
+    :param jitter: randomise each delay between zero and its upper bound
+    :param deadline: total seconds a call may spend retrying, ``None`` for no limit
+    :param retry_statuses: HTTP statuses that are retried for reads
+    """
+
+    def __init__(self, max_attempts=3, backoff=0.1, max_backoff=5.0, jitter=True,
+                 deadline=None, retry_statuses=RETRY_STATUSES):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_statuses = frozenset(retry_statuses)
+        self.counters = RetryCounters()
+
+    def delay(self, attempt):
+        """Seconds to wait after the given (1-based) failed attempt"""
+        delay = min(self.max_backoff, self.backoff * (2 ** (attempt - 1)))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def is_retryable(self, error, idempotent):
+        if isinstance(error, RpcConnectionFail):
+            return idempotent or connection_not_established(error)
+        if isinstance(error, BadStatusCodeError):
+            return idempotent and error.response.status_code in self.retry_statuses
+        return False
+
+    def call(self, fn, idempotent=True):
+        """Call ``fn`` until it succeeds or the policy gives up"""
+        counters = self.counters
+        counters.incr('calls')
+        started = time.time()
+        attempt = 1
+        while True:
+            try:
+                result = fn()
+            except (RpcConnectionFail, BadStatusCodeError) as e:
+                if not self.is_retryable(e, idempotent):
+                    counters.incr('failures')
+                    raise
+                delay = self.delay(attempt)
+                out_of_time = (self.deadline is not None and
+                               time.time() - started + delay > self.deadline)
+                d = current_deadline()
+                if d is not None and d.remaining() <= delay:
+                    out_of_time = True
+                if attempt >= self.max_attempts or out_of_time:
+                    counters.incr('giveups')
+                    raise
+                counters.incr('retries')
+                time.sleep(delay)
+                attempt += 1
+            else:
+                counters.incr('successes')
+                return result
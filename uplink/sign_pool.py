@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+import os
+import atexit
+import threading
+import multiprocessing
+from collections import OrderedDict
+
+import sha3
+from ecdsa import SigningKey, SECP256k1
+
+from . import signing
+from .cryptography import pack_signature
+
+# ------------------------------------------------------------------------
+# Batch signing on a pool of processes
+#
+# Signing is CPU bound and, with the pure Python backend, holds the GIL, so
+# batches are signed in worker processes instead of threads. Workers live
+# as long as the pool and keep the keys they were sent: every task carries
+# the 32 byte secret of its key and the to_binary() bytes of its messages,
+# and a worker only deserializes a key the first time it sees it.
+# ------------------------------------------------------------------------
+
+_worker_backend = None
+_worker_keys = OrderedDict()
+_MAX_KEYS = 256
+
+
+def _init_worker(backend):
+    global _worker_backend
+    _worker_backend = signing.get_backend(backend)
+
+
+def _worker_key(secret):
+    sk = _worker_keys.pop(secret, None)
+    if sk is None:
+        sk = SigningKey.from_string(secret, curve=SECP256k1, hashfunc=sha3.sha3_256)
+    _worker_keys[secret] = sk
+    if len(_worker_keys) > _MAX_KEYS:
+        _worker_keys.popitem(last=False)
+    return sk
+
+
+def _sign_chunk(task):
+    secret, deterministic, messages = task
+    sk = _worker_key(secret)
+    return [pack_signature(*_worker_backend.sign(sk, msg, deterministic=deterministic))
+            for msg in messages]
+
+
+def _to_binary(item):
+    return item if isinstance(item, bytes) else item.to_binary()
+
+
+class SigningPool(object):
+    """
+    Long-lived worker processes for signing batches of messages ::
+
+        with SigningPool() as pool:
+            signatures = pool.sign_many(headers, sk)
+
+    :param processes: number of workers, defaults to the number of cores
+    :param backend: signing backend name used by the workers, defaults to
+                    the fastest one installed (see :mod:`uplink.signing`)
+    :param chunks_per_worker: a batch is split into this many tasks per
+                              worker, to even out their load
+    """
+
+    def __init__(self, processes=None, backend=None, chunks_per_worker=4):
+        self.processes = processes or multiprocessing.cpu_count()
+        self.backend = backend
+        self.chunks_per_worker = chunks_per_worker
+        self._pid = os.getpid()
+        self._pool = multiprocessing.Pool(self.processes, initializer=_init_worker,
+                                          initargs=(backend,))
+
+    def sign_many(self, headers_or_bytes, key, deterministic=False):
+        """
+        Sign every header, or ``to_binary()`` output, with key
+
+        :param headers_or_bytes: iterable of objects with ``to_binary()``,
+                                 e.g. transaction headers, or of bytes
+        :param key: ``ecdsa.SigningKey``
+        :param deterministic: derive nonces as in RFC 6979
+        :return: list of signatures packed with
+                 :func:`~uplink.cryptography.pack_signature`, in input order
+        """
+        if self._pool is None:
+            raise RuntimeError("SigningPool is closed")
+        messages = [_to_binary(item) for item in headers_or_bytes]
+        if not messages:
+            return []
+        secret = key.to_string()
+        size = -(-len(messages) // (self.processes * self.chunks_per_worker))
+        tasks = [(secret, deterministic, messages[i:i + size])
+                 for i in range(0, len(messages), size)]
+        signatures = []
+        for chunk in self._pool.map(_sign_chunk, tasks, chunksize=1):
+            signatures.extend(chunk)
+        return signatures
+
+    def close(self):
+        """Stop the workers"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def _shutdown():
+    with _default_lock:
+        if _default_pool is not None and _default_pool._pid == os.getpid():
+            _default_pool.close()
+
+
+atexit.register(_shutdown)
+
+
+def default_pool():
+    """The shared :class:`SigningPool`, started on first use"""
+    global _default_pool
+    with _default_lock:
+        # a forked child does not inherit the workers
+        if _default_pool is None or _default_pool._pid != os.getpid():
+            _default_pool = SigningPool()
+        return _default_pool
+
+
+def sign_many(headers_or_bytes, key, deterministic=False, pool=None):
+    """
+    Sign a batch of headers, or ``to_binary()`` outputs, across all cores
+
+    :param pool: :class:`SigningPool` to use, defaults to a shared one that
+                 lives until the interpreter exits
+    :return: list of packed signatures, in input order
+    """
+    if pool is None:
+        pool = default_pool()
+    return pool.sign_many(headers_or_bytes, key, deterministic=deterministic)
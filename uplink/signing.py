@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+import sha3
+from ecdsa import SECP256k1, util, rfc6979
+
+try:
+    import coincurve
+    from coincurve._libsecp256k1 import ffi as _ffi
+except ImportError:
+    coincurve = None
+
+try:
+    from cryptography.hazmat.backends import default_backend as _openssl
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.hazmat.primitives.asymmetric.utils import Prehashed, decode_dss_signature
+except ImportError:
+    ec = None
+
+# ------------------------------------------------------------------------
+# Signing backends
+#
+# Transactions are signed with ECDSA over secp256k1, on the SHA3-256 digest
+# of their binary serialization. Signing may use an optimized secp256k1
+# implementation when one is installed; every backend takes the SDK's
+# ``ecdsa.SigningKey`` and returns the integers (r, s) for pack_signature,
+# with s normalized to the lower of its two values.
+#
+# Nonces are random unless a deterministic signature is asked for. A
+# transaction has no nonce or timestamp of its own, so two identical
+# transactions signed deterministically have the same signature and hash,
+# and the node rejects the second one as a duplicate.
+#
+# Deterministic nonces are those of libsecp256k1: RFC 6979 with HMAC-SHA256
+# over the SHA3-256 digest. Every backend derives the same nonce, so a
+# deterministic signature does not depend on what is installed.
+#
+# Signatures with a fixed nonce ``k``, as used for the golden files, are
+# always made by the ``ecdsa`` backend and are not normalized: the
+# optimized libraries do not let the caller choose the nonce.
+# ------------------------------------------------------------------------
+
+order = SECP256k1.order
+
+
+def digest(msg):
+    """SHA3-256 digest of msg, the value that is signed"""
+    return sha3.sha3_256(msg).digest()
+
+
+def deterministic_nonce(sk, msg):
+    """RFC 6979 nonce for signing msg with sk, with HMAC-SHA256 over its digest"""
+    return rfc6979.generate_k(order, _secret(sk), hashlib.sha256, digest(msg))
+
+
+def low_s(r, s):
+    """The signature (r, s) with the lower of s and order - s"""
+    return r, min(s, order - s)
+
+
+def _secret(sk):
+    return sk.privkey.secret_multiplier
+
+
+class EcdsaBackend(object):
+    """Pure Python backend, always available, and the interface of the others"""
+
+    name = 'ecdsa'
+
+    def sign(self, sk, msg, deterministic=False):
+        """
+        Sign msg with sk
+
+        :param deterministic: derive the nonce from the key and message as
+                              in RFC 6979, otherwise pick a random one
+        :returns: (r, s)
+        """
+        if deterministic:
+            sig = sk.sign_digest(digest(msg), k=deterministic_nonce(sk, msg))
+        else:
+            sig = sk.sign(msg, hashfunc=sha3.sha3_256)
+        return low_s(*util.sigdecode_string(sig, order))
+
+    def sign_with_k(self, sk, msg, k):
+        """Sign msg with sk using the nonce k"""
+        sig = sk.sign(msg, hashfunc=sha3.sha3_256, k=k)
+        return util.sigdecode_string(sig, order)
+
+    def __repr__(self):
+        return "<%s(name=%s)>" % (type(self).__name__, self.name)
+
+
+class _CachedKeys(object):
+    # Converting a key is costly compared to signing with it, the last few
+    # converted keys are kept, by secret exponent.
+
+    def __init__(self, convert, size=256):
+        self.convert = convert
+        self.size = size
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sk):
+        secret = _secret(sk)
+        with self._lock:
+            key = self._keys.pop(secret, None)
+            if key is None:
+                key = self.convert(secret)
+            self._keys[secret] = key
+            if len(self._keys) > self.size:
+                self._keys.popitem(last=False)
+        return key
+
+
+class CoincurveBackend(EcdsaBackend):
+    """
+    Backend using libsecp256k1 through coincurve. Random nonces are derived
+    by libsecp256k1 from the key, the message and 32 bytes from
+    ``os.urandom``.
+    """
+
+    name = 'coincurve'
+
+    def __init__(self):
+        self._keys = _CachedKeys(
+            lambda secret: coincurve.PrivateKey.from_int(secret))
+
+    def sign(self, sk, msg, deterministic=False):
+        key = self._keys.get(sk)
+        if deterministic:
+            nonce = (_ffi.NULL, _ffi.NULL)
+        else:
+            nonce = (_ffi.NULL, _ffi.new('unsigned char[32]', os.urandom(32)))
+        der = key.sign(digest(msg), hasher=None, custom_nonce=nonce)
+        return util.sigdecode_der(der, order)
+
+
+class CryptographyBackend(EcdsaBackend):
+    """
+    Backend using OpenSSL through cryptography. Deterministic nonces need
+    cryptography 44 or later, with earlier releases deterministic signatures
+    are made by the ``ecdsa`` backend.
+    """
+
+    name = 'cryptography'
+
+    def __init__(self):
+        self._keys = _CachedKeys(
+            lambda secret: ec.derive_private_key(secret, ec.SECP256K1(), _openssl()))
+        # the digest is SHA3-256, SHA256 is the HMAC of deterministic nonces
+        algorithm = Prehashed(hashes.SHA256())
+        self._random = ec.ECDSA(algorithm)
+        try:
+            self._deterministic = ec.ECDSA(algorithm, deterministic_signing=True)
+        except TypeError:
+            self._deterministic = None
+
+    def sign(self, sk, msg, deterministic=False):
+        if deterministic and self._deterministic is None:
+            return super(CryptographyBackend, self).sign(sk, msg, deterministic=True)
+        key = self._keys.get(sk)
+        signature = self._deterministic if deterministic else self._random
+        return low_s(*decode_dss_signature(key.sign(digest(msg), signature)))
+
+
+BACKENDS = {'ecdsa': EcdsaBackend}
+if coincurve is not None:
+    BACKENDS['coincurve'] = CoincurveBackend
+if ec is not None:
+    BACKENDS['cryptography'] = CryptographyBackend
+
+# Preferred backends, fastest first
+_PREFERENCE = ('coincurve', 'cryptography', 'ecdsa')
+
+
+def get_backend(name=None):
+    """
+    Signing backend by name, or the fastest one installed
+
+    :param name: ``coincurve``, ``cryptography`` or ``ecdsa``
+    """
+    if name is None:
+        name = next(n for n in _PREFERENCE if n in BACKENDS)
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError("signing backend {!r} is not available".format(name))
+
+
+default_backend = get_backend()
+
+
+def set_default_backend(name):
+    """Use the backend ``name`` for signatures made without a backend"""
+    global default_backend
+    default_backend = get_backend(name)
+    return default_backend
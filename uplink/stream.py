@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+
+import re
+import json
+import codecs
+from json.decoder import scanstring
+
+# Size of the chunks read from a streamed HTTP response body
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789.eE+-'
+
+# Parser states
+_START = 0
+_KEY_OR_END = 1
+_KEY = 2
+_COLON = 3
+_VALUE = 4
+_ELEM_OR_END = 5
+_ELEM = 6
+_ELEM_SEP = 7
+_SEP = 8
+_DONE = 9
+
+_NEED_MORE = object()
+
+_STRUCTURE_RE = re.compile(r'["\[\]{}]')
+_STRING_BODY_RE = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+
+
+# Patterns that match a whole JSON value without decoding it, for the raw
+# mode. Values nested deeper than _MAX_DEPTH do not match and are scanned
+# instead. Strings are quicker to match in text without backslashes.
+_MAX_DEPTH = 12
+_PLAIN = r'[^"\[\]{}]*'
+
+
+def _nested(string, depth):
+    inner = string if depth == 0 else '(?:{}|{})'.format(string, _nested(string, depth - 1))
+    return r'[\[{{]{0}(?:{1}{0})*[\]}}]'.format(_PLAIN, inner)
+
+
+def _value_pattern(string):
+    return re.compile(r'{}|{}|[^"\[\]{{}},\s]+'.format(string, _nested(string, _MAX_DEPTH)), re.DOTALL)
+
+
+_VALUE_RE = _value_pattern(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_UNESCAPED_VALUE_RE = _value_pattern(r'"[^"]*"')
+_EMPTY_OBJECT_RE = re.compile(r'\{\s*\}')
+_KEY_RE = re.compile(r'[{,]\s*"')
+_COLON_RE = re.compile(r'\s*:\s*')
+_MEMBER_END_RE = re.compile(r'\s*[,}]')
+
+_decoder = json.JSONDecoder()
+
+
+def _members(text, pos, value, complete=False):
+    """
+    Find the members of the object starting at pos, returns the offset past
+    its end and a dict of name -> (start, end) of each member's value, or
+    None when the object does not end within text or is nested too deeply
+    for value. With complete, values nested too deeply are decoded to find
+    their end instead.
+    """
+    match = _EMPTY_OBJECT_RE.match(text, pos)
+    if match:
+        return match.end(), {}
+    members = {}
+    while True:
+        match = _KEY_RE.match(text, pos)
+        if match is None:
+            return None
+        try:
+            name, pos = scanstring(text, match.end())
+        except ValueError:
+            return None
+        match = _COLON_RE.match(text, pos)
+        if match is None:
+            return None
+        pos = match.end()
+        match = value.match(text, pos)
+        if match is not None:
+            end = match.end()
+        elif complete:
+            end = _decoder.raw_decode(text, pos)[1]
+        else:
+            return None
+        members[name] = (pos, end)
+        match = _MEMBER_END_RE.match(text, end)
+        if match is None:
+            return None
+        pos = match.end() - 1
+        if text[pos] == '}':
+            return pos + 1, members
+
+
+def object_members(text):
+    """
+    Locate the members of a JSON object without decoding them
+
+    :param text: JSON source of an object
+    :return: dict of member name -> ``(start, end)`` offsets of the member's
+             value in text
+    """
+    start = len(text) - len(text.lstrip())
+    found = _members(text, start, _VALUE_RE, complete=True)
+    if found is None:
+        raise ValueError("not a JSON object")
+    return found[1]
+
+
+class _Scanner(object):
+    """
+    Finds the end of a JSON array or object read in pieces, without decoding
+    it. The nesting depth and whether a string or an escape sequence is open
+    carry over from one piece to the next, so every character is looked at
+    once however many pieces the value spans.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def scan(self, text, pos=0):
+        """Returns the offset in text just past the value, or None if it continues"""
+        depth, n = self.depth, len(text)
+        while pos < n:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                    pos += 1
+                    continue
+                pos = _STRING_BODY_RE.match(text, pos).end()
+                if pos == n:
+                    break
+                # either the closing quote or a backslash ending the piece
+                self.in_string = text[pos] != '"'
+                self.escaped = self.in_string
+                pos += 1
+                continue
+            match = _STRUCTURE_RE.search(text, pos)
+            if match is None:
+                break
+            c, pos = match.group(), match.end()
+            if c == '"':
+                self.in_string = True
+            elif c in '[{':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    self.depth = 0
+                    return pos
+        self.depth = depth
+        return None
+
+
+class JsonArrayParser(object):
+    """
+    Incremental parser for a JSON object holding one large array
+
+    Uplink list responses have the shape ``{"tag": ..., "contents": [...]}``.
+    Bytes are pushed in with :meth:`feed` as they arrive and every complete
+    element of the ``key`` array is returned as soon as it has been read, so
+    only the element being parsed is held in memory. All other members of
+    the object (and ``key`` itself when it is not an array) are collected in
+    :attr:`envelope`.
+
+    An element is decoded once it is complete. One that is still incomplete
+    after a second chunk has arrived is large: its chunks are kept aside and
+    scanned for its end as they arrive, instead of being decoded again from
+    the start every time, so parsing stays linear in the element's size.
+
+    In raw mode elements are not decoded at all: their end is found by
+    matching strings and brackets, and only object member names are read.
+    The element text is not validated.
+
+    Malformed or truncated input raises ValueError.
+
+    :param key: name of the member whose array elements are streamed
+    :param raw: return ``(text, members)`` pairs instead of decoded values,
+                where text is the JSON source of the element and members,
+                for an object, maps each member name to the ``(start, end)``
+                offsets of its value in text (see :func:`object_members`)
+    """
+
+    def __init__(self, key='contents', raw=False):
+        self.key = key
+        self.raw = raw
+        self.envelope = {}
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._state = _START
+        self._member = None
+        self._eof = False
+        self._retried = False
+        self._scanner = None
+        self._pieces = None
+
+    @property
+    def done(self):
+        return self._state == _DONE
+
+    def feed(self, data):
+        """Add bytes to the input, returns the list of completed elements"""
+        text = self._decoder.decode(data) if isinstance(data, bytes) else data
+        if self._scanner is not None:
+            end = self._scanner.scan(text)
+            if end is None:
+                self._pieces.append(text)
+                return []
+            self._pieces.append(text[:end])
+            elem = self._complete(''.join(self._pieces))
+            self._scanner = self._pieces = None
+            self._buf, self._pos = text[end:], 0
+            return [elem] + list(self._parse())
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        return list(self._parse())
+
+    def close(self):
+        """Signal the end of input, returns any remaining elements"""
+        self._eof = True
+        elems = self.feed(self._decoder.decode(b'', final=True))
+        if self._state != _DONE:
+            raise ValueError("truncated JSON document")
+        return elems
+
+    def _peek(self):
+        buf, pos = self._buf, self._pos
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return buf[pos] if pos < len(buf) else None
+
+    def _value(self):
+        try:
+            value, end = self._json.raw_decode(self._buf, self._pos)
+        except ValueError:
+            if self._eof:
+                raise
+            return _NEED_MORE
+        # a number is only complete once a character that cannot continue it
+        # has been read, "12" or "5." may continue in the next chunk
+        if not self._eof and isinstance(value, (int, float)) and not isinstance(value, bool):
+            tail = end
+            while tail < len(self._buf) and self._buf[tail] in _NUMBER_CHARS:
+                tail += 1
+            if tail == len(self._buf):
+                return _NEED_MORE
+        self._pos = end
+        return value
+
+    def _element(self, c):
+        start = self._pos
+        if self.raw and c in '[{':
+            found = self._match(start)
+            if found is None:
+                if self._eof or self._retried:
+                    return self._scan(start)
+                self._retried = True
+                return _NEED_MORE
+            self._pos, members = found
+            self._retried = False
+            return self._buf[start:self._pos], members
+        if c in '[{':
+            try:
+                value, self._pos = self._json.raw_decode(self._buf, start)
+            except ValueError:
+                if self._eof:
+                    raise
+                if not self._retried:
+                    self._retried = True
+                    return _NEED_MORE
+                return self._scan(start)
+        else:
+            value = self._value()
+            if value is _NEED_MORE:
+                return value
+            if self.raw:
+                return self._buf[start:self._pos], None
+        self._retried = False
+        return value
+
+    def _match(self, start):
+        buf = self._buf
+        value = _VALUE_RE if buf.find('\\', start) != -1 else _UNESCAPED_VALUE_RE
+        if buf[start] == '{':
+            found = _members(buf, start, value)
+            return found and (found[0], dict((name, (begin - start, end - start))
+                                             for name, (begin, end) in found[1].items()))
+        match = value.match(buf, start)
+        return match and (match.end(), None)
+
+    def _scan(self, start):
+        # a large or deeply nested element: from now on its chunks are only
+        # scanned for its end
+        scanner = _Scanner()
+        end = scanner.scan(self._buf, start)
+        if end is not None:
+            self._pos = end
+            return self._complete(self._buf[start:end])
+        self._scanner = scanner
+        self._pieces = [self._buf[start:]]
+        self._buf, self._pos = '', 0
+        return _NEED_MORE
+
+    def _complete(self, text):
+        self._retried = False
+        self._state = _ELEM_SEP
+        if self.raw:
+            return text, object_members(text) if text[0] == '{' else None
+        value, end = self._json.raw_decode(text)
+        if end != len(text):
+            raise ValueError("invalid JSON element")
+        return value
+
+    def _expect(self, c, expected):
+        if c not in expected:
+            raise ValueError("expected one of {!r} at offset {}, got {!r}".format(expected, self._pos, c))
+        self._pos += 1
+        return c
+
+    def _parse(self):
+        while True:
+            c = self._peek()
+            if self._state == _DONE:
+                if c is not None:
+                    raise ValueError("trailing data after JSON document")
+                return
+            if c is None:
+                return
+
+            state = self._state
+            if state == _START:
+                self._expect(c, '{')
+                self._state = _KEY_OR_END
+            elif state == _KEY_OR_END:
+                if c == '}':
+                    self._pos += 1
+                    self._state = _DONE
+                else:
+                    self._state = _KEY
+            elif state == _KEY:
+                key = self._value()
+                if key is _NEED_MORE:
+                    return
+                self._member = key
+                self._state = _COLON
+            elif state == _COLON:
+                self._expect(c, ':')
+                self._state = _VALUE
+            elif state == _VALUE:
+                if self._member == self.key and c == '[':
+                    self._pos += 1
+                    self._state = _ELEM_OR_END
+                else:
+                    value = self._value()
+                    if value is _NEED_MORE:
+                        return
+                    self.envelope[self._member] = value
+                    self._state = _SEP
+            elif state == _ELEM_OR_END:
+                if c == ']':
+                    self._pos += 1
+                    self._state = _SEP
+                else:
+                    self._state = _ELEM
+            elif state == _ELEM:
+                elem = self._element(c)
+                if elem is _NEED_MORE:
+                    return
+                self._state = _ELEM_SEP
+                yield elem
+            elif state == _ELEM_SEP:
+                self._state = _ELEM if self._expect(c, ',]') == ',' else _SEP
+            elif state == _SEP:
+                self._state = _KEY if self._expect(c, ',}') == ',' else _DONE
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+import itertools
+import threading
+from collections import namedtuple
+
+import six
+
+from .deadline import current_deadline, use_deadline
+
+try:
+    import queue
+except ImportError:  # python 2
+    import Queue as queue  # type: ignore
+
+# A transaction to be built, signed and issued by the submitter. ``method``
+# names an UplinkJsonRpc write method without its ``uplink_`` prefix
+# (e.g. "transfer_asset") and ``kwargs`` are the arguments to that method.
+TxIntent = namedtuple('TxIntent', ['method', 'kwargs'])
+
+# Result of one intent: ``result`` is what the client method returned (the
+# tx hash, or a (tx_hash, address) tuple for create methods).
+TxOutcome = namedtuple('TxOutcome', ['index', 'intent', 'result', 'error', 'latency'])
+
+WRITE_METHODS = frozenset([
+    'create_account', 'create_asset', 'transfer_asset', 'circulate_asset',
+    'create_contract', 'revoke_asset', 'revoke_account', 'call_contract',
+])
+
+_STOP = object()
+
+
+def intent_origin(intent):
+    """Address whose transactions must reach the node in submission order"""
+    kwargs = intent.kwargs
+    return kwargs.get('from_address') or kwargs.get('origin')
+
+
+class SubmitStats(object):
+    """Aggregate outcome of a batch submission"""
+
+    def __init__(self):
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.total_latency = 0.0
+        self.started = None
+        self.finished = None
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def tps(self):
+        """Successfully issued transactions per second"""
+        elapsed = self.elapsed
+        return self.succeeded / elapsed if elapsed else 0.0
+
+    @property
+    def mean_latency(self):
+        completed = self.succeeded + self.failed
+        return self.total_latency / completed if completed else 0.0
+
+    def __repr__(self):
+        return "<SubmitStats(submitted=%i, succeeded=%i, failed=%i, tps=%.1f)>" % (
+            self.submitted, self.succeeded, self.failed, self.tps)
+
+
+class TransactionSubmitter(object):
+    """
+    Pipelined batch transaction submission
+
+    Intents are spread over ``workers`` lanes, each served by its own thread
+    which builds, signs and issues transactions one at a time, so up to
+    ``workers`` transactions are on the wire at once. At most ``window``
+    intents are accepted but not yet completed.
+
+    With ``preserve_origin_order`` all intents from one origin address go to
+    the same lane and are therefore issued in the order they were given.
+
+    A lane runs the client's ``uplink_*`` method for an intent, which builds,
+    signs and issues the transaction in one go. Transactions are pipelined
+    across lanes rather than through separate build, sign and issue stages.
+
+    :param rpc: UplinkJsonRpc client
+    :param workers: number of concurrent submission lanes
+    :param window: maximum number of in-flight intents
+    :param preserve_origin_order: issue transactions of one origin in order
+    """
+
+    def __init__(self, rpc, workers=8, window=64, preserve_origin_order=True):
+        self.rpc = rpc
+        self.workers = workers
+        self.window = window
+        self.preserve_origin_order = preserve_origin_order
+        self.stats = SubmitStats()
+
+    def _lane_for(self, intent, round_robin):
+        origin = intent_origin(intent) if self.preserve_origin_order else None
+        if origin is None:
+            return next(round_robin)
+        return hash(origin) % self.workers
+
+    def _issue(self, index, intent):
+        start = time.time()
+        try:
+            if intent.method not in WRITE_METHODS:
+                raise ValueError("Not a transaction method: " + str(intent.method))
+            method = getattr(self.rpc, 'uplink_' + intent.method)
+            result, error = method(**intent.kwargs), None
+        except Exception as e:
+            result, error = None, e
+        return TxOutcome(index, intent, result, error, time.time() - start)
+
+    def _work(self, lane, outcomes, slots, d, stopped):
+        with use_deadline(d):
+            while True:
+                item = lane.get()
+                if item is _STOP:
+                    return
+                if not stopped.is_set():
+                    outcomes.put(self._issue(*item))
+                slots.release()
+
+    def _feed(self, intents, lanes, slots, counter, stopped, failure):
+        round_robin = itertools.cycle(range(self.workers))
+        try:
+            for index, intent in enumerate(intents):
+                slots.acquire()
+                if stopped.is_set():
+                    return
+                counter[0] = index + 1
+                lanes[self._lane_for(intent, round_robin)].put((index, intent))
+        except Exception:
+            failure.append(sys.exc_info())
+        finally:
+            counter[1] = True
+            for lane in lanes:
+                lane.put(_STOP)
+
+    def submit(self, intents):
+        """
+        Submit an iterable of :class:`TxIntent`
+
+        An active deadline applies to every transaction; intents still
+        queued once it has passed fail with DeadlineExceeded.
+
+        An exception raised by the intents iterable is raised from the
+        generator after the outcomes of the intents read before it. Closing
+        the generator early stops the lanes: transactions being issued
+        complete, those not yet issued are dropped.
+
+        :return: generator of :class:`TxOutcome` in completion order
+        """
+        stats = self.stats = SubmitStats()
+        stats.started = time.time()
+
+        outcomes = queue.Queue()
+        slots = threading.BoundedSemaphore(self.window)
+        lanes = [queue.Queue() for _ in range(self.workers)]
+        # [number of intents fed so far, feeding finished]
+        counter = [0, False]
+        stopped = threading.Event()
+        # exc_info of an exception raised by intents
+        failure = []
+
+        d = current_deadline()
+        threads = [threading.Thread(target=self._work, args=(lane, outcomes, slots, d, stopped))
+                   for lane in lanes]
+        threads.append(threading.Thread(target=self._feed,
+                                        args=(intents, lanes, slots, counter, stopped, failure)))
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        completed = 0
+        try:
+            while not counter[1] or completed < counter[0]:
+                try:
+                    outcome = outcomes.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                completed += 1
+                stats.submitted = counter[0]
+                stats.total_latency += outcome.latency
+                if outcome.error is None:
+                    stats.succeeded += 1
+                else:
+                    stats.failed += 1
+                yield outcome
+        finally:
+            stopped.set()
+            stats.submitted = counter[0]
+            stats.finished = time.time()
+        if failure:
+            six.reraise(*failure[0])
+
+    def run(self, intents):
+        """Submit all intents and return their outcomes in input order"""
+        return sorted(self.submit(intents), key=lambda outcome: outcome.index)
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import logging
+import threading
+
+from .exceptions import (UplinkJsonRpcError, RpcConnectionFail, BadStatusCodeError,
+                         BadJsonError, DeadlineExceeded)
+
+# Failures of the request itself, as opposed to the node reporting that the
+# block does not exist (yet)
+_TRANSPORT_ERRORS = (RpcConnectionFail, BadStatusCodeError, BadJsonError, DeadlineExceeded)
+
+log = logging.getLogger(__name__)
+
+
+def fetch_block(rpc, index):
+    """Block with the given index, or None if the node does not have it"""
+    try:
+        return rpc.uplink_block(index)
+    except _TRANSPORT_ERRORS:
+        raise
+    except UplinkJsonRpcError:
+        return None
+
+
+class FileCheckpoint(object):
+    """
+    Index of the next block to process, stored in a JSON file
+
+    The file is replaced atomically, so a crash while saving leaves either
+    the old or the new checkpoint behind.
+
+    :param path: checkpoint file
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        """Saved index, or None if no checkpoint has been written yet"""
+        try:
+            with open(self.path) as f:
+                return json.load(f)['next_index']
+        except (IOError, OSError):
+            return None
+
+    def save(self, next_index):
+        tmp = '{}.tmp'.format(self.path)
+        with open(tmp, 'w') as f:
+            json.dump({'next_index': next_index}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        # os.replace is atomic on every platform, os.rename only on posix
+        getattr(os, 'replace', os.rename)(tmp, self.path)
+
+
+class MemoryCheckpoint(object):
+    """Checkpoint kept in memory, lost when the process exits"""
+
+    def __init__(self, next_index=None):
+        self.next_index = next_index
+
+    def load(self):
+        return self.next_index
+
+    def save(self, next_index):
+        self.next_index = next_index
+
+
+class BlockTailer(object):
+    """
+    Follow the chain, fetching each new block once
+
+    The index of the next block to fetch is saved to ``checkpoint`` after
+    every block has been processed, so a restarted tailer resumes with the
+    first block that was not. Blocks are fetched one index at a time with
+    ``uplink_block``; the node reporting an unknown index means there is no
+    new block yet.
+
+    The polling interval follows the block production rate: it is half the
+    moving average of the time between blocks, bounded by ``min_interval``
+    and ``max_interval``, and backs off while no blocks arrive or the node
+    cannot be reached. ::
+
+        tailer = BlockTailer(rpc, checkpoint=FileCheckpoint('tail.json'))
+        for block in tailer.follow():
+            index(block)
+
+    :param rpc: :class:`~uplink.client.UplinkJsonRpc` to fetch blocks with
+    :param checkpoint: :class:`FileCheckpoint` (or any object with ``load`` and
+                       ``save``), by default progress is kept in memory only
+    :param start: index to start from when the checkpoint is empty
+    :param min_interval: shortest delay between polls, in seconds
+    :param max_interval: longest delay between polls, in seconds
+    :param smoothing: weight of the latest block gap in the moving average
+    :param batch_size: maximum number of blocks fetched by one poll
+    """
+
+    def __init__(self, rpc, checkpoint=None, start=0, min_interval=0.1, max_interval=10.0,
+                 smoothing=0.3, batch_size=100):
+        self.rpc = rpc
+        self.checkpoint = checkpoint if checkpoint is not None else MemoryCheckpoint()
+        saved = self.checkpoint.load()
+        self.next_index = start if saved is None else saved
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+        self.batch_size = batch_size
+        self.interval = min_interval
+        self.block_gap = None
+        self._last_arrival = None
+        self._callbacks = []
+        self._stopped = threading.Event()
+
+    def _observe(self, n_blocks):
+        now = time.time()
+        if n_blocks:
+            if self._last_arrival is not None:
+                gap = (now - self._last_arrival) / n_blocks
+                if self.block_gap is None:
+                    self.block_gap = gap
+                else:
+                    self.block_gap += self.smoothing * (gap - self.block_gap)
+            self._last_arrival = now
+            interval = self.block_gap / 2 if self.block_gap is not None else self.min_interval
+        else:
+            interval = self.interval * 1.5
+        self.interval = max(self.min_interval, min(self.max_interval, interval))
+
+    def _backoff(self):
+        self.interval = min(self.max_interval, self.interval * 1.5)
+
+    def poll(self):
+        """
+        Fetch the blocks produced since the last poll, at most
+        ``batch_size`` of them, without committing the checkpoint
+
+        :return: list of new blocks, in index order
+        """
+        blocks = []
+        while len(blocks) < self.batch_size:
+            block = fetch_block(self.rpc, self.next_index + len(blocks))
+            if block is None:
+                break
+            blocks.append(block)
+        # a full batch means we are catching up, which says nothing about
+        # the block production rate
+        if len(blocks) < self.batch_size:
+            self._observe(len(blocks))
+        return blocks
+
+    def commit(self, block):
+        """Record block as processed"""
+        self.next_index = block.index + 1
+        self.checkpoint.save(self.next_index)
+
+    def follow(self):
+        """
+        Generator of new blocks, forever or until :meth:`stop` is called
+
+        A block is committed to the checkpoint when the next one is requested,
+        i.e. once the caller has finished processing it. A failed request
+        is logged and retried after the polling interval, which backs off.
+        """
+        while not self._stopped.is_set():
+            try:
+                blocks = self.poll()
+            except _TRANSPORT_ERRORS as e:
+                self._backoff()
+                log.warning("fetching block %i failed, retrying in %.1fs: %r",
+                            self.next_index, self.interval, e)
+                self._stopped.wait(self.interval)
+                continue
+            for block in blocks:
+                yield block
+                self.commit(block)
+                if self._stopped.is_set():
+                    return
+            if len(blocks) < self.batch_size:
+                self._stopped.wait(self.interval)
+
+    def add_callback(self, fn):
+        """Call ``fn(block)`` for every new block while :meth:`run` is active"""
+        self._callbacks.append(fn)
+
+    def run(self):
+        """Deliver new blocks to the callbacks until :meth:`stop` is called"""
+        for block in self.follow():
+            for fn in self._callbacks:
+                fn(block)
+
+    def start(self):
+        """Run the callbacks on a daemon thread, returns the thread"""
+        thread = threading.Thread(target=self.run, name='uplink-block-tailer')
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stopped.set()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+import time
+import codecs
+
+from .protocol import (Transaction, Transfer, TxAccount, TxAsset, TxContract, CreateAccount,
+                       CreateAsset, CreateContract, RevokeAccount, Call, Circulate, RevokeAsset,
+                       CreateAccountHeader, CreateAssetHeader, TransferAssetHeader, CirculateAssetHeader,
+                       CreateContractHeader, RevokeAccountHeader, RevokeAssetHeader, CallHeader,
+                       BindHeader, VAsset)
+from .cryptography import pack_signature, derive_account_address
+from .phases import phase
+
+# ------------------------------------------------------------------------
+# Transaction construction
+#
+# Builders shared by the blocking and asyncio clients. Each one returns a
+# signed Transaction ready to be issued to the uplink node.
+# ------------------------------------------------------------------------
+
+
+def sign_transaction(private_key, txb, hdr, origin):
+    """Sign a transaction header and wrap it in a Transaction"""
+    with phase('sign'):
+        r, s = hdr.sign(private_key)
+    with phase('pack'):
+        signature = pack_signature(r, s)
+    return Transaction(txb, signature, origin=origin)
+
+
+def create_account_tx(private_key, public_key, from_address=None, metadata=None, timezone=None):
+    """Build a CreateAccount transaction, returns (tx, account_address)"""
+    if timezone is None:
+        timezone, localtz = time.tzname
+    if metadata is None:
+        metadata = {}
+
+    public_key_hex = codecs.encode(public_key.to_string(), 'hex')
+
+    acc_address = derive_account_address(public_key)
+    hdr = CreateAccountHeader(
+        public_key_hex, metadata, acc_address, timezone)
+    txb = TxAccount(CreateAccount(hdr))
+
+    origin = acc_address if from_address is None else from_address
+    return (sign_transaction(private_key, txb, hdr, origin), acc_address)
+
+
+def create_asset_tx(private_key, origin, name, supply, asset_type_nm, reference, issuer,
+                    precision=None, metadata=None):
+    """Build a CreateAsset transaction"""
+    if metadata is None:
+        metadata = {}
+
+    hdr = CreateAssetHeader(name, supply, asset_type_nm,
+                            reference, issuer, precision, metadata)
+    txb = TxAsset(CreateAsset(hdr))
+    return sign_transaction(private_key, txb, hdr, origin)
+
+
+def transfer_asset_tx(private_key, from_address, to_address, balance, asset_address):
+    """Build an asset Transfer transaction"""
+    hdr = TransferAssetHeader(asset_address, to_address, balance)
+    txb = TxAsset(Transfer(hdr))
+    return sign_transaction(private_key, txb, hdr, from_address)
+
+
+def circulate_asset_tx(private_key, from_address, amount, asset_address):
+    """Build an asset Circulate transaction"""
+    hdr = CirculateAssetHeader(asset_address, amount)
+    txb = TxAsset(Circulate(hdr))
+    return sign_transaction(private_key, txb, hdr, from_address)
+
+
+def create_contract_tx(private_key, from_address, script):
+    """Build a CreateContract transaction"""
+    hdr = CreateContractHeader(script)
+    txb = TxContract(CreateContract(hdr))
+    return sign_transaction(private_key, txb, hdr, from_address)
+
+
+def revoke_asset_tx(private_key, from_address, asset_addr):
+    """Build a RevokeAsset transaction"""
+    hdr = RevokeAssetHeader(asset_addr)
+    txb = TxAsset(RevokeAsset(hdr))
+    return sign_transaction(private_key, txb, hdr, from_address)
+
+
+def revoke_account_tx(private_key, from_address, account_addr):
+    """Build a RevokeAccount transaction"""
+    hdr = RevokeAccountHeader(account_addr)
+    txb = TxAccount(RevokeAccount(hdr))
+    return sign_transaction(private_key, txb, hdr, from_address)
+
+
+def call_contract_tx(private_key, from_address, contract_addr, method, args):
+    """Build a contract method Call transaction"""
+    hdr = CallHeader(contract_addr, method, args)
+    txb = TxContract(Call(hdr))
+    return sign_transaction(private_key, txb, hdr, from_address)
+
+
+# ------------------------------------------------------------------------
+# Ledger state touched by a transaction
+# ------------------------------------------------------------------------
+
+
+def touched_addresses(tx):
+    """
+    Ledger entities whose state may change when tx is applied, as a list of
+    ``(kind, address)`` pairs with kind one of account, asset, contract or
+    callable. Entities created by the transaction are not included.
+    """
+    hdr = tx.header.contents.contents
+    if isinstance(hdr, (TransferAssetHeader, CirculateAssetHeader)):
+        return [('asset', hdr.assetAddr)]
+    if isinstance(hdr, RevokeAssetHeader):
+        return [('asset', hdr.address)]
+    if isinstance(hdr, RevokeAccountHeader):
+        return [('account', hdr.address)]
+    if isinstance(hdr, BindHeader):
+        return [('asset', hdr.asset), ('contract', hdr.contract), ('callable', hdr.contract)]
+    if isinstance(hdr, CallHeader):
+        # contract methods may move holdings of any asset passed to them
+        assets = [('asset', arg.contents) for arg in hdr.args if isinstance(arg, VAsset)]
+        return [('contract', hdr.address), ('callable', hdr.address)] + assets
+    return []
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Defaults mirror the requests library: one pool per host, ten sockets each.
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_IDLE_TIMEOUT = 60.0
+
+
+class _IdleEviction(object):
+    # Mixed into urllib3 connection pools: every pooled connection is stamped
+    # when it is returned, and one that has been idle for longer than
+    # ``idle_timeout`` is closed when it is checked out again. The node (or
+    # a proxy in between) has most likely dropped it already, and a closed
+    # connection reconnects on its next request.
+
+    idle_timeout = None
+
+    def _get_conn(self, timeout=None):
+        conn = super(_IdleEviction, self)._get_conn(timeout)
+        idle_since = getattr(conn, '_uplink_idle_since', None)
+        conn._uplink_idle_since = None
+        if idle_since is not None and time.time() - idle_since > self.idle_timeout:
+            conn.close()
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn._uplink_idle_since = time.time()
+        super(_IdleEviction, self)._put_conn(conn)
+
+    def close_idle(self, now):
+        """Close the pooled connections idle for longer than ``idle_timeout``"""
+        queue = self.pool
+        if queue is None:
+            return
+        # connections in the queue are not checked out while it is locked
+        with queue.mutex:
+            for conn in queue.queue:
+                idle_since = getattr(conn, '_uplink_idle_since', None)
+                if idle_since is not None and now - idle_since > self.idle_timeout:
+                    conn.close()
+                    conn._uplink_idle_since = None
+
+
+class _IdleEvictionAdapter(HTTPAdapter):
+
+    __attrs__ = HTTPAdapter.__attrs__ + ['idle_timeout']
+
+    def __init__(self, idle_timeout, **kwargs):
+        self.idle_timeout = idle_timeout
+        super(_IdleEvictionAdapter, self).__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(_IdleEvictionAdapter, self).init_poolmanager(*args, **kwargs)
+        manager = self.poolmanager
+        manager.pool_classes_by_scheme = dict(
+            (scheme, type(cls.__name__, (_IdleEviction, cls), {'idle_timeout': self.idle_timeout}))
+            for scheme, cls in manager.pool_classes_by_scheme.items())
+
+    def close_idle(self, now):
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                pool.close_idle(now)
+
+
+class HTTPTransport(object):
+    """
+    Keep-alive HTTP transport backed by a pooled ``requests.Session``.
+
+    A single transport may be shared between threads and between several
+    ``UplinkJsonRpc`` instances. Sockets are returned to the pool after each
+    request and reused by the next request to the same host, so repeated RPC
+    calls do not pay for a new TCP handshake.
+
+    :param pool_connections: number of per-host pools to keep
+    :param pool_maxsize: maximum number of sockets kept per host
+    :param pool_block: block when a host's pool is exhausted instead of
+                       opening (and then discarding) an extra socket
+    :param idle_timeout: close pooled sockets that have been unused for this
+                         many seconds, ``None`` to never evict. Each socket
+                         is checked before it is reused, and the pool is
+                         swept for idle sockets at most once per timeout
+                         while requests are being made.
+    """
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_block=False,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.idle_timeout = idle_timeout
+
+        self._lock = threading.Lock()
+        self._next_sweep = None if idle_timeout is None else time.time() + idle_timeout
+        self._session = self._make_session()
+
+    def _make_session(self):
+        if self.idle_timeout is None:
+            adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                                  pool_maxsize=self.pool_maxsize,
+                                  pool_block=self.pool_block)
+        else:
+            adapter = _IdleEvictionAdapter(self.idle_timeout,
+                                           pool_connections=self.pool_connections,
+                                           pool_maxsize=self.pool_maxsize,
+                                           pool_block=self.pool_block)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _evict_idle(self):
+        if self._next_sweep is None:
+            return
+        now = time.time()
+        with self._lock:
+            if now < self._next_sweep:
+                return
+            self._next_sweep = now + self.idle_timeout
+        for adapter in set(self._session.adapters.values()):
+            adapter.close_idle(now)
+
+    def request(self, method, url, data=None, **kwargs):
+        """Issue an HTTP request over a pooled connection"""
+        self._evict_idle()
+        return self._session.request(method.upper(), url, data=data, **kwargs)
+
+    def close(self):
+        """Close all pooled connections"""
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()